@@ -38,13 +38,31 @@ WHAT FLASK DOES NOT DO:
 
 ✗ Equipment acquisition (manual/narrative domain)
 
+RULES:
+
+- rules.json (next to this file, or RULES_FILE): versioned game rules, hot-reloaded on change;
+  every response carries X-Rules-Version
+
 STATE PERSISTENCE:
 
 - character.json: Player stats, DC balance, abilities, equipment
 
 - world_state.json: Escalation indicators, event thresholds, faction states
 
-- sessions/session_N.json: Session history and snapshots
+- sessions/session_N.json: Session history and snapshots (manifests of content hashes)
+
+- sessions/objects/<sha256>.json: Deduplicated snapshot sections
+
+- sessions/index.json: Latest and open session number
+
+- history/<document>.jsonl: Version history (one snapshot manifest per mutation)
+
+- wal/<document>.jsonl: Write-ahead log since the last checkpoint (WRITE_MODE=wal)
+
+- /campaign/export, /campaign/import (or the export/import CLI commands): the whole
+  campaign as NDJSON, for backups and moving campaigns between hosts
+
+- campaigns/<id>/: Same layout per additional campaign (select with campaign=<id>)
 
 DEPLOYMENT:
 
@@ -56,1226 +74,7803 @@ DEPLOYMENT:
 
 """
 
-from flask import Flask, request, jsonify
+import time
 
-from flask_cors import CORS
-
-from datetime import datetime
-
-from pathlib import Path
+IMPORT_STARTED = time.perf_counter()
 
-import json
+from flask import Flask, Response, request, jsonify, g, has_request_context, stream_with_context
 
-import math
+from flask_cors import CORS
 
-import os
+from werkzeug.exceptions import HTTPException
 
-app = Flask(__name__)
+try:
 
-CORS(app)
+    import brotli
 
-# ================================================================================
+except ImportError:
 
-# SECTION 1: EMBEDDED RULES SYSTEM
+    brotli = None
 
-# ================================================================================
+from datetime import datetime, timedelta
 
-RULES = {
+from pathlib import Path
 
-"system": {
+from collections import OrderedDict
 
-"name": "Imperor Omo Karmic Framework",
+from collections.abc import Mapping
 
-"universe": "DC Comics Prime Earth",
+from types import MappingProxyType
 
-"version": "3.0_complete_dual_mode",
+from itertools import accumulate, chain
 
-"karmic_cap": 22,
+from array import array
 
-"universal_max": 25,
+import ast
 
-"stats": ["speed", "reflexes", "power", "resistance"]
+import atexit
 
-},
+import gzip
 
-"stat_multipliers": {
+import hashlib
 
-"speed": 2.0,
+import json
 
-"reflexes": 2.0,
+import math
 
-"power": 4.5,
+import os
 
-"resistance": 10.0
+import random
 
-},
+import re
 
-"tiers": {
+import shutil
 
-0: {"name": "Below Average Human", "category": "Subhuman", "movement_speed": "0.5-1 m/s walking", "reflex_speed": "400-500ms reaction time", "power": "1-50 joules (child's push)", "resistance": "Bruises easily, no defense", "examples": ["Civilian", "Child", "Elderly"]},
+import signal
 
-1: {"name": "Average Human", "category": "Human", "movement_speed": "1-3 m/s typical gait", "reflex_speed": "250-300ms reaction time", "power": "50-300 joules (break wood)", "resistance": "Typical human fragility", "examples": ["Untrained adult"]},
+import sys
 
-2: {"name": "Athletic Human", "category": "Human", "movement_speed": "3-5 m/s running", "reflex_speed": "180-250ms reflex", "power": "300-1,000 joules (break boards)", "resistance": "Multi-punch survivable, mild energy resistance", "examples": ["Professional athlete"]},
+import tempfile
 
-3: {"name": "Peak Human", "category": "Human", "movement_speed": "5-10 m/s (Olympic sprint)", "reflex_speed": "120-180ms elite reaction", "power": "1,000-15,000 joules (shatter doors)", "resistance": "Survive car crash, 10m+ falls", "examples": ["Green Arrow", "Black Canary", "Catwoman", "Red Hood", "Wildcat"]},
+import threading
 
-4: {"name": "Wall Level", "category": "Enhanced Human", "movement_speed": "10-15 m/s", "reflex_speed": "90-120ms superhuman reaction", "power": "15,000-50,000 joules", "resistance": "Concrete wall level, moderate psychic defense", "examples": ["Batman (early)", "Nightwing", "Robin", "Batgirl"]},
+import weakref
 
-5: {"name": "Wall+", "category": "Enhanced Human", "movement_speed": "15-25 m/s", "reflex_speed": "60-90ms enhanced superhuman", "power": "50,000-250,000 joules", "resistance": "Reinforced concrete, assault rifle fire survivable", "examples": ["Batman (peak)", "Deathstroke", "Lady Shiva", "Katana"]},
+from functools import wraps
 
-6: {"name": "Small Building", "category": "Enhanced Human", "movement_speed": "25-50 m/s", "reflex_speed": "40-60ms lightning fast", "power": "0.25-1 megajoule", "resistance": "Tank antimaterial rounds, -200°C to 500°C", "examples": ["Bane (high Venom)", "Killer Croc", "Mr. Freeze"]},
+from bisect import bisect_left, bisect_right
 
-7: {"name": "Small Building+", "category": "Enhanced Human", "movement_speed": "50-100 m/s", "reflex_speed": "20-40ms hypersonic reaction", "power": "1-5 megajoules", "resistance": "Tank bombs, immune to small military weapons", "examples": ["Aquaman", "Mera", "Black Adam (low)", "Starfire", "Raven"]},
+from concurrent.futures import ThreadPoolExecutor
 
-8: {"name": "Building Level", "category": "Superhuman", "movement_speed": "100-200 m/s", "reflex_speed": "10-20ms near instantaneous", "power": "5-20 megajoules", "resistance": "Survive artillery, temperatures -400°C to 2000°C", "examples": ["Wonder Woman (restrained)", "Martian Manhunter (restrained)", "Big Barda"]},
+import heapq
 
-9: {"name": "Building+ Level", "category": "Superhuman", "movement_speed": "200-500 m/s", "reflex_speed": "5-10ms superhuman processing", "power": "20-100 megajoules", "resistance": "City block defense, MOAB-scale", "examples": ["Wonder Woman (moderate)", "Superman (restrained)", "Shazam (moderate)"]},
+app = Flask(__name__)
 
-10: {"name": "City Block Level", "category": "Superhuman", "movement_speed": "500-1,000 m/s", "reflex_speed": "1-5ms godlike reaction", "power": "100-500 megajoules", "resistance": "Tank nuke, extreme temperature immunity", "examples": ["Superman (casual)", "Black Adam (serious)"]},
+CORS(app)
 
-11: {"name": "Multi-Block / Town", "category": "Superhuman", "movement_speed": "1-5 km/s", "reflex_speed": "0.5-1ms omniscient perception", "power": "500 megajoules - 2 gigajoules", "resistance": "Survive low-yield nuclear detonation", "examples": ["Superman (moderate)", "Martian Manhunter (full)", "Black Adam (full)"]},
+STARTUP_PHASES = []
 
-12: {"name": "Town Level", "category": "Superhuman", "movement_speed": "5-25 km/s", "reflex_speed": "Instantaneous local", "power": "2-10 gigajoules", "resistance": "Tank 100 kiloton nuclear weapons", "examples": ["Superman (serious)", "Orion", "Doomsday (evolving)"]},
+def mark_startup(phase):
 
-13: {"name": "City Level", "category": "Powerhouse", "movement_speed": "25-100 km/s", "reflex_speed": "Instantaneous regional", "power": "10-50 gigajoules", "resistance": "Survive 1 megaton city-destruction", "examples": ["Superman (full)", "Darkseid"]},
+    """Record import time spent since the previous mark (startup banner and /ready report)"""
 
-14: {"name": "City+ Level", "category": "Powerhouse", "movement_speed": "100-500 km/s", "reflex_speed": "Instantaneous continental", "power": "50-250 gigajoules", "resistance": "Survive 10 megaton strike", "examples": ["Superman (enraged/solar charged)", "Superboy Prime (serious)"]},
+    now = time.perf_counter()
 
-15: {"name": "Mountain Level", "category": "Powerhouse", "movement_speed": "500 km/s - 2,500 km/s", "reflex_speed": "Instantaneous planetary", "power": "250 gigajoules - 1 terajoule", "resistance": "Survive Tsar Bomb (50 megatons)", "examples": ["Superman (non-amped peak)", "Darkseid (manifest)"]},
+    previous = STARTUP_PHASES[-1][2] if STARTUP_PHASES else IMPORT_STARTED
 
-16: {"name": "Island Level", "category": "Powerhouse", "movement_speed": "2,500-10,000 km/s", "reflex_speed": "Omniscient planetary", "power": "1-5 terajoules", "resistance": "Survive 100 megaton strike", "examples": ["Superman (sundipped/amped)", "Wonder Woman (God of War)"]},
+    STARTUP_PHASES.append((phase, round((now - previous) * 1000, 2), now))
 
-17: {"name": "Country Level", "category": "Powerhouse", "movement_speed": "10,000-50,000 km/s", "reflex_speed": "Omniscient solar system", "power": "5-25 terajoules", "resistance": "Survive global-scale nuclear exchange", "examples": ["Superman (max sundip)", "Spectre (restrained)"]},
+def startup_report():
 
-18: {"name": "Continent Level", "category": "Cosmic", "movement_speed": "Speed of light+", "reflex_speed": "Omniscient universal", "power": "25-100 terajoules+", "resistance": "Survive planet-wide events", "examples": ["Superman (Crisis)", "Spectre (moderate)"]},
+    return {
 
-19: {"name": "Multi-Continent", "category": "Cosmic", "movement_speed": "FTL (faster than light)", "reflex_speed": "Omniscient multiversal", "power": "100-500 terajoules", "resistance": "Survive planet-crack level damage", "examples": ["Superman (Crisis peak)", "Darkseid (true)"]},
+        "import_ms": round(((STARTUP_PHASES[-1][2] if STARTUP_PHASES else IMPORT_STARTED) - IMPORT_STARTED) * 1000, 2),
 
-20: {"name": "Moon Level", "category": "Cosmic", "movement_speed": "Massive FTL", "reflex_speed": "Omniscient time-independent", "power": "0.5-2 petajoules", "resistance": "Survive lunar destruction", "examples": []},
+        "phases": {phase: ms for phase, ms, _ in STARTUP_PHASES}
 
-21: {"name": "Planet Level", "category": "Cosmic", "movement_speed": "Ultra FTL", "reflex_speed": "Transcendent perception", "power": "2-10 petajoules", "resistance": "Survive planet bursting", "examples": ["Superman (peak)", "Darkseid (true form)"]},
+    }
 
-22: {"name": "Large Planet Level", "category": "Cosmic", "movement_speed": "Ultra FTL", "reflex_speed": "Transcendent omniscience", "power": "10-50 petajoules", "resistance": "Survive Jupiter-scale destruction", "examples": ["Spectre (unrestrained)", "Perpetua", "Superboy Prime (absolute)"], "note": "KARMIC SYSTEM CAP"},
+mark_startup("imports")
 
-23: {"name": "Star Level", "category": "Abstract", "movement_speed": "Instantaneous/Omnipresent", "reflex_speed": "Absolute omniscience", "power": "50-250 petajoules", "resistance": "Survive supernovae", "examples": ["Darkseid (full)", "Anti-Monitor"], "note": "Beyond Karmic System"},
+# ================================================================================
 
-24: {"name": "Solar System / Galaxy", "category": "Abstract", "movement_speed": "Omnipresent", "reflex_speed": "Universal omniscience", "power": "0.25-1 exajoule+", "resistance": "Survive solar system destruction", "examples": ["Perpetua", "Monitors", "Mandrakk"], "note": "Beyond Karmic System"},
+# SECTION 1: RULES SYSTEM (rules.json, HOT-RELOADED)
 
-25: {"name": "Universal / Multiversal", "category": "Abstract", "movement_speed": "Omnipresent across dimensions", "reflex_speed": "Infinite omniscience", "power": "1 exajoule+", "resistance": "Survive universal erasure", "examples": ["The Presence", "The Source", "Cosmic Armor Superman"], "note": "Beyond Karmic System"}
+# ================================================================================
 
-},
+RULES_FILE = Path(os.environ.get("RULES_FILE", Path(__file__).resolve().parent / "rules.json"))
 
-"progression": {
+RULES_CHECK_INTERVAL = float(os.environ.get("RULES_CHECK_INTERVAL", "1.0"))
 
-"karmic_cap": 22,
+class RuleSection(Mapping):
 
-"universal_max": 25,
+    """
+    Immutable compiled rules node. Each section gets a slotted class, so values are read
+    as attributes (RULES.progression.karmic_cap); the Mapping interface keeps
+    RULES["progression"]["karmic_cap"], iteration and `in` working.
+    """
 
-"enhancement_formula": "ceil(10 * n^1.5)",
+    __slots__ = ()
 
-"max_enhancements": 85,
+    _keys = ()
 
-"max_enhancements_per_stat": 22
+    def __getitem__(self, key):
 
-},
+        if key not in self._keys:
 
-"abilities": {
+            raise KeyError(key)
 
-"max_active_per_character": 1,
+        return getattr(self, key)
 
-"domain_locked": True,
+    def __iter__(self):
 
-"reroll_formula": "ceil(10 * (n+1)^1.5)",
+        return iter(self._keys)
 
-"available_at_enhancement": 1
+    def __len__(self):
 
-},
+        return len(self._keys)
 
-"combat": {
+    def __setattr__(self, name, value):
 
-"stat_comparison_formula": "(actor_tier - defender_tier) * multiplier",
+        raise AttributeError("rules are immutable; edit rules.json instead")
 
-"skills_formula": "(skills + resourcefulness) - dc_modifier"
+    __delattr__ = __setattr__
 
-},
+    def __repr__(self):
 
-"premonition": {
+        return f"{type(self).__name__}({', '.join(self._keys)})"
 
-"resolution": "Binary - full DC reward on success, 0 DC on failure",
+class RuleSet(RuleSection):
 
-"dc_reward_formula": "(actor_tier * threat_tier)^1.55"
+    """Root of a compiled rules file: the sections plus version metadata and derived caches"""
 
-},
+    __slots__ = ("rules_version", "digest", "version_tag", "source", "loaded_at", "_derived")
 
-"armor": {
+RULE_SECTION_CLASSES = {}
 
-"destruction_condition": "If incoming attack_power_tier > armor_tier, armor is destroyed",
+def rule_section_class(keys):
 
-"effective_resilience": "If armor_tier > character_resilience_tier, use armor_tier for damage calculations"
+    if keys not in RULE_SECTION_CLASSES:
 
-}
+        RULE_SECTION_CLASSES[keys] = type("RuleSection", (RuleSection,), {"__slots__": keys, "_keys": keys})
 
-}
+    return RULE_SECTION_CLASSES[keys]
 
-# ================================================================================
+def is_rule_attribute(key):
 
-# SECTION 2: HELPER FUNCTION - Get Data from Request (POST JSON or GET Query)
+    return isinstance(key, str) and key.isidentifier() and not key.startswith("_") and not hasattr(RuleSet, key)
 
-# ================================================================================
+def compile_rules_node(value):
 
-def get_request_data():
     """
-    Universal data extractor - handles both POST (JSON) and GET (query params)
-    Returns dict with all parameters from either source
+    JSON value -> immutable rules value. Objects whose keys are all identifiers become
+    slotted RuleSections, other objects read-only mappings (digit keys such as tier
+    numbers become ints), lists tuples.
     """
-    if request.method == 'POST':
-        return request.get_json() or {}
-    else:  # GET
-        return request.args.to_dict()
-
-# ================================================================================
 
-# SECTION 3: FILE I/O UTILITIES
+    if isinstance(value, dict):
 
-# ================================================================================
+        children = {(int(key) if isinstance(key, str) and key.isdigit() else key): compile_rules_node(child) for key, child in value.items()}
 
-DATA_DIR = Path("./data")
+        if not all(is_rule_attribute(key) for key in children):
 
-DATA_DIR.mkdir(exist_ok=True)
+            return MappingProxyType(children)
 
-SESSIONS_DIR = DATA_DIR / "sessions"
+        node = rule_section_class(tuple(children)).__new__(rule_section_class(tuple(children)))
 
-SESSIONS_DIR.mkdir(exist_ok=True)
+        for key, child in children.items():
 
-def read_json_file(filepath):
+            object.__setattr__(node, key, child)
 
-    """Read JSON file. Returns None if not found or parse error."""
+        return node
 
-    if not filepath.exists():
+    if isinstance(value, list):
 
-        return None
+        return tuple(compile_rules_node(child) for child in value)
 
-    try:
+    return value
 
-        with open(filepath, 'r') as f:
+def thaw_rules(value):
 
-            return json.load(f)
+    """Compiled rules value -> plain JSON-serialisable data"""
 
-    except Exception as e:
+    if isinstance(value, Mapping):
 
-        return None
+        return {key: thaw_rules(child) for key, child in value.items()}
 
-def write_json_file(filepath, data):
+    if isinstance(value, tuple):
 
-    """Write data to JSON file. Creates parent directories if needed."""
+        return [thaw_rules(child) for child in value]
 
-    filepath.parent.mkdir(parents=True, exist_ok=True)
+    return value
 
-    try:
+def compile_rules(raw_bytes, source):
 
-        with open(filepath, 'w') as f:
+    """Compile a rules file ({"rules_version": ..., "rules": {section: ...}}) into a RuleSet"""
 
-            json.dump(data, f, indent=2)
+    document = json.loads(raw_bytes)
 
-        return True
+    sections = document["rules"]
 
-    except Exception as e:
+    missing = [section for section in ("system", "stat_multipliers", "tiers", "progression") if section not in sections]
 
-        return False
+    if missing:
 
-def get_character_state():
+        raise ValueError(f"rules file is missing sections: {missing}")
 
-    """Read character state from character.json"""
+    compiled = {key: compile_rules_node(child) for key, child in sections.items()}
 
-    char_file = DATA_DIR / "character.json"
+    rules = RuleSet.__new__(type("RuleSet", (RuleSet,), {"__slots__": tuple(compiled), "_keys": tuple(compiled)}))
 
-    return read_json_file(char_file)
+    for key, child in compiled.items():
 
-def save_character_state(character_data):
+        object.__setattr__(rules, key, child)
 
-    """Write character state to character.json"""
+    digest = hashlib.sha256(raw_bytes).hexdigest()[:12]
 
-    char_file = DATA_DIR / "character.json"
+    metadata = {
 
-    return write_json_file(char_file, character_data)
+        "rules_version": str(document.get("rules_version", "0")),
 
-def get_world_state():
+        "digest": digest,
 
-    """Read world state from world_state.json"""
+        "version_tag": f"{document.get('rules_version', '0')}+{digest}",
 
-    world_file = DATA_DIR / "world_state.json"
+        "source": str(source),
 
-    return read_json_file(world_file)
+        "loaded_at": datetime.now().isoformat(),
 
-def save_world_state(world_data):
+        "_derived": {}
 
-    """Write world state to world_state.json"""
+    }
 
-    world_file = DATA_DIR / "world_state.json"
+    for key, value in metadata.items():
 
-    return write_json_file(world_file, world_data)
+        object.__setattr__(rules, key, value)
 
-def get_hero_from_database(hero_name):
+    return rules
 
-    """Lookup hero from heroes_db.json by name"""
+FORMULA_FUNCTIONS = {
 
-    db_file = DATA_DIR / "heroes_db.json"
+    "ceil": math.ceil,
 
-    db = read_json_file(db_file)
+    "floor": math.floor,
 
-    if not db or "heroes" not in db:
+    "round": round,
 
-        return None
+    "abs": abs,
 
-    for hero in db.get("heroes", []):
+    "min": min,
 
-        if hero.get("name", "").lower() == hero_name.lower():
+    "max": max,
 
-            return hero
+    "sqrt": math.sqrt,
 
-    return None
+    "log": math.log
 
-def get_latest_session_number():
+}
 
-    """Get the highest session number from existing files"""
+FORMULA_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
 
-    if not SESSIONS_DIR.exists():
+                 ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd)
 
-        return 0
+class Formula:
 
-    session_files = list(SESSIONS_DIR.glob("session_*.json"))
+    """
+    A rules formula string ("ceil(10 * n^1.5)") compiled once. Only arithmetic, numeric
+    constants, declared variables and FORMULA_FUNCTIONS are accepted; ^ is power.
+    tabulate() precomputes every value over a bounded domain so calls become a lookup.
+    """
 
-    if not session_files:
+    __slots__ = ("source", "variables", "code", "inner", "table")
 
-        return 0
+    def __init__(self, source, variables):
 
-    numbers = []
+        self.source = source
 
-    for f in session_files:
+        self.variables = tuple(variables)
 
-        try:
+        tree = ast.parse(source.replace("^", "**"), mode="eval")
 
-            num = int(f.stem.split('_')[1])
+        for node in ast.walk(tree):
 
-            numbers.append(num)
+            if not isinstance(node, FORMULA_NODES):
 
-        except:
+                raise ValueError(f"formula '{source}': {type(node).__name__} is not allowed")
 
-            pass
+            if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
 
-    return max(numbers) if numbers else 0
+                raise ValueError(f"formula '{source}': only numeric constants are allowed")
 
-# ================================================================================
+            if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Name) or node.func.id not in FORMULA_FUNCTIONS or node.keywords):
 
-# SECTION 4: CALCULATION ENGINES
+                raise ValueError(f"formula '{source}': only {sorted(FORMULA_FUNCTIONS)} may be called")
 
-# ================================================================================
+            if isinstance(node, ast.Name) and node.id not in FORMULA_FUNCTIONS and node.id not in self.variables:
 
-def calculate_enhancement_cost(enhancement_number):
+                raise ValueError(f"formula '{source}': unknown variable '{node.id}' (expected {list(self.variables)})")
 
-    """Calculate DC cost for stat enhancement. Formula: ceil(10 * n^1.5)"""
+        self.code = compile(tree, "<formula>", "eval")
 
-    if enhancement_number < 1:
+        body = tree.body
 
-        return 0
+        # Value before the outer rounding, reported next to the result (e.g. the raw premonition DC)
 
-    return math.ceil(10 * (enhancement_number ** 1.5))
+        rounded = isinstance(body, ast.Call) and body.func.id in ("ceil", "floor", "round") and len(body.args) == 1
 
-def calculate_ability_reroll_cost(current_enhancement_number):
+        self.inner = Formula(ast.unparse(body.args[0]), variables) if rounded else None
 
-    """Calculate DC cost to reroll ability (next tier price, don't increment)"""
+        self.table = None
 
-    next_enhancement = current_enhancement_number + 1
+    def evaluate(self, **values):
 
-    return math.ceil(10 * (next_enhancement ** 1.5))
+        return eval(self.code, {"__builtins__": {}}, dict(FORMULA_FUNCTIONS, **values))
 
-def calculate_stat_advantage(actor_tier, defender_tier, stat_type):
+    def tabulate(self, domain):
 
-    """Calculate raw advantage for one stat comparison"""
+        """Precompute over domain {variable: iterable}; calls outside it still evaluate"""
 
-    if stat_type not in RULES["stat_multipliers"]:
+        keys = [()]
 
-        return {"error": f"Invalid stat_type '{stat_type}'"}
+        for variable in self.variables:
 
-    multiplier = RULES["stat_multipliers"][stat_type]
+            keys = [key + (value,) for key in keys for value in domain[variable]]
 
-    tier_difference = actor_tier - defender_tier
+        self.table = {key: self.evaluate(**dict(zip(self.variables, key))) for key in keys}
 
-    advantage = tier_difference * multiplier
+        return self
 
-    return {
+    def __call__(self, **values):
 
-        "stat_type": stat_type,
+        if self.table is not None:
 
-        "actor_tier": actor_tier,
+            result = self.table.get(tuple(map(values.__getitem__, self.variables)))
 
-        "defender_tier": defender_tier,
+            if result is not None:
 
-        "tier_difference": tier_difference,
+                return result
 
-        "multiplier": multiplier,
+        return self.evaluate(**values)
 
-        "advantage": round(advantage, 2)
+    def unrounded(self, **values):
 
-    }
+        return (self.inner or self).evaluate(**values)
 
-def calculate_skills_resourcefulness_advantage(actor_skills, actor_resourcefulness, actor_dc_mod,
+    def render(self, **values):
 
-    defender_skills, defender_resourcefulness, defender_dc_mod):
+        """Formula text with the values substituted, e.g. ceil(10 * 4^1.5)"""
 
-    """Calculate skills advantage with per-character DC modifiers"""
+        return re.sub(r"[A-Za-z_]\w*", lambda match: str(values.get(match.group(0), match.group(0))), self.source)
 
-    actor_effective = (actor_skills + actor_resourcefulness) - actor_dc_mod
+def compile_rule_formulas(rules):
 
-    defender_effective = (defender_skills + defender_resourcefulness) - defender_dc_mod
+    """
+    Compile the formula strings of a rule set: {name: Formula}. Formulas whose variables
+    all have bounded domains (tiers, enhancement numbers, multipliers) are tabulated.
+    """
 
-    advantage = actor_effective - defender_effective
+    tiers = range(0, rules.system.universal_max + 1)
 
-    return {
+    positive_tiers = range(1, rules.system.universal_max + 1)
 
-        "actor_raw_score": actor_skills + actor_resourcefulness,
+    enhancements = range(0, rules.progression.max_enhancements + 1)
 
-        "actor_dc_modifier": actor_dc_mod,
+    specs = {
 
-        "actor_effective_score": actor_effective,
+        "enhancement_cost": (rules.progression.enhancement_formula, {"n": enhancements}),
 
-        "defender_raw_score": defender_skills + defender_resourcefulness,
+        "reroll_cost": (rules.abilities.reroll_formula, {"n": enhancements}),
 
-        "defender_dc_modifier": defender_dc_mod,
+        "premonition_dc": (rules.premonition.dc_reward_formula, {"actor_tier": positive_tiers, "threat_tier": positive_tiers}),
 
-        "defender_effective_score": defender_effective,
+        "stat_comparison": (rules.combat.stat_comparison_formula, {"actor_tier": tiers, "defender_tier": tiers, "multiplier": sorted(set(rules.stat_multipliers.values()))}),
 
-        "advantage": round(advantage, 2)
+        "skills": (rules.combat.skills_formula, {"skills": None, "resourcefulness": None, "dc_modifier": None})
 
     }
 
-def calculate_premonition_dc(actor_tier, threat_tier):
+    formulas = {}
 
-    """Calculate DC reward for premonition. Formula: (actor_tier * threat_tier)^1.55"""
+    for name, (source, domain) in specs.items():
 
-    dc_float = (actor_tier * threat_tier) ** 1.55
+        formula = Formula(source, domain)
 
-    return int(math.ceil(dc_float))
+        formulas[name] = formula.tabulate(domain) if all(values is not None for values in domain.values()) else formula
 
-def calculate_armor_status(attack_power_tier, armor_tier, character_resilience_tier):
+    return formulas
 
-    """Determine if armor is destroyed and effective resilience"""
+# Derived structures rebuilt once per rule set, e.g. the tier catalog: {name: builder(rules)}
 
-    armor_destroyed = attack_power_tier > armor_tier
+RULE_DERIVATIONS = {"formulas": compile_rule_formulas}
 
-    effective_resilience = max(armor_tier, character_resilience_tier)
+class RulesStore:
 
-    return {
+    """
+    Holds the current compiled RuleSet. refresh() re-stats the file at most every
+    RULES_CHECK_INTERVAL seconds; a changed file is compiled and its derived structures
+    warmed before the new set replaces the old one in a single reference swap, so
+    in-flight requests finish on the set they started with. A file that fails to load
+    keeps the previous set and is reported in last_error.
+    """
 
-        "attack_power_tier": attack_power_tier,
+    def __init__(self, path, check_interval):
 
-        "armor_tier": armor_tier,
+        self.path = path
 
-        "character_resilience_tier": character_resilience_tier,
+        self.check_interval = check_interval
 
-        "armor_destroyed": armor_destroyed,
+        self.lock = threading.Lock()
 
-        "effective_resilience_for_damage": effective_resilience
+        self.current = None
 
-    }
+        self.signature = None
 
-# ================================================================================
+        self.checked_at = 0.0
 
-# SECTION 5: ENDPOINTS - SYSTEM & STATUS (GET + POST)
+        self.reloads = 0
 
-# ================================================================================
+        self.last_error = None
 
-@app.route('/health', methods=['GET', 'POST'])
+        self.refresh(force=True)
 
-def health_check():
+    def refresh(self, force=False):
 
-    """Health check - verify Flask online"""
+        now = time.monotonic()
 
-    return jsonify({
+        if not force and now - self.checked_at < self.check_interval:
 
-        "status": "ONLINE",
+            return self.current
 
-        "engine": RULES["system"]["name"],
+        with self.lock:
 
-        "version": RULES["system"]["version"],
+            if not force and now - self.checked_at < self.check_interval:
 
-        "timestamp": datetime.now().isoformat()
+                return self.current
 
-    }), 200
+            self.checked_at = now
 
-@app.route('/rules/summary', methods=['GET', 'POST'])
+            try:
 
-def rules_summary():
+                stat = self.path.stat()
 
-    """Get system rules and constants"""
+                signature = (stat.st_mtime_ns, stat.st_size)
 
-    return jsonify({
+                if signature == self.signature and self.current is not None:
 
-        "status": "SUCCESS",
+                    return self.current
 
-        "system": RULES["system"],
+                rules = compile_rules(self.path.read_bytes(), self.path)
 
-        "stat_multipliers": RULES["stat_multipliers"],
+                for name, builder in RULE_DERIVATIONS.items():
 
-        "progression": RULES["progression"],
+                    rules._derived[name] = builder(rules)
 
-        "abilities": RULES["abilities"],
+            except Exception as e:
 
-        "timestamp": datetime.now().isoformat()
+                if self.current is None:
 
-    }), 200
+                    raise
 
-@app.route('/session/current', methods=['GET', 'POST'])
+                self.last_error = {"message": str(e), "at": datetime.now().isoformat()}
 
-def session_current():
+                return self.current
 
-    """Get current session number and status"""
+            if self.current is not None:
 
-    session_num = get_latest_session_number()
+                self.reloads += 1
 
-    if session_num == 0:
+            self.current, self.signature, self.last_error = rules, signature, None
 
-        session_num = 1
+            return rules
 
-    session_file = SESSIONS_DIR / f"session_{session_num}.json"
+    def status(self):
 
-    session_exists = session_file.exists()
+        return {
 
-    return jsonify({
+            "version": self.current.version_tag,
 
-        "status": "SUCCESS",
+            "source": self.current.source,
 
-        "current_session_number": session_num,
+            "loaded_at": self.current.loaded_at,
 
-        "session_file_path": str(session_file),
+            "reloads": self.reloads,
 
-        "session_exists": session_exists,
+            "last_error": self.last_error
 
-        "timestamp": datetime.now().isoformat()
+        }
 
-    }), 200
+RULES_STORE = RulesStore(RULES_FILE, RULES_CHECK_INTERVAL)
 
-# ================================================================================
+def current_rules():
 
-# SECTION 6: ENDPOINTS - COMBAT CALCULATIONS (GET + POST)
+    """The rule set of this request (pinned in before_request), else the latest"""
 
-# ================================================================================
+    if has_request_context() and "rules" in g:
 
-@app.route('/calculate/stat_advantage', methods=['GET', 'POST'])
+        return g.rules
 
-def calculate_stat_advantage_endpoint():
+    return RULES_STORE.current
 
-    """Compare one stat between two entities - GET query params or POST JSON"""
+def rules_derived(name):
 
-    try:
+    """Derived structure for the current rule set, built on first use"""
 
-        data = get_request_data()
+    rules = current_rules()
 
-        actor_tier = int(data.get("actor_tier", 0))
+    if name not in rules._derived:
 
-        defender_tier = int(data.get("defender_tier", 0))
+        rules._derived[name] = RULE_DERIVATIONS[name](rules)
 
-        stat_type = data.get("stat_type", "").lower()
+    return rules._derived[name]
 
-        valid_stats = list(RULES["stat_multipliers"].keys())
+def rule_formula(name):
 
-        if stat_type not in valid_stats:
+    """Compiled formula of the current rule set (see compile_rule_formulas)"""
 
-            return jsonify({
+    return rules_derived("formulas")[name]
 
-                "status": "ERROR",
+class RulesProxy:
 
-                "reason": "invalid_stat_type",
+    """Module-level RULES: forwards to the current rule set, so reloads need no rebinding"""
 
-                "message": f"stat_type must be one of: {valid_stats}",
+    __slots__ = ()
 
-                "timestamp": datetime.now().isoformat()
+    def __getattr__(self, name):
 
-            }), 400
+        return getattr(current_rules(), name)
 
-        comparison = calculate_stat_advantage(actor_tier, defender_tier, stat_type)
+    def __getitem__(self, key):
 
-        return jsonify({
+        return current_rules()[key]
 
-            "status": "SUCCESS",
+    def __iter__(self):
 
-            "comparison": comparison,
+        return iter(current_rules())
 
-            "timestamp": datetime.now().isoformat()
+    def __contains__(self, key):
 
-        }), 200
+        return key in current_rules()
 
-    except Exception as e:
+RULES = RulesProxy()
 
-        return jsonify({
+mark_startup("rules")
 
-            "status": "ERROR",
+@app.before_request
 
-            "reason": "calculation_failed",
+def pin_rules():
 
-            "message": str(e),
+    """Check rules.json for changes and pin one rule set for the whole request (a /batch pins it for all its calls)"""
 
-            "timestamp": datetime.now().isoformat()
+    if "rules" not in g:
 
-        }), 500
+        g.rules = RULES_STORE.refresh()
 
-@app.route('/calculate/combat', methods=['GET', 'POST'])
+@app.after_request
 
-def calculate_combat():
+def add_rules_version(response):
 
-    """Full combat calculation - all stats + skills/resourcefulness"""
+    """Expose the rules version on every response so clients can key caches on it"""
 
-    try:
+    response.headers["X-Rules-Version"] = current_rules().version_tag
 
-        data = get_request_data()
+    return response
 
-        # Extract actor data
-        actor_speed_tier = int(data.get("actor_speed_tier", 1))
-        actor_reflexes_tier = int(data.get("actor_reflexes_tier", 1))
-        actor_power_tier = int(data.get("actor_power_tier", 1))
-        actor_resistance_tier = int(data.get("actor_resistance_tier", 1))
-        actor_skills = int(data.get("actor_skills", 0))
-        actor_resourcefulness = int(data.get("actor_resourcefulness", 0))
-        actor_dc_mod = int(data.get("actor_dc_modifier", 0))
+# ================================================================================
 
-        # Extract defender data
-        defender_speed_tier = int(data.get("defender_speed_tier", 1))
-        defender_reflexes_tier = int(data.get("defender_reflexes_tier", 1))
-        defender_power_tier = int(data.get("defender_power_tier", 1))
-        defender_resistance_tier = int(data.get("defender_resistance_tier", 1))
-        defender_skills = int(data.get("defender_skills", 0))
-        defender_resourcefulness = int(data.get("defender_resourcefulness", 0))
-        defender_dc_mod = int(data.get("defender_dc_modifier", 0))
+# SECTION 2: HELPER FUNCTION - Get Data from Request (POST JSON or GET Query)
 
-        speed_adv = calculate_stat_advantage(actor_speed_tier, defender_speed_tier, "speed")
-        reflexes_adv = calculate_stat_advantage(actor_reflexes_tier, defender_reflexes_tier, "reflexes")
-        power_adv = calculate_stat_advantage(actor_power_tier, defender_power_tier, "power")
-        resistance_adv = calculate_stat_advantage(actor_resistance_tier, defender_resistance_tier, "resistance")
+# ================================================================================
 
-        stat_total = (speed_adv.get("advantage", 0) +
-                     reflexes_adv.get("advantage", 0) +
-                     power_adv.get("advantage", 0) +
-                     resistance_adv.get("advantage", 0))
+BRACKET_KEY_PATTERN = re.compile(r"^([^\[\]]+)((?:\[[^\[\]]*\])+)$")
 
-        skills_adv = calculate_skills_resourcefulness_advantage(
-            actor_skills, actor_resourcefulness, actor_dc_mod,
-            defender_skills, defender_resourcefulness, defender_dc_mod
-        )
+BRACKET_PART_PATTERN = re.compile(r"\[([^\[\]]*)\]")
 
-        return jsonify({
+ROUTE_SCHEMAS = {}
 
-            "status": "SUCCESS",
+def get_request_data():
 
-            "combat_data": {
+    """
+    Universal data extractor - handles both POST (JSON) and GET (query params)
+    Returns dict with all parameters from either source.
+    When the route declares a parameter schema, returns the validated params instead.
+    """
 
-                "stat_advantages": {
+    if "params" in g:
 
-                    "speed": speed_adv,
+        return g.params
 
-                    "reflexes": reflexes_adv,
+    if "request_body" in g:
 
-                    "power": power_adv,
+        return g.request_body
 
-                    "resistance": resistance_adv
+    if request.method == 'POST':
 
-                },
+        return request.get_json() or {}
 
-                "stat_total_advantage": round(stat_total, 2),
+    else:  # GET
 
-                "skills_resourcefulness_advantage": skills_adv
+        return decode_query_args(request.args)
 
-            },
+def decode_scalar(text):
 
-            "timestamp": datetime.now().isoformat()
+    """Bracket-notation leaf: JSON scalar if it parses as one (50, true, null), else the string"""
 
-        }), 200
+    try:
 
-    except Exception as e:
+        value = json.loads(text)
 
-        return jsonify({
+    except ValueError:
 
-            "status": "ERROR",
+        return text
 
-            "reason": "combat_calculation_failed",
+    return value if not isinstance(value, (dict, list)) else text
 
-            "message": str(e),
+def decode_query_args(args):
 
-            "timestamp": datetime.now().isoformat()
+    """
+    Decode a query-string MultiDict into nested params:
+      key=a&key=b          -> {"key": ["a", "b"]}
+      updates[gotham]=50   -> {"updates": {"gotham": 50}}
+      ids[]=1&ids[]=2      -> {"ids": [1, 2]}
+    JSON-valued params (key={"a": 1}) stay strings here; the route schema decodes them.
+    """
 
-        }), 500
+    result = {}
 
-# ================================================================================
+    for key in args:
 
-# SECTION 7: ENDPOINTS - ADVANCEMENT SYSTEM (GET + POST)
+        values = args.getlist(key)
 
-# ================================================================================
+        match = BRACKET_KEY_PATTERN.match(key)
 
-@app.route('/calculate/enhancement_cost', methods=['GET', 'POST'])
+        if not match:
 
-def calculate_enhancement_cost_endpoint():
+            result[key] = values[0] if len(values) == 1 else values
 
-    """Calculate cost to enhance a stat"""
+            continue
 
-    try:
+        path = [match.group(1)] + BRACKET_PART_PATTERN.findall(match.group(2))
 
-        data = get_request_data()
+        node = result
 
-        enhancement_number = int(data.get("enhancement_number", 1))
+        for part in path[:-1]:
 
-        max_enh = RULES["progression"]["max_enhancements"]
+            if not isinstance(node.get(part), dict):
 
-        if enhancement_number < 1 or enhancement_number > max_enh:
+                node[part] = {}
 
-            return jsonify({
+            node = node[part]
 
-                "status": "ERROR",
+        leaf = path[-1]
 
-                "reason": "invalid_enhancement_number",
+        if leaf == "":
 
-                "message": f"enhancement_number must be 1-{max_enh}",
+            # key[]=x appends; the parent key holds the list
 
-                "timestamp": datetime.now().isoformat()
+            parent_path, list_key = path[:-2], path[-2]
 
-            }), 400
+            node = result
 
-        cost = calculate_enhancement_cost(enhancement_number)
+            for part in parent_path:
 
-        return jsonify({
+                node = node[part]
 
-            "status": "SUCCESS",
+            node[list_key] = [decode_scalar(value) for value in values]
 
-            "enhancement_number": enhancement_number,
+        else:
 
-            "dc_cost": cost,
+            node[leaf] = decode_scalar(values[0]) if len(values) == 1 else [decode_scalar(value) for value in values]
 
-            "formula": f"ceil(10 * {enhancement_number}^1.5) = {cost}",
+    return result
 
-            "timestamp": datetime.now().isoformat()
+def coerce_param(value, param_type):
 
-        }), 200
+    """Coerce one raw parameter to its schema type. Raises ValueError with a readable message."""
 
-    except Exception as e:
+    if param_type == "int":
 
-        return jsonify({
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
 
-            "status": "ERROR",
+            raise ValueError("must be an integer")
 
-            "reason": "enhancement_calculation_failed",
+        return int(value)
 
-            "message": str(e),
+    if param_type == "float":
 
-            "timestamp": datetime.now().isoformat()
+        if isinstance(value, bool):
 
-        }), 500
+            raise ValueError("must be a number")
 
-@app.route('/character/enhance_stat', methods=['GET', 'POST'])
+        return float(value)
 
-def enhance_stat():
+    if param_type == "bool":
 
-    """Enhance a character stat (tier up), spend DC from balance"""
+        if isinstance(value, bool):
 
-    try:
+            return value
 
-        data = get_request_data()
+        text = str(value).strip().lower()
 
-        stat_name = data.get("stat", "").lower()
+        if text not in ("true", "false", "1", "0", "yes", "no"):
 
-        dc_to_spend = int(data.get("dc_amount", 0))
+            raise ValueError("must be true or false")
 
-        # Load character state
+        return text in ("true", "1", "yes")
 
-        character = get_character_state()
+    if param_type == "str":
 
-        if not character:
+        if isinstance(value, (dict, list)):
 
-            return jsonify({
+            raise ValueError("must be a string")
 
-                "status": "ERROR",
+        return str(value)
 
-                "reason": "character_not_found",
+    if param_type == "object":
 
-                "message": "character.json not found",
+        if isinstance(value, str):
 
-                "timestamp": datetime.now().isoformat()
+            value = json.loads(value)
 
-            }), 404
+        if not isinstance(value, dict):
 
-        # Validate stat
+            raise ValueError("must be a JSON object")
 
-        if stat_name not in RULES["system"]["stats"]:
+        return value
 
-            return jsonify({
+    if param_type == "list":
 
-                "status": "ERROR",
+        if isinstance(value, str):
 
-                "reason": "invalid_stat",
+            value = json.loads(value) if value.lstrip().startswith("[") else [part.strip() for part in value.split(",") if part.strip()]
 
-                "message": f"stat must be one of: {RULES['system']['stats']}",
+        if isinstance(value, dict):
 
-                "timestamp": datetime.now().isoformat()
+            value = [value[key] for key in sorted(value, key=lambda k: int(k) if str(k).isdigit() else k)]
 
-            }), 400
+        if not isinstance(value, list):
 
-        # Check DC balance
+            value = [value]
 
-        dc_balance = character.get("advancement", {}).get("dc_balance", {}).get("current_balance", 0)
+        return value
 
-        if dc_balance < dc_to_spend:
+    raise ValueError(f"unknown schema type '{param_type}'")
 
-            return jsonify({
+TYPE_NAMES = {"int": "an integer", "float": "a number", "bool": "true or false", "str": "a string", "object": "a JSON object", "list": "a list"}
 
-                "status": "ERROR",
+def compile_param_schema(fields):
 
-                "reason": "insufficient_dc",
+    """
+    Compile a route parameter schema once into a validator.
+    fields: {name: {"type": int|float|bool|str|object|list, "default": ..., "required": bool,
+                    "min": n, "max": n, "choices": [...], "items": type}}
+    str params are stripped; str params with choices are matched case-insensitively.
+    Returns validator(data) -> (params, errors), reporting every bad field at once.
+    Undeclared params pass through untouched.
+    """
 
-                "message": f"Required: {dc_to_spend} DC, Current: {dc_balance} DC",
+    compiled = []
 
-                "timestamp": datetime.now().isoformat()
+    for name, spec in fields.items():
 
-            }), 400
+        checks = []
 
-        # Get current tier
+        param_type = spec.get("type", "str")
 
-        current_tier = character.get("tiers", {}).get(stat_name, 1)
+        if "min" in spec and "max" in spec:
 
-        # Check if already at Karmic cap
+            low, high = spec["min"], spec["max"]
 
-        if current_tier >= RULES["progression"]["karmic_cap"]:
+            checks.append((lambda v, low=low, high=high: low <= v <= high, "out_of_range", f"must be between {low} and {high}"))
 
-            return jsonify({
+        elif "min" in spec:
 
-                "status": "ERROR",
+            low = spec["min"]
 
-                "reason": "karmic_cap_reached",
+            checks.append((lambda v, low=low: v >= low, "out_of_range", f"must be >= {low}"))
 
-                "message": f"Cannot enhance beyond Tier {RULES['progression']['karmic_cap']} via Karmic System",
+        elif "max" in spec:
 
-                "timestamp": datetime.now().isoformat()
+            high = spec["max"]
 
-            }), 400
+            checks.append((lambda v, high=high: v <= high, "out_of_range", f"must be <= {high}"))
 
-        # Update character state
+        if "choices" in spec:
 
-        character["tiers"][stat_name] = current_tier + 1
+            choices = frozenset(spec["choices"])
 
-        character["advancement"]["dc_balance"]["current_balance"] -= dc_to_spend
+            checks.append((lambda v, choices=choices: v in choices, "invalid_choice", f"must be one of: {list(spec['choices'])}"))
 
-        character["advancement"]["dc_balance"]["spent_total"] += dc_to_spend
+        normalize = None
 
-        # Add to log
+        if param_type == "str":
 
-        if "enhancement_log" not in character["advancement"]:
+            normalize = (lambda v: v.strip().lower()) if "choices" in spec else (lambda v: v.strip())
 
-            character["advancement"]["enhancement_log"] = []
+        compiled.append((name, param_type, spec.get("items"), normalize, tuple(checks), spec.get("required", False), spec.get("default")))
 
-        character["advancement"]["enhancement_log"].append({
+    def validator(data):
 
-            "timestamp": datetime.now().isoformat(),
+        params = dict(data)
 
-            "stat": stat_name,
+        errors = []
 
-            "from_tier": current_tier,
+        for name, param_type, item_type, normalize, checks, required, default in compiled:
 
-            "to_tier": current_tier + 1,
+            raw = data.get(name)
 
-            "dc_spent": dc_to_spend
+            if raw is None or raw == "":
 
-        })
+                if required:
 
-        # Save
+                    errors.append({"field": name, "error": "required", "message": f"{name} is required"})
 
-        save_character_state(character)
+                else:
 
-        return jsonify({
+                    params[name] = default() if callable(default) else default
 
-            "status": "SUCCESS",
+                continue
 
-            "action": "stat_enhanced",
+            try:
 
-            "stat": stat_name,
+                value = coerce_param(raw, param_type)
 
-            "previous_tier": current_tier,
+                if item_type is not None:
 
-            "new_tier": current_tier + 1,
+                    value = [coerce_param(item, item_type) for item in value]
 
-            "dc_spent": dc_to_spend,
+            except (ValueError, TypeError) as e:
 
-            "dc_balance_after": character["advancement"]["dc_balance"]["current_balance"],
+                expected = f"a list of {item_type} values" if item_type else TYPE_NAMES[param_type]
 
-            "timestamp": datetime.now().isoformat()
+                errors.append({"field": name, "error": "invalid_type", "message": f"{name} {e}" if str(e).startswith("must") else f"{name} must be {expected}"})
 
-        }), 200
+                continue
 
-    except Exception as e:
+            if normalize is not None:
 
-        return jsonify({
+                value = normalize(value)
 
-            "status": "ERROR",
+            for check, error, message in checks:
 
-            "reason": "enhancement_failed",
+                if not check(value):
 
-            "message": str(e),
+                    errors.append({"field": name, "error": error, "message": f"{name} {message}"})
 
-            "timestamp": datetime.now().isoformat()
+                    break
 
-        }), 500
+            params[name] = value
 
-# ================================================================================
+        return params, errors
 
-# SECTION 8: ENDPOINTS - PREMONITION SYSTEM (GET + POST)
+    return validator
 
-# ================================================================================
+class RuleRef:
 
-@app.route('/calculate/premonition_dc', methods=['GET', 'POST'])
+    """
+    Schema value read from the rule set that validates the request, e.g.
+    {"max": RuleRef("system.universal_max")}; transform(value) adapts it (e.g. list).
+    """
 
-def calculate_premonition_dc_endpoint():
+    __slots__ = ("path", "transform")
 
-    """Calculate DC reward for premonition"""
+    def __init__(self, path, transform=None):
 
-    try:
+        self.path = path
 
-        data = get_request_data()
+        self.transform = transform
 
-        actor_tier = int(data.get("actor_tier", 1))
+    def resolve(self, rules):
 
-        threat_tier = int(data.get("threat_tier", 1))
+        value = rules
 
-        if actor_tier < 1 or threat_tier < 1:
+        for part in self.path.split("."):
 
-            return jsonify({
+            value = getattr(value, part)
 
-                "status": "ERROR",
+        return self.transform(value) if self.transform else value
 
-                "reason": "invalid_tier_values",
+def resolve_rule_refs(fields, rules):
 
-                "message": "actor_tier and threat_tier must be >= 1",
+    """Schema fields with every RuleRef replaced by its value in rules"""
 
-                "timestamp": datetime.now().isoformat()
+    return {name: {key: value.resolve(rules) if isinstance(value, RuleRef) else value for key, value in spec.items()} for name, spec in fields.items()}
 
-            }), 400
+def route_validator(view_name, rules=None):
 
-        raw_value = (actor_tier * threat_tier) ** 1.55
+    """
+    Validator of a route for a rule set, compiled on first use and cached on the rule
+    set, so a rules.json reload (new tier cap, stat list, limits) recompiles it.
+    """
 
-        dc_reward = calculate_premonition_dc(actor_tier, threat_tier)
+    rules = rules or current_rules()
 
-        return jsonify({
+    key = ("param_schema", view_name)
 
-            "status": "SUCCESS",
+    validator = rules._derived.get(key)
 
-            "dc_reward": dc_reward,
+    if validator is None:
 
-            "calculation": {
+        fields = ROUTE_SCHEMAS[view_name]
 
-                "actor_tier": actor_tier,
+        validator = rules._derived[key] = compile_param_schema(resolve_rule_refs(fields(rules) if callable(fields) else fields, rules))
 
-                "threat_tier": threat_tier,
+    return validator
 
-                "formula": "(actor_tier * threat_tier)^1.55",
+def validate_params(fields, prepare=None):
 
-                "raw_value": round(raw_value, 2)
+    """
+    Route decorator: decode request params against a schema. fields is a dict, or
+    fields(rules) -> dict when the param names themselves depend on the rules; values
+    may be RuleRefs. The schema is compiled per rule set (the current one at import).
+    prepare(raw) -> (raw, errors) may fill in raw params before validation (e.g. hero stats).
+    """
 
-            },
+    def decorator(view):
 
-            "timestamp": datetime.now().isoformat()
+        ROUTE_SCHEMAS[view.__name__] = fields
 
-        }), 200
+        route_validator(view.__name__, RULES_STORE.current)
 
-    except Exception as e:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
 
-        return jsonify({
+            data = get_request_data()
 
-            "status": "ERROR",
+            if not isinstance(data, dict):
 
-            "reason": "premonition_calculation_failed",
+                return jsonify({
 
-            "message": str(e),
+                    "status": "ERROR",
 
-            "timestamp": datetime.now().isoformat()
+                    "reason": "invalid_parameters",
 
-        }), 500
+                    "message": "request body must be a JSON object",
 
-@app.route('/character/premonition/resolve', methods=['GET', 'POST'])
+                    "errors": [{"field": None, "error": "invalid_type", "message": "request body must be a JSON object"}],
 
-def resolve_premonition():
+                    "timestamp": datetime.now().isoformat()
 
-    """Resolve premonition - award or deny DC points"""
+                }), 400
 
-    try:
+            raw, prepare_errors = prepare(data) if prepare else (data, [])
 
-        data = get_request_data()
+            params, errors = route_validator(view.__name__)(raw)
 
-        success = data.get("success", "false").lower() == "true"
+            errors = prepare_errors + errors
 
-        actor_tier = int(data.get("actor_tier", 1))
+            if errors:
 
-        threat_tier = int(data.get("threat_tier", 1))
+                return jsonify({
 
-        # Calculate DC if success
+                    "status": "ERROR",
 
-        dc_awarded = 0
+                    "reason": "invalid_parameters",
 
-        if success:
+                    "message": "; ".join(error["message"] for error in errors),
 
-            dc_awarded = calculate_premonition_dc(actor_tier, threat_tier)
+                    "errors": errors,
 
-        # Load character
+                    "timestamp": datetime.now().isoformat()
 
-        character = get_character_state()
+                }), 400
 
-        if not character:
+            g.params = params
 
-            return jsonify({
+            return view(*args, **kwargs)
 
-                "status": "ERROR",
+        return wrapper
 
-                "reason": "character_not_found",
+    return decorator
 
-                "message": "character.json not found",
+# Response compression
 
-                "timestamp": datetime.now().isoformat()
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
 
-            }), 404
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/x-ndjson", "text/plain")
 
-        # Update character state
+CONTENT_CODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
 
-        if "dc_balance" not in character.get("advancement", {}):
+# Compressed bodies of ETag'd responses, keyed by (etag, coding) - each is compressed once
 
-            character["advancement"]["dc_balance"] = {"current_balance": 0, "earned_total": 0, "spent_total": 0}
+COMPRESSED_BODIES = OrderedDict()
 
-        character["advancement"]["dc_balance"]["current_balance"] += dc_awarded
+COMPRESSED_BODIES_MAX = 256
 
-        character["advancement"]["dc_balance"]["earned_total"] += dc_awarded
+COMPRESSED_BODIES_LOCK = threading.Lock()
 
-        # Track premonition
+def compress_body(body, coding):
 
-        if "premonitions_completed" not in character["advancement"]:
+    if coding == "br":
 
-            character["advancement"]["premonitions_completed"] = []
+        return brotli.compress(body, quality=5)
 
-        character["advancement"]["premonitions_completed"].append({
+    return gzip.compress(body, compresslevel=6, mtime=0)
 
-            "timestamp": datetime.now().isoformat(),
+def cached_compressed_body(etag, body, coding):
 
-            "success": success,
+    key = (etag, coding)
 
-            "actor_tier": actor_tier,
+    with COMPRESSED_BODIES_LOCK:
 
-            "threat_tier": threat_tier,
+        encoded = COMPRESSED_BODIES.get(key)
 
-            "dc_awarded": dc_awarded
+        if encoded is not None:
 
-        })
+            COMPRESSED_BODIES.move_to_end(key)
 
-        # Save
+            return encoded
 
-        save_character_state(character)
+    encoded = compress_body(body, coding)
 
-        return jsonify({
+    with COMPRESSED_BODIES_LOCK:
 
-            "status": "SUCCESS",
+        COMPRESSED_BODIES[key] = encoded
 
-            "action": "premonition_resolved",
+        while len(COMPRESSED_BODIES) > COMPRESSED_BODIES_MAX:
 
-            "success": success,
+            COMPRESSED_BODIES.popitem(last=False)
 
-            "dc_awarded": dc_awarded,
+    return encoded
 
-            "new_dc_balance": character["advancement"]["dc_balance"]["current_balance"],
+class RenderedPayload:
 
-            "timestamp": datetime.now().isoformat()
+    """
+    A JSON payload rendered once into bytes with a content ETag - for responses that
+    only change with a state or rules version and are cached per version. Its
+    compressed variants come from COMPRESSED_BODIES, so repeat reads cost neither
+    serialization nor compression.
+    """
 
-        }), 200
+    __slots__ = ("body", "etag")
 
-    except Exception as e:
+    def __init__(self, payload):
 
-        return jsonify({
+        self.body = (app.json.dumps(payload) + "\n").encode("utf-8")
 
-            "status": "ERROR",
+        self.etag = hashlib.sha256(self.body).hexdigest()[:16]
 
-            "reason": "premonition_resolution_failed",
+    def response(self):
 
-            "message": str(e),
+        response = Response(self.body, mimetype="application/json")
 
-            "timestamp": datetime.now().isoformat()
+        response.set_etag(self.etag)
 
-        }), 500
+        return response.make_conditional(request)
 
-# ================================================================================
+@app.after_request
 
-# SECTION 9: ENDPOINTS - ABILITY SYSTEM (GET + POST)
+def compress_response(response):
 
-# ================================================================================
+    """
+    Negotiated gzip/br (br only when the brotli package is installed) for JSON and text
+    bodies of at least COMPRESS_MIN_BYTES. Responses with an ETag are compressed once
+    per coding and served from the cache; their ETag is weakened since the bytes differ.
+    """
 
-@app.route('/calculate/ability_reroll_cost', methods=['GET', 'POST'])
+    if (response.direct_passthrough or response.is_streamed or "Content-Encoding" in response.headers
 
-def calculate_ability_reroll_cost_endpoint():
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
 
-    """Calculate cost to reroll ability"""
+        return response
 
-    try:
+    response.vary.add("Accept-Encoding")
 
-        data = get_request_data()
+    if response.status_code != 200:
 
-        current_enhancement = int(data.get("current_enhancement_number", 1))
+        return response
 
-        if current_enhancement < 1:
+    coding = request.accept_encodings.best_match(CONTENT_CODINGS)
 
-            return jsonify({
+    body = response.get_data()
 
-                "status": "ERROR",
+    if coding is None or len(body) < COMPRESS_MIN_BYTES:
 
-                "reason": "cannot_reroll_nonexistent_ability",
+        return response
 
-                "message": "Ability must exist (enhancement >= 1) to reroll",
+    etag, weak = response.get_etag()
 
-                "timestamp": datetime.now().isoformat()
+    if etag:
 
-            }), 400
+        response.set_data(cached_compressed_body(etag, body, coding))
 
-        reroll_cost = calculate_ability_reroll_cost(current_enhancement)
+        response.set_etag(etag, weak=True)
 
-        return jsonify({
+    else:
 
-            "status": "SUCCESS",
+        response.set_data(compress_body(body, coding))
 
-            "current_enhancement_number": current_enhancement,
+    response.headers["Content-Encoding"] = coding
 
-            "reroll_cost": reroll_cost,
+    return response
 
-            "next_enhancement_number": current_enhancement + 1,
+# Shared parameter schema fragments
 
-            "timestamp": datetime.now().isoformat()
+TIER_PARAM = {"type": "int", "min": 0, "max": RuleRef("system.universal_max")}
 
-        }), 200
+POSITIVE_TIER_PARAM = {"type": "int", "min": 1, "max": RuleRef("system.universal_max")}
 
-    except Exception as e:
+ATTRIBUTE_PARAM = {"type": "int", "min": RuleRef("attributes.min"), "max": RuleRef("attributes.max"), "default": 0}
 
-        return jsonify({
+ENHANCEMENT_PARAM = {"type": "int", "min": 1, "max": RuleRef("progression.max_enhancements"), "default": 1}
 
-            "status": "ERROR",
+DC_AMOUNT_PARAM = {"type": "int", "min": 0, "default": 0}
 
-            "reason": "reroll_calculation_failed",
+mark_startup("schemas")
 
-            "message": str(e),
+# ================================================================================
 
-            "timestamp": datetime.now().isoformat()
+# SECTION 3: FILE I/O UTILITIES
 
-        }), 500
+# ================================================================================
 
-@app.route('/character/ability/manifest', methods=['GET', 'POST'])
+DATA_DIR = Path(os.environ.get("DATA_DIR", "./data"))
 
-def manifest_ability():
+DATA_DIR.mkdir(exist_ok=True)
 
-    """Grant an ability to character"""
+SESSIONS_DIR = DATA_DIR / "sessions"
 
-    try:
+SESSIONS_DIR.mkdir(exist_ok=True)
 
-        data = get_request_data()
+CAMPAIGNS_DIR = DATA_DIR / "campaigns"
 
-        ability_name = data.get("ability_name", "")
+DEFAULT_CAMPAIGN_ID = "default"
 
-        domain = data.get("domain", "")
+CAMPAIGN_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
 
-        enhancement_level = int(data.get("enhancement_level", 1))
+MAX_RESIDENT_CAMPAIGNS = int(os.environ.get("MAX_RESIDENT_CAMPAIGNS", "32"))
 
-        if not ability_name or not domain:
+# sync: every save rewrites its document. group: saves update the cached document (and
+# its version history) at once; dirty documents are written within GROUP_COMMIT_INTERVAL
+# seconds, at /batch end, on eviction, at exit, or immediately for durable=true requests.
+# wal: every save appends a diff record to wal/<document>.jsonl before it is applied; the
+# full document is only rewritten as a checkpoint every WAL_CHECKPOINT_RECORDS records.
 
-            return jsonify({
+WRITE_MODE = os.environ.get("WRITE_MODE", "sync").strip().lower()
 
-                "status": "ERROR",
+GROUP_COMMIT_INTERVAL = float(os.environ.get("GROUP_COMMIT_INTERVAL", "0.5"))
 
-                "reason": "missing_fields",
+WAL_CHECKPOINT_RECORDS = int(os.environ.get("WAL_CHECKPOINT_RECORDS", "100"))
 
-                "message": "ability_name and domain required",
+WAL_FSYNC = os.environ.get("WAL_FSYNC", "1").strip().lower() in ("1", "true", "yes")
 
-                "timestamp": datetime.now().isoformat()
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "3600"))
 
-            }), 400
+IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "1024"))
 
-        # Load character
+STATE_DOCUMENTS = {
 
-        character = get_character_state()
+    "character": "character.json",
 
-        if not character:
+    "world": "world_state.json"
 
-            return jsonify({
+}
 
-                "status": "ERROR",
+def read_json_file(filepath):
 
-                "reason": "character_not_found",
+    """Read JSON file. Returns None if not found or parse error."""
 
-                "message": "character.json not found",
+    if not filepath.exists():
 
-                "timestamp": datetime.now().isoformat()
+        return None
 
-            }), 404
+    try:
 
-        # Check if already has active ability
+        with open(filepath, 'r') as f:
 
-        if "active_ability" in character and character["active_ability"]:
+            return json.load(f)
 
-            return jsonify({
+    except Exception as e:
 
-                "status": "ERROR",
+        return None
 
-                "reason": "ability_already_active",
+def write_json_file(filepath, data):
 
-                "message": f"Active ability: {character['active_ability'].get('name')}. Can only have one.",
+    """Write data to JSON file. Creates parent directories if needed."""
 
-                "timestamp": datetime.now().isoformat()
+    filepath.parent.mkdir(parents=True, exist_ok=True)
 
-            }), 400
+    try:
 
-        # Create ability record
+        with open(filepath, 'w') as f:
 
-        ability = {
+            json.dump(data, f, indent=2)
 
-            "name": ability_name,
+        return True
 
-            "domain": domain,
+    except Exception as e:
 
-            "enhancement_level": enhancement_level,
+        return False
 
-            "manifested_date": datetime.now().isoformat(),
+def canonical_json(value):
 
-            "enhancements": []
+    """Stable compact serialization used for content hashing"""
 
-        }
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
 
-        character["active_ability"] = ability
+def state_diff(old, new, path=(), ops=None):
 
-        # Track in log
+    """
+    Compact diff between two JSON documents as a list of ops:
+      ["set", path, value]   ["del", path]   ["append", path, at, items]
+    Appending to a list is recorded as its new items only. Every op is absolute, so
+    replaying a diff over a document that already contains it changes nothing.
+    """
+
+    ops = [] if ops is None else ops
+
+    if isinstance(old, dict) and isinstance(new, dict):
+
+        for key in old:
+
+            if key not in new:
+
+                ops.append(["del", list(path) + [key]])
+
+        for key, value in new.items():
+
+            if key not in old:
+
+                ops.append(["set", list(path) + [key], value])
+
+            elif old[key] != value:
+
+                state_diff(old[key], value, path + (key,), ops)
+
+    elif isinstance(old, list) and isinstance(new, list) and len(new) > len(old) and new[:len(old)] == old:
+
+        ops.append(["append", list(path), len(old), new[len(old):]])
+
+    elif old != new:
+
+        ops.append(["set", list(path), new])
+
+    return ops
+
+def apply_state_ops(document, ops):
+
+    """Apply state_diff ops to a document in place; returns the (possibly replaced) document"""
+
+    for op in ops:
+
+        kind, path = op[0], op[1]
+
+        if not path:
+
+            document = op[2] if kind == "set" else document
+
+            continue
+
+        parent = document
+
+        for key in path[:-1]:
+
+            if not isinstance(parent.get(key), dict):
+
+                parent[key] = {}
+
+            parent = parent[key]
+
+        key = path[-1]
+
+        if kind == "set":
+
+            parent[key] = op[2]
+
+        elif kind == "del":
+
+            parent.pop(key, None)
+
+        elif kind == "append":
+
+            items = parent.get(key)
+
+            if isinstance(items, list):
+
+                del items[op[2]:]
+
+                items.extend(op[3])
+
+            else:
+
+                parent[key] = list(op[3])
+
+    return document
+
+# History records are canonical JSON, so "version" is their last key
+
+HISTORY_VERSION_PATTERN = re.compile(rb'"version":(\d+)\}\s*$')
+
+class Campaign:
+
+    """
+    One tenant (campaign/character) - owns its state documents, their in-memory
+    cache and the lock that serializes read-modify-write cycles on them.
+    The default campaign lives directly in DATA_DIR for backward compatibility,
+    every other campaign in DATA_DIR/campaigns/<campaign_id>/.
+    """
+
+    def __init__(self, campaign_id, lock):
+
+        self.campaign_id = campaign_id
+
+        if campaign_id == DEFAULT_CAMPAIGN_ID:
+
+            self.root = DATA_DIR
+
+        else:
+
+            self.root = CAMPAIGNS_DIR / campaign_id
+
+        self.sessions_dir = self.root / "sessions"
+
+        self.lock = lock
+
+        self._documents = {}
+
+        self._session_index = None
+
+        # Version history: {document: {version: byte offset}} of persisted records, the current
+        # version and, in group/WAL mode, the versions saved since the last flush or checkpoint
+        # ({version, timestamp, action, document}), written to the history by it
+
+        self._history_offsets = {}
+
+        self._versions = {}
+
+        self._pending_versions = {}
+
+        self._generations = {}
+
+        self._derived = {}
+
+        self._dirty = set()
+
+        # group/WAL mode: last saved copy of each document; WAL sequence and records since the checkpoint
+
+        self._committed = {}
+
+        self._wal_seq = {}
+
+        self._wal_records = {}
+
+    def exists(self):
+
+        """Campaign exists if its directory holds at least one state document (or one awaits its first flush)"""
+
+        return bool(self._dirty) or any((self.root / filename).exists() for filename in STATE_DOCUMENTS.values())
+
+    def document_path(self, name):
+
+        return self.root / STATE_DOCUMENTS[name]
+
+    def load(self, name):
+
+        """Return the cached document, reading it from disk on first access"""
+
+        with self.lock:
+
+            if name not in self._versions:
+
+                self._open_document(name)
+
+            elif name not in self._documents:
+
+                self._documents[name] = read_json_file(self.document_path(name))
+
+            return self._documents[name]
+
+    def _open_document(self, name):
+
+        """
+        First access to a document: index its version history, read it from disk and
+        replay any WAL records past the checkpoint. The WAL is replayed in every write
+        mode, so a crash in WAL mode followed by a restart in sync or group mode loses
+        nothing; outside WAL mode the recovered state is checkpointed at once.
+        A document without history gets its state recorded as version 1.
+        """
+
+        offsets = {}
+
+        path = self.history_path(name)
+
+        if path.exists():
+
+            with open(path, 'rb') as f:
+
+                position = 0
+
+                for line in f:
+
+                    if line.strip():
+
+                        match = HISTORY_VERSION_PATTERN.search(line)
+
+                        offsets[int(match.group(1)) if match else json.loads(line)["version"]] = position
+
+                    position += len(line)
+
+        self._history_offsets[name] = offsets
+
+        version = max(offsets, default=0)
+
+        document = read_json_file(self.document_path(name))
+
+        checkpoint = read_json_file(self.wal_path(name).with_suffix(".checkpoint.json")) or {}
+
+        seq = checkpoint.get("seq", 0)
+
+        replayed = []
+
+        if self.wal_path(name).exists():
+
+            with open(self.wal_path(name), 'r+b') as f:
+
+                position = 0
+
+                for line in f:
+
+                    try:
+
+                        # Only newline-terminated records are committed; a final line without
+                        # one is the torn tail of a crashed append even if it parses
+
+                        record = json.loads(line) if line.endswith(b"\n") else None
+
+                    except ValueError:
+
+                        record = None
+
+                    if record is None:
+
+                        # Cut the torn tail so new records start on a clean line
+
+                        f.truncate(position)
+
+                        break
+
+                    position += len(line)
+
+                    if record["seq"] > seq:
+
+                        document = apply_state_ops(document if document is not None else {}, record["ops"])
+
+                        seq = record["seq"]
+
+                        record_version = record.get("version", version + 1)
+
+                        version = max(version, record_version)
+
+                        replayed.append({
+
+                            "version": record_version,
+
+                            "timestamp": record.get("timestamp") or datetime.now().isoformat(),
+
+                            "action": record.get("action", "wal_replay"),
+
+                            "document": json.loads(json.dumps(document))
+
+                        })
+
+        self._versions[name] = version
+
+        self._wal_seq[name] = seq
+
+        self._wal_records[name] = len(replayed)
+
+        self._pending_versions[name] = replayed
+
+        self._documents[name] = document
+
+        generation = self._generations.get(name, 0)
+
+        for key, builder in DOCUMENT_INDEXES.get(name, {}).items():
+
+            self._derived[(name, key)] = (generation, builder(document))
+
+        if replayed or WRITE_MODE != "sync":
+
+            self._committed[name] = json.loads(json.dumps(document))
+
+        if replayed and WRITE_MODE != "wal":
+
+            self.checkpoint(name)
+
+            if WRITE_MODE == "sync":
+
+                self._committed.pop(name, None)
+
+        elif not offsets and not replayed and document is not None:
+
+            self._versions[name] = 1
+
+            self._record_version(name, 1, document, "baseline")
+
+    def _ensure_open(self, name):
+
+        if name not in self._versions:
+
+            self._open_document(name)
+
+    def save(self, name, data, action=None, preserve=()):
+
+        """
+        Replace the cached document and advance its version. In sync mode the document is
+        written through and the version recorded in its history at once. In group-commit
+        mode it is marked dirty; in WAL mode a diff record is appended first (nothing is
+        applied if the append fails). Either way the version is kept in memory, so it can
+        be listed and restored at once, and reaches the history file with the document at
+        the next flush or checkpoint.
+        preserve names derived structures (see derived()) the change cannot affect;
+        they stay cached instead of being rebuilt.
+        """
+
+        with self.lock:
+
+            self._ensure_open(name)
+
+            action = action or current_action()
+
+            version = self._versions[name] + 1
+
+            if WRITE_MODE == "wal" and not self._append_wal(name, data, action, version):
+
+                return False
+
+            self._documents[name] = data
+
+            generation = self._generations[name] = self._generations.get(name, 0) + 1
+
+            for key in preserve:
+
+                if (name, key) in self._derived:
+
+                    self._derived[(name, key)] = (generation, self._derived[(name, key)][1])
+
+            self._versions[name] = version
+
+            if WRITE_MODE == "sync":
+
+                saved = write_json_file(self.document_path(name), data)
+
+                self._record_version(name, version, data, action)
+
+                return saved
+
+            if WRITE_MODE == "group":
+
+                self._committed[name] = json.loads(json.dumps(data))
+
+                self._dirty.add(name)
+
+                GROUP_COMMIT.schedule(self)
+
+            # Later saves replace the committed copy instead of changing it, so the entry can share it
+
+            self._pending_versions[name].append({"version": version, "timestamp": datetime.now().isoformat(), "action": action, "document": self._committed[name]})
+
+            if WRITE_MODE == "wal" and self._wal_records[name] >= WAL_CHECKPOINT_RECORDS:
+
+                self.checkpoint(name)
+
+            return True
+
+    def flush(self):
+
+        """Write every dirty document to disk. Returns False if a write failed (it stays dirty)."""
+
+        with self.lock:
+
+            flushed = True
+
+            for name in sorted(self._dirty):
+
+                if write_json_file(self.document_path(name), self._committed[name]):
+
+                    self._record_pending_versions(name)
+
+                    self._dirty.discard(name)
+
+                else:
+
+                    flushed = False
+
+            return flushed
+
+    def _record_pending_versions(self, name):
+
+        """Append the versions saved since the last flush or checkpoint to the history"""
+
+        for entry in self._pending_versions.get(name, []):
+
+            self._record_version(name, entry["version"], entry["document"], entry["action"], entry["timestamp"])
+
+        self._pending_versions[name] = []
+
+    # ---- write-ahead log (WAL mode) ----
+
+    def wal_path(self, name):
+
+        return self.root / "wal" / f"{name}.jsonl"
+
+    def _append_wal(self, name, data, action, version):
+
+        """Append the diff against the last committed copy as the record of one version"""
+
+        seq = self._wal_seq[name] + 1
+
+        record = {"seq": seq, "version": version, "timestamp": datetime.now().isoformat(), "action": action, "ops": state_diff(self._committed[name], data)}
+
+        path = self.wal_path(name)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+
+            with open(path, 'ab') as f:
+
+                f.seek(0, os.SEEK_END)
+
+                start = f.tell()
+
+                try:
+
+                    f.write((canonical_json(record) + "\n").encode("utf-8"))
+
+                    f.flush()
+
+                    if WAL_FSYNC:
+
+                        os.fsync(f.fileno())
+
+                except OSError:
+
+                    # Cut a partial record so the next append starts on a clean line
+
+                    f.truncate(start)
+
+                    raise
+
+        except OSError:
+
+            return False
+
+        self._wal_seq[name] = seq
+
+        self._wal_records[name] += 1
+
+        self._committed[name] = json.loads(json.dumps(data))
+
+        return True
+
+    def checkpoint(self, name=None):
+
+        """
+        Write full document(s) atomically, record the versions saved since the last
+        checkpoint in the history, then the checkpoint sequence, then empty the WAL. A crash
+        between the steps only leaves records that replay as no-ops.
+        """
+
+        with self.lock:
+
+            for doc_name in (list(self._committed) if name is None else [name]):
+
+                if self._wal_records.get(doc_name, 0) == 0 or self._committed.get(doc_name) is None:
+
+                    continue
+
+                path = self.document_path(doc_name)
+
+                staging = path.with_suffix(".json.tmp")
+
+                if not write_json_file(staging, self._committed[doc_name]):
+
+                    return False
+
+                os.replace(staging, path)
+
+                self._record_pending_versions(doc_name)
+
+                write_json_file(self.wal_path(doc_name).with_suffix(".checkpoint.json"), {"seq": self._wal_seq[doc_name], "timestamp": datetime.now().isoformat()})
+
+                open(self.wal_path(doc_name), 'wb').close()
+
+                self._wal_records[doc_name] = 0
+
+            return True
+
+    def wal_status(self):
+
+        with self.lock:
+
+            return {name: {"seq": self._wal_seq[name], "records_since_checkpoint": self._wal_records[name]} for name in self._wal_seq}
+
+    def is_dirty(self):
+
+        return bool(self._dirty)
+
+    def discard(self, name=None):
+
+        """
+        Drop cached document(s) so the next load re-reads from disk. In group and WAL mode
+        the last save may not be in the document file yet, so the cache is rebuilt from
+        the last saved copy instead.
+        """
+
+        with self.lock:
+
+            for doc_name in (STATE_DOCUMENTS if name is None else [name]):
+
+                if doc_name in self._committed:
+
+                    self._documents[doc_name] = json.loads(json.dumps(self._committed[doc_name]))
+
+                else:
+
+                    self._documents.pop(doc_name, None)
+
+                self._generations[doc_name] = self._generations.get(doc_name, 0) + 1
+
+    def reset(self):
+
+        """Forget everything cached about this campaign (its files were replaced underneath it)"""
+
+        with self.lock:
+
+            for name in STATE_DOCUMENTS:
+
+                self._generations[name] = self._generations.get(name, 0) + 1
+
+            self._documents.clear()
+
+            self._session_index = None
+
+            self._history_offsets.clear()
+
+            self._versions.clear()
+
+            self._pending_versions.clear()
+
+            self._dirty.clear()
+
+            self._committed.clear()
+
+            self._wal_seq.clear()
+
+            self._wal_records.clear()
+
+    def derived(self, name, key, builder):
+
+        """
+        Structure derived from a document (e.g. a parsed index), cached until the
+        document is saved or discarded again. builder(document) -> value.
+        """
+
+        with self.lock:
+
+            generation = self._generations.get(name, 0)
+
+            cached = self._derived.get((name, key))
+
+            if cached is None or cached[0] != generation:
+
+                cached = (generation, builder(self.load(name)))
+
+                self._derived[(name, key)] = cached
+
+            return cached[1]
+
+    # ---- content-addressed snapshot store ----
+
+    def store_snapshot(self, name):
+
+        """
+        Snapshot one document as a manifest of sha256 digests. Top-level sections that
+        are objects get one digest per child key (e.g. advancement.dc_balance), other
+        sections one digest. Objects are stored once under sessions/objects/, so a
+        change to dc_balance writes one tiny object instead of another full copy.
+        Returns (manifest, objects_written).
+        """
+
+        with self.lock:
+
+            return self._snapshot_document(self.load(name))
+
+    def _snapshot_document(self, document):
+
+        if document is None:
+
+            return None, 0
+
+        manifest = {}
+
+        written = 0
+
+        for section, value in document.items():
+
+            if isinstance(value, dict) and value:
+
+                manifest[section] = {}
+
+                for key, child in value.items():
+
+                    manifest[section][key], is_new = self._store_object(child)
+
+                    written += is_new
+
+            else:
+
+                manifest[section], is_new = self._store_object(value)
+
+                written += is_new
+
+        return manifest, written
+
+    def _store_object(self, value):
+
+        text = canonical_json(value)
+
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        object_file = self.sessions_dir / "objects" / f"{digest}.json"
+
+        if object_file.exists():
+
+            return digest, 0
+
+        object_file.parent.mkdir(parents=True, exist_ok=True)
+
+        object_file.write_text(text, encoding="utf-8")
+
+        return digest, 1
+
+    def _load_object(self, digest):
+
+        object_file = self.sessions_dir / "objects" / f"{digest}.json"
+
+        return json.loads(object_file.read_text(encoding="utf-8"))
+
+    def load_snapshot(self, manifest):
+
+        """Rebuild a document from a snapshot manifest"""
+
+        document = {}
+
+        for section, entry in manifest.items():
+
+            if isinstance(entry, dict):
+
+                document[section] = {key: self._load_object(digest) for key, digest in entry.items()}
+
+            else:
+
+                document[section] = self._load_object(entry)
+
+        return document
+
+    # ---- version history ----
+
+    def history_path(self, name):
+
+        return self.root / "history" / f"{name}.jsonl"
+
+    def _record_version(self, name, version, document, action, timestamp=None):
+
+        """Append one version of a document to its history (once per version)"""
+
+        offsets = self._history_offsets[name]
+
+        if version in offsets:
+
+            return
+
+        manifest, _ = self._snapshot_document(document)
+
+        entry = {
+
+            "version": version,
+
+            "timestamp": timestamp or datetime.now().isoformat(),
+
+            "action": action,
+
+            "manifest": manifest
+
+        }
+
+        path = self.history_path(name)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, 'ab') as f:
+
+            f.seek(0, os.SEEK_END)
+
+            position = f.tell()
+
+            f.write((canonical_json(entry) + "\n").encode("utf-8"))
+
+        offsets[version] = position
+
+    def version(self, name):
+
+        """Current version number of a document (0 if it has never existed)"""
+
+        with self.lock:
+
+            self._ensure_open(name)
+
+            return self._versions[name]
+
+    def history_versions(self, name):
+
+        """Version numbers in the history, oldest first, including those not yet flushed or checkpointed"""
+
+        with self.lock:
+
+            self._ensure_open(name)
+
+            offsets = self._history_offsets[name]
+
+            return list(offsets) + [entry["version"] for entry in self._pending_versions[name] if entry["version"] not in offsets]
+
+    def read_version(self, name, version):
+
+        """Version record {version, timestamp, action, manifest}, or None if there is no such version"""
+
+        with self.lock:
+
+            self._ensure_open(name)
+
+            offset = self._history_offsets[name].get(version)
+
+            if offset is None:
+
+                for entry in self._pending_versions[name]:
+
+                    if entry["version"] == version:
+
+                        manifest, _ = self._snapshot_document(entry["document"])
+
+                        return {"version": version, "timestamp": entry["timestamp"], "action": entry["action"], "manifest": manifest}
+
+                return None
+
+            with open(self.history_path(name), 'rb') as f:
+
+                f.seek(offset)
+
+                return json.loads(f.readline())
+
+    def restore(self, name, manifest, action):
+
+        """Replace a document with a snapshot; the restore itself becomes a new version"""
+
+        with self.lock:
+
+            self.save(name, self.load_snapshot(manifest), action=action)
+
+            return self.version(name)
+
+    # ---- session index ----
+
+    def session_index(self):
+
+        """
+        Session index {latest_session_number, open_session}, kept in index.json.
+        Campaigns from before the index existed are scanned once to build it.
+        """
+
+        with self.lock:
+
+            if self._session_index is None:
+
+                index = read_json_file(self.sessions_dir / "index.json")
+
+                if index is None:
+
+                    index = {"latest_session_number": scan_session_numbers(self.sessions_dir), "open_session": None}
+
+                self._session_index = index
+
+            return self._session_index
+
+    def save_session_index(self, index):
+
+        with self.lock:
+
+            self._session_index = index
+
+            return write_json_file(self.sessions_dir / "index.json", index)
+
+class CampaignRegistry:
+
+    """
+    Bounded LRU of resident campaigns. Locks are shared through a weak map, so a
+    campaign evicted while a request still holds it keeps serializing against
+    the instance that replaces it.
+    """
+
+    def __init__(self, max_resident):
+
+        self.max_resident = max(1, max_resident)
+
+        self._campaigns = OrderedDict()
+
+        self._locks = weakref.WeakValueDictionary()
+
+        self._lock = threading.Lock()
+
+    def get(self, campaign_id):
+
+        with self._lock:
+
+            campaign = self._campaigns.get(campaign_id)
+
+            if campaign is not None:
+
+                self._campaigns.move_to_end(campaign_id)
+
+                return campaign
+
+            # An evicted campaign with unflushed saves is taken back instead of re-read from disk
+
+            campaign = GROUP_COMMIT.pending(campaign_id)
+
+            if campaign is None:
+
+                lock = self._locks.get(campaign_id)
+
+                if lock is None:
+
+                    lock = threading.RLock()
+
+                    self._locks[campaign_id] = lock
+
+                campaign = Campaign(campaign_id, lock)
+
+            self._campaigns[campaign_id] = campaign
+
+            evicted = []
+
+            while len(self._campaigns) > self.max_resident:
+
+                evicted.append(self._campaigns.popitem(last=False)[1])
+
+        # Flushed outside the registry lock: a handler may hold a campaign lock while calling get()
+
+        for stale in evicted:
+
+            if stale.is_dirty():
+
+                GROUP_COMMIT.flush(stale)
+
+        return campaign
+
+    def resident_ids(self):
+
+        with self._lock:
+
+            return list(self._campaigns.keys())
+
+class GroupCommitter:
+
+    """
+    Campaigns with dirty documents (group-commit mode), flushed by a background thread
+    at most GROUP_COMMIT_INTERVAL seconds after their first unflushed save.
+    """
+
+    def __init__(self, interval):
+
+        self.interval = interval
+
+        self._pending = {}
+
+        self._lock = threading.Lock()
+
+        self._wakeup = threading.Event()
+
+        self._thread = None
+
+        self.flushes = 0
+
+        self.failures = 0
+
+    def schedule(self, campaign):
+
+        with self._lock:
+
+            self._pending[campaign.campaign_id] = campaign
+
+            if self._thread is None:
+
+                self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+
+                self._thread.start()
+
+        self._wakeup.set()
+
+    def pending(self, campaign_id):
+
+        with self._lock:
+
+            return self._pending.get(campaign_id)
+
+    def pending_count(self):
+
+        with self._lock:
+
+            return len(self._pending)
+
+    def flush(self, campaign):
+
+        with self._lock:
+
+            self._pending.pop(campaign.campaign_id, None)
+
+        flushed = campaign.flush()
+
+        with self._lock:
+
+            self.flushes += 1
+
+            if not flushed:
+
+                # Keep it pending so the next cycle retries the write
+
+                self.failures += 1
+
+                self._pending.setdefault(campaign.campaign_id, campaign)
+
+        return flushed
+
+    def flush_all(self):
+
+        with self._lock:
+
+            campaigns = list(self._pending.values())
+
+        return all([self.flush(campaign) for campaign in campaigns])
+
+    def _run(self):
+
+        while True:
+
+            self._wakeup.wait()
+
+            time.sleep(self.interval)
+
+            self._wakeup.clear()
+
+            self.flush_all()
+
+            if self.pending_count():
+
+                self._wakeup.set()
+
+GROUP_COMMIT = GroupCommitter(GROUP_COMMIT_INTERVAL)
+
+CAMPAIGNS = CampaignRegistry(MAX_RESIDENT_CAMPAIGNS)
+
+mark_startup("storage")
+
+def current_action():
+
+    """Label recorded with a document version - the endpoint that produced it"""
+
+    if has_request_context() and request.endpoint:
+
+        return request.endpoint
+
+    return "direct"
+
+def is_valid_campaign_id(campaign_id):
+
+    return bool(CAMPAIGN_ID_PATTERN.match(campaign_id))
+
+def get_requested_campaign_id():
+
+    """Campaign identifier from query string or JSON body, default campaign if absent"""
+
+    campaign_id = request.args.get("campaign")
+
+    if campaign_id is None and request.method == 'POST':
+
+        body = request.get_json(silent=True)
+
+        if isinstance(body, dict):
+
+            campaign_id = body.get("campaign")
+
+    return str(campaign_id).strip() if campaign_id else DEFAULT_CAMPAIGN_ID
+
+def current_campaign():
+
+    """Campaign bound to the current request (resolved once per request)"""
+
+    if "campaign" not in g:
+
+        g.campaign = CAMPAIGNS.get(get_requested_campaign_id())
+
+    return g.campaign
+
+class IdempotencyCache:
+
+    """
+    Stored responses of mutating calls, keyed by (campaign, endpoint, idempotency_key).
+    Bounded LRU; entries expire ttl seconds after they were stored.
+    """
+
+    def __init__(self, ttl, max_entries):
+
+        self.ttl = ttl
+
+        self.max_entries = max(1, max_entries)
+
+        self._entries = OrderedDict()
+
+        self._key_locks = weakref.WeakValueDictionary()
+
+        self._lock = threading.Lock()
+
+    def key_lock(self, key):
+
+        """Lock serializing calls that share an idempotency key, for routes not run under the campaign lock"""
+
+        with self._lock:
+
+            lock = self._key_locks.get(key)
+
+            if lock is None:
+
+                lock = self._key_locks[key] = threading.Lock()
+
+            return lock
+
+    def get(self, key):
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is None:
+
+                return None
+
+            if time.monotonic() - entry["stored_at"] > self.ttl:
+
+                del self._entries[key]
+
+                return None
+
+            self._entries.move_to_end(key)
+
+            return entry
+
+    def put(self, key, fingerprint, response):
+
+        with self._lock:
+
+            self._entries[key] = {
+
+                "stored_at": time.monotonic(),
+
+                "fingerprint": fingerprint,
+
+                "status_code": response.status_code,
+
+                "body": response.get_data(),
+
+                "mimetype": response.mimetype
+
+            }
+
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+
+                self._entries.popitem(last=False)
+
+IDEMPOTENCY = IdempotencyCache(IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_ENTRIES)
+
+# Params that do not change what a mutating call does
+
+IDEMPOTENCY_IGNORED_PARAMS = ("idempotency_key", "campaign", "durable")
+
+def idempotency_fingerprint(params):
+
+    return hashlib.sha256(canonical_json({k: v for k, v in params.items() if k not in IDEMPOTENCY_IGNORED_PARAMS}).encode("utf-8")).hexdigest()
+
+def replay_response(entry):
+
+    """Stored response marked as a replay (Idempotent-Replayed header, idempotent_replay in the body)"""
+
+    if entry["mimetype"] == "application/json":
+
+        body = json.loads(entry["body"])
+
+        if isinstance(body, dict):
+
+            body["idempotent_replay"] = True
+
+            response = jsonify(body)
+
+            response.status_code = entry["status_code"]
+
+            response.headers["Idempotent-Replayed"] = "true"
+
+            return response
+
+    response = Response(entry["body"], status=entry["status_code"], mimetype=entry["mimetype"])
+
+    response.headers["Idempotent-Replayed"] = "true"
+
+    return response
+
+def idempotency_key_error(idempotency_key):
+
+    """400 response for a malformed idempotency_key, None when it is absent or valid"""
+
+    if idempotency_key is None or (isinstance(idempotency_key, (str, int)) and 1 <= len(str(idempotency_key)) <= 255):
+
+        return None
+
+    return jsonify({
+
+        "status": "ERROR",
+
+        "reason": "invalid_parameters",
+
+        "message": "idempotency_key must be a string of 1 to 255 characters",
+
+        "timestamp": datetime.now().isoformat()
+
+    }), 400
+
+def idempotent_replay(cache_key, fingerprint):
+
+    """
+    Response for a retried call: the stored one, or 409 when the key was used with
+    different params. None on first use of the key.
+    """
+
+    entry = IDEMPOTENCY.get(cache_key)
+
+    if entry is None:
+
+        return None
+
+    if entry["fingerprint"] != fingerprint:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "idempotency_key_reused",
+
+            "message": f"idempotency_key '{cache_key[-1]}' was already used with different parameters",
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 409
+
+    return replay_response(entry)
+
+def remember_response(cache_key, fingerprint, response):
+
+    """Store a response for replay (5xx responses are not stored, so the call can be retried)"""
+
+    response = app.make_response(response)
+
+    if response.status_code < 500:
+
+        IDEMPOTENCY.put(cache_key, fingerprint, response)
+
+    return response
+
+def request_wants_durable(data):
+
+    try:
+
+        return isinstance(data, dict) and data.get("durable") not in (None, "") and coerce_param(data["durable"], "bool")
+
+    except ValueError:
+
+        return False
+
+MUTATING_VIEWS = set()
+
+def mutates_state(view):
+
+    """
+    Serialize a mutating endpoint on its campaign lock. Handlers mutate the cached
+    documents in place, so a failed request drops the cache to avoid keeping a
+    half-applied change that never reached disk.
+    With an idempotency_key param the response is stored (unless it is a 5xx); a retry
+    with the same key and params replays it without touching state, the same key with
+    different params is rejected with 409.
+    In group-commit mode durable=true flushes the campaign before the response is sent.
+    """
+
+    MUTATING_VIEWS.add(view.__name__)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+
+        campaign = current_campaign()
+
+        data = get_request_data()
+
+        idempotency_key = data.get("idempotency_key") if isinstance(data, dict) else None
+
+        error = idempotency_key_error(idempotency_key)
+
+        if error is not None:
+
+            return error
+
+        with campaign.lock:
+
+            if idempotency_key is not None:
+
+                cache_key = (campaign.campaign_id, request.endpoint, str(idempotency_key))
+
+                fingerprint = idempotency_fingerprint(data)
+
+                replayed = idempotent_replay(cache_key, fingerprint)
+
+                if replayed is not None:
+
+                    return replayed
+
+            try:
+
+                response = view(*args, **kwargs)
+
+            except Exception:
+
+                campaign.discard()
+
+                raise
+
+            status_code = response[1] if isinstance(response, tuple) else response.status_code
+
+            if status_code >= 400:
+
+                campaign.discard()
+
+            elif campaign.is_dirty() and request_wants_durable(data):
+
+                GROUP_COMMIT.flush(campaign)
+
+            if idempotency_key is not None:
+
+                response = remember_response(cache_key, fingerprint, response)
+
+            return response
+
+    return wrapper
+
+def get_character_state():
+
+    """Read character state of the current campaign (cached)"""
+
+    return current_campaign().load("character")
+
+def save_character_state(character_data):
+
+    """Write character state of the current campaign"""
+
+    return current_campaign().save("character", character_data)
+
+def get_world_state():
+
+    """Read world state of the current campaign (cached)"""
+
+    return current_campaign().load("world")
+
+def save_world_state(world_data, preserve=()):
+
+    """Write world state of the current campaign (preserve: derived indexes the change leaves valid)"""
+
+    return current_campaign().save("world", world_data, preserve=preserve)
+
+HERO_DATABASE_FILES = ("hero-database.json", "heroes_db.json")
+
+HERO_STAT_COLUMNS = {
+
+    "reflexes": ("combat_stats", "reflexes"),
+
+    "movement": ("combat_stats", "movement"),
+
+    "power": ("combat_stats", "power"),
+
+    "resilience": ("combat_stats", "resilience"),
+
+    "armor": ("combat_stats", "armor"),
+
+    "skills": ("dc_mitigation", "skills"),
+
+    "resourcefulness": ("dc_mitigation", "resourcefulness")
+
+}
+
+HERO_CATEGORICAL_COLUMNS = {
+
+    "alignment": ("alignment",),
+
+    "race": ("race",),
+
+    "gender": ("gender",),
+
+    "vs_tier": ("vs_battles_reference", "tier")
+
+}
+
+HERO_MISSING_STAT = -1
+
+def iter_hero_records(raw):
+
+    """Hero dicts from a database file: a list (nested lists are flattened) or {"heroes": [...]}"""
+
+    if isinstance(raw, dict):
+
+        raw = raw.get("heroes", [])
+
+    for entry in raw or []:
+
+        if isinstance(entry, list):
+
+            yield from iter_hero_records(entry)
+
+        elif isinstance(entry, dict):
+
+            yield entry
+
+def nested_value(record, path):
+
+    for key in path:
+
+        record = record.get(key) if isinstance(record, dict) else None
+
+    return record
+
+class HeroStore:
+
+    """
+    Column-oriented hero database built once at load time.
+    Stats are array('b') columns (HERO_MISSING_STAT for gaps), categoricals are
+    dictionary-encoded (array('H') codes into a value table), names and other strings
+    are interned. Row i of every column is hero i.
+    """
+
+    def __init__(self, records, sources=()):
+
+        self.sources = list(sources)
+
+        self.ids = array("l")
+
+        self.names = []
+
+        self.slugs = []
+
+        self.full_names = []
+
+        self.aliases = []
+
+        self.stats = {column: array("b") for column in HERO_STAT_COLUMNS}
+
+        self.categories = {column: [] for column in HERO_CATEGORICAL_COLUMNS}
+
+        self.codes = {column: array("H") for column in HERO_CATEGORICAL_COLUMNS}
+
+        self._category_codes = {column: {} for column in HERO_CATEGORICAL_COLUMNS}
+
+        self.name_index = {}
+
+        for record in records:
+
+            self.append(record)
+
+        self.row_count = len(self.names)
+
+        self.build_indexes()
+
+    def append(self, record):
+
+        row = len(self.names)
+
+        self.ids.append(int(record.get("id") or 0))
+
+        name = sys.intern(record.get("name") or "")
+
+        self.names.append(name)
+
+        self.slugs.append(sys.intern(record.get("slug") or ""))
+
+        self.full_names.append(sys.intern(record.get("fullName") or ""))
+
+        aliases = tuple(sys.intern(alias) for alias in record.get("aliases") or [] if isinstance(alias, str))
+
+        self.aliases.append(aliases)
+
+        for column, path in HERO_STAT_COLUMNS.items():
+
+            value = nested_value(record, path)
+
+            self.stats[column].append(int(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else HERO_MISSING_STAT)
+
+        for column, path in HERO_CATEGORICAL_COLUMNS.items():
+
+            self.codes[column].append(self.encode(column, nested_value(record, path)))
+
+        # First hero wins a name; aliases never shadow a real name
+
+        self.name_index.setdefault(name.lower(), row)
+
+        for alias in aliases:
+
+            self.name_index.setdefault("alias:" + alias.lower(), row)
+
+    def build_indexes(self):
+
+        """
+        Secondary indexes, built once per load:
+        category_bitmaps[column][code] - int bitmap of the rows holding that value
+        stat_ge[column][v]             - int bitmap of rows with stat >= v (v over the tier domain)
+        sorted_rows[column]            - rows ordered by (stat, row), missing stats excluded
+        Bit i of a bitmap is row i, so predicates combine with & | ~ on Python ints.
+        """
+
+        self.all_rows = (1 << self.row_count) - 1
+
+        category_bitmaps = {}
+
+        for column, codes in self.codes.items():
+
+            bitmaps = [0] * len(self.categories[column])
+
+            for row, code in enumerate(codes):
+
+                bitmaps[code] |= 1 << row
+
+            category_bitmaps[column] = bitmaps
+
+        stat_ge = {}
+
+        sorted_rows = {}
+
+        universal_max = RULES.system.universal_max
+
+        domain = universal_max + 2
+
+        for column, values in self.stats.items():
+
+            exact = [0] * domain
+
+            for row, value in enumerate(values):
+
+                if value != HERO_MISSING_STAT:
+
+                    exact[min(value, domain - 2)] |= 1 << row
+
+            ge = [0] * domain
+
+            for value in range(domain - 2, -1, -1):
+
+                ge[value] = ge[value + 1] | exact[value]
+
+            stat_ge[column] = ge
+
+            sorted_rows[column] = sorted((row for row, value in enumerate(values) if value != HERO_MISSING_STAT), key=lambda row: (values[row], row))
+
+        sorted_rows["name"] = sorted(range(self.row_count), key=lambda row: (self.names[row].lower(), row))
+
+        sorted_rows["id"] = sorted(range(self.row_count), key=lambda row: (self.ids[row], row))
+
+        # Swapped in together so concurrent queries never see a half-built index
+
+        self.category_bitmaps, self.stat_ge, self.sorted_rows, self.index_universal_max = category_bitmaps, stat_ge, sorted_rows, universal_max
+
+    def stat_range(self, column, low=None, high=None):
+
+        """Bitmap of rows with low <= stat <= high (either bound optional)"""
+
+        ge = self.stat_ge[column]
+
+        top = len(ge) - 1
+
+        low = 0 if low is None else max(0, low)
+
+        if low >= top or (high is not None and high < low):
+
+            return 0
+
+        bitmap = ge[low]
+
+        if high is not None and high + 1 < top:
+
+            bitmap &= ~ge[high + 1]
+
+        return bitmap
+
+    def category_bitmap(self, column, values):
+
+        """Bitmap of rows whose categorical matches any of values (case-insensitive)"""
+
+        bitmap = 0
+
+        for value in values:
+
+            for code in self.category_codes(column, value):
+
+                bitmap |= self.category_bitmaps[column][code]
+
+        return bitmap
+
+    def encode(self, column, value):
+
+        value = sys.intern(str(value).strip()) if value is not None else None
+
+        codes = self._category_codes[column]
+
+        if value not in codes:
+
+            codes[value] = len(self.categories[column])
+
+            self.categories[column].append(value)
+
+        return codes[value]
+
+    def category_codes(self, column, value):
+
+        """Codes whose value matches case-insensitively"""
+
+        value = str(value).strip().lower()
+
+        return {code for code, candidate in enumerate(self.categories[column]) if candidate is not None and candidate.lower() == value}
+
+    def category(self, column, row):
+
+        return self.categories[column][self.codes[column][row]]
+
+    def find(self, name):
+
+        """Row of a hero by name (case-insensitive), falling back to aliases"""
+
+        key = name.strip().lower()
+
+        row = self.name_index.get(key)
+
+        return row if row is not None else self.name_index.get("alias:" + key)
+
+    def record(self, row):
+
+        """Rebuild the original nested hero dict of a row"""
+
+        stat = lambda column: None if self.stats[column][row] == HERO_MISSING_STAT else self.stats[column][row]
+
+        return {
+
+            "id": self.ids[row],
+
+            "name": self.names[row],
+
+            "slug": self.slugs[row],
+
+            "race": self.category("race", row),
+
+            "gender": self.category("gender", row),
+
+            "fullName": self.full_names[row],
+
+            "aliases": list(self.aliases[row]),
+
+            "alignment": self.category("alignment", row),
+
+            "combat_stats": {path[1]: stat(column) for column, path in HERO_STAT_COLUMNS.items() if path[0] == "combat_stats"},
+
+            "dc_mitigation": {path[1]: stat(column) for column, path in HERO_STAT_COLUMNS.items() if path[0] == "dc_mitigation"},
+
+            "vs_battles_reference": {"tier": self.category("vs_tier", row)}
+
+        }
+
+    def select(self, equals=None, minimums=None, maximums=None):
+
+        """
+        Row numbers matching every filter. equals: {categorical: value}; minimums/maximums:
+        {stat: bound}. Answered from the bitmap indexes without touching the columns.
+        """
+
+        bitmap = self.all_rows
+
+        for column, value in (equals or {}).items():
+
+            bitmap &= self.category_bitmap(column, [value])
+
+        for column in set(minimums or {}) | set(maximums or {}):
+
+            bitmap &= self.stat_range(column, (minimums or {}).get(column), (maximums or {}).get(column))
+
+        return bitmap_rows(bitmap)
+
+    def aggregate(self, column, rows):
+
+        """count/min/max/mean/sum of a stat column over rows (missing values skipped)"""
+
+        values = self.stats[column]
+
+        present = [values[row] for row in rows if values[row] != HERO_MISSING_STAT]
+
+        if not present:
+
+            return {"count": 0, "min": None, "max": None, "mean": None, "sum": 0}
+
+        total = sum(present)
+
+        return {"count": len(present), "min": min(present), "max": max(present), "mean": round(total / len(present), 2), "sum": total}
+
+    def value_counts(self, column, rows):
+
+        counts = [0] * len(self.categories[column])
+
+        codes = self.codes[column]
+
+        for row in rows:
+
+            counts[codes[row]] += 1
+
+        return {("unknown" if value is None else value): count for value, count in zip(self.categories[column], counts) if count}
+
+    def memory_report(self):
+
+        """Approximate bytes held by the columnar store (strings counted once, as interned)"""
+
+        strings = set(self.names) | set(self.slugs) | set(self.full_names) | {alias for aliases in self.aliases for alias in aliases}
+
+        for values in self.categories.values():
+
+            strings.update(value for value in values if value is not None)
+
+        report = {
+
+            "ids": self.ids.buffer_info()[1] * self.ids.itemsize,
+
+            "stat_columns": sum(column.buffer_info()[1] * column.itemsize for column in self.stats.values()),
+
+            "category_codes": sum(column.buffer_info()[1] * column.itemsize for column in self.codes.values()),
+
+            "string_table": sum(sys.getsizeof(value) for value in strings),
+
+            "row_lists": sum(sys.getsizeof(column) for column in (self.names, self.slugs, self.full_names, self.aliases)) + sum(sys.getsizeof(aliases) for aliases in self.aliases),
+
+            "name_index": sys.getsizeof(self.name_index)
+
+        }
+
+        report["total"] = sum(report.values())
+
+        return report
+
+def bitmap_rows(bitmap):
+
+    """Ascending row numbers of the set bits of an int bitmap"""
+
+    rows = []
+
+    while bitmap:
+
+        low_bit = bitmap & -bitmap
+
+        rows.append(low_bit.bit_length() - 1)
+
+        bitmap ^= low_bit
+
+    return rows
+
+HERO_QUERY_FIELDS = {
+
+    **{column: ("stat", column) for column in HERO_STAT_COLUMNS},
+
+    **{".".join(path): ("stat", column) for column, path in HERO_STAT_COLUMNS.items()},
+
+    **{column: ("category", column) for column in HERO_CATEGORICAL_COLUMNS},
+
+    **{".".join(path): ("category", column) for column, path in HERO_CATEGORICAL_COLUMNS.items()}
+
+}
+
+HERO_STAT_OPERATORS = ("eq", "ne", "gt", "gte", "lt", "lte", "in", "between")
+
+def hero_query_bitmap(store, where):
+
+    """
+    Evaluate a where clause against the store's indexes. Raises ValueError on a bad clause.
+    where: {field: value | [values] | {op: operand}} with fields as in HERO_QUERY_FIELDS
+    (power or combat_stats.power, alignment, vs_battles_reference.tier, ...).
+    Stat ops: eq ne gt gte lt lte in between; categorical ops: eq ne in.
+    """
+
+    bitmap = store.all_rows
+
+    for field, condition in where.items():
+
+        if field not in HERO_QUERY_FIELDS:
+
+            raise ValueError(f"unknown field '{field}'. Queryable: {sorted(HERO_QUERY_FIELDS)}")
+
+        kind, column = HERO_QUERY_FIELDS[field]
+
+        if not isinstance(condition, dict):
+
+            condition = {"in": condition} if isinstance(condition, list) else {"eq": condition}
+
+        for op, operand in condition.items():
+
+            if kind == "category":
+
+                if op not in ("eq", "ne", "in"):
+
+                    raise ValueError(f"{field}: operator '{op}' not supported for categories (eq, ne, in)")
+
+                if isinstance(operand, str) and op == "in":
+
+                    operand = operand.split(",")
+
+                matched = store.category_bitmap(column, operand if isinstance(operand, list) else [operand])
+
+                bitmap &= ~matched if op == "ne" else matched
+
+                continue
+
+            if op not in HERO_STAT_OPERATORS:
+
+                raise ValueError(f"{field}: unknown operator '{op}'. Use one of {list(HERO_STAT_OPERATORS)}")
+
+            if isinstance(operand, str):
+
+                # GET form: between=10..12, in=3,5,7
+
+                operand = [part for part in re.split(r"\.\.|,", operand) if part.strip()]
+
+            try:
+
+                operands = [int(value) for value in (operand if isinstance(operand, list) else [operand])]
+
+            except (TypeError, ValueError):
+
+                raise ValueError(f"{field}: {op} takes integer operands")
+
+            if op in ("in", "between") and (op == "in" and not operands or op == "between" and len(operands) != 2):
+
+                raise ValueError(f"{field}: {op} takes {'two bounds' if op == 'between' else 'a list'}")
+
+            value = operands[0]
+
+            if op == "in":
+
+                matched = 0
+
+                for value in operands:
+
+                    matched |= store.stat_range(column, value, value)
+
+            elif op == "between":
+
+                matched = store.stat_range(column, min(operands), max(operands))
+
+            else:
+
+                matched = {
+
+                    "eq": lambda: store.stat_range(column, value, value),
+
+                    "ne": lambda: store.stat_range(column) & ~store.stat_range(column, value, value),
+
+                    "gt": lambda: store.stat_range(column, value + 1),
+
+                    "gte": lambda: store.stat_range(column, value),
+
+                    "lt": lambda: store.stat_range(column, None, value - 1) if value > 0 else 0,
+
+                    "lte": lambda: store.stat_range(column, None, value) if value >= 0 else 0
+
+                }[op]()
+
+            bitmap &= matched
+
+    return bitmap
+
+def hero_query_rows(store, bitmap, sort_keys, offset, limit):
+
+    """
+    Page of matching rows in sort order. A single sort key walks that key's sorted index
+    and stops once the page is filled; several keys sort only the matching rows.
+    """
+
+    if not sort_keys:
+
+        rows = bitmap_rows(bitmap)
+
+        return rows[offset:offset + limit]
+
+    for key in sort_keys:
+
+        if key.lstrip("-") not in store.sorted_rows:
+
+            raise ValueError(f"cannot sort by '{key}'. Sortable: {sorted(store.sorted_rows)}")
+
+    if len(sort_keys) == 1:
+
+        key = sort_keys[0]
+
+        ordered = store.sorted_rows[key.lstrip("-")]
+
+        present = 0
+
+        for row in ordered:
+
+            present |= 1 << row
+
+        # rows with no value for the key (missing stats) always come last
+
+        tail = bitmap_rows(bitmap & ~present)
+
+        page = []
+
+        skipped = 0
+
+        for row in chain(reversed(ordered) if key.startswith("-") else ordered, tail):
+
+            if not (bitmap >> row) & 1:
+
+                continue
+
+            if skipped < offset:
+
+                skipped += 1
+
+                continue
+
+            page.append(row)
+
+            if len(page) == limit:
+
+                break
+
+        return page
+
+    def sort_value(key, row):
+
+        column = key.lstrip("-")
+
+        descending = key.startswith("-")
+
+        if column in store.stats:
+
+            value = store.stats[column][row]
+
+            return (value == HERO_MISSING_STAT, -value if descending else value)
+
+        position = positions[column][row]
+
+        return (False, -position if descending else position)
+
+    positions = {}
+
+    for key in sort_keys:
+
+        column = key.lstrip("-")
+
+        if column not in store.stats and column not in positions:
+
+            positions[column] = [0] * store.row_count
+
+            for position, row in enumerate(store.sorted_rows[column]):
+
+                positions[column][row] = position
+
+    rows = bitmap_rows(bitmap)
+
+    rows.sort(key=lambda row: tuple(sort_value(key, row) for key in sort_keys))
+
+    return rows[offset:offset + limit]
+
+def project_hero(record, fields):
+
+    """Keep only the requested fields of a hero record; dotted fields keep their nesting"""
+
+    projected = {}
+
+    for field in fields:
+
+        parent, _, child = field.partition(".")
+
+        if parent not in record:
+
+            continue
+
+        if child and isinstance(record[parent], dict):
+
+            projected.setdefault(parent, {})[child] = record[parent].get(child)
+
+        else:
+
+            projected[parent] = record[parent]
+
+    return projected
+
+def deep_sizeof(value):
+
+    """Recursive sys.getsizeof for JSON-shaped data (used to compare against the raw dict form)"""
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+
+        size += sum(deep_sizeof(key) + deep_sizeof(child) for key, child in value.items())
+
+    elif isinstance(value, list):
+
+        size += sum(deep_sizeof(child) for child in value)
+
+    return size
+
+HERO_STORE = {"store": None, "signature": None}
+
+HERO_STORE_LOCK = threading.Lock()
+
+def get_hero_store():
+
+    """
+    Shared HeroStore over every hero database file in DATA_DIR, rebuilt when a file's
+    mtime or size changes. Heroes are reference data, so the store is not per campaign.
+    """
+
+    paths = [DATA_DIR / filename for filename in HERO_DATABASE_FILES if (DATA_DIR / filename).exists()]
+
+    signature = tuple((path.name, path.stat().st_mtime_ns, path.stat().st_size) for path in paths)
+
+    with HERO_STORE_LOCK:
+
+        if HERO_STORE["store"] is None or HERO_STORE["signature"] != signature:
+
+            raw_bytes = 0
+
+            records = []
+
+            for path in paths:
+
+                raw = read_json_file(path)
+
+                raw_bytes += deep_sizeof(raw) if raw is not None else 0
+
+                records.extend(iter_hero_records(raw))
+
+            store = HeroStore(records, sources=[path.name for path in paths])
+
+            store.raw_dict_bytes = raw_bytes
+
+            HERO_STORE["store"], HERO_STORE["signature"] = store, signature
+
+        elif HERO_STORE["store"].index_universal_max != RULES.system.universal_max:
+
+            # rules.json changed the tier range the stat indexes are sized for
+
+            HERO_STORE["store"].build_indexes()
+
+        return HERO_STORE["store"]
+
+def get_hero_from_database(hero_name):
+
+    """Lookup hero by name (or alias) in the hero database"""
+
+    store = get_hero_store()
+
+    row = store.find(hero_name)
+
+    return store.record(row) if row is not None else None
+
+SELF_COMBATANT = "self"
+
+def combatant_profile(name):
+
+    """
+    Combat profile in hero vocabulary (movement, reflexes, power, resilience, armor,
+    skills, resourcefulness) for a hero name/alias, or for the campaign character
+    when name is "self". Returns None if not found.
+    """
+
+    if name.strip().lower() == SELF_COMBATANT:
+
+        character = get_character_state()
+
+        if not character:
+
+            return None
+
+        tiers = character.get("tiers", {})
+
+        attributes = character.get("attributes", {})
+
+        equipment = character.get("equipment") or {}
+
+        return {
+
+            "name": character.get("identity", {}).get("legal_name", SELF_COMBATANT),
+
+            "source": "character",
+
+            "stats": {
+
+                "movement": tiers.get("speed"),
+
+                "reflexes": tiers.get("reflexes"),
+
+                "power": tiers.get("power"),
+
+                "resilience": tiers.get("resistance"),
+
+                "armor": 0 if equipment.get("armor_destroyed") else equipment.get("armor_tier", 0),
+
+                "skills": attributes.get("skills"),
+
+                "resourcefulness": attributes.get("resourcefulness")
+
+            }
+
+        }
+
+    store = get_hero_store()
+
+    row = store.find(name)
+
+    if row is None:
+
+        return None
+
+    return {
+
+        "name": store.names[row],
+
+        "source": "hero_database",
+
+        "stats": {column: None if values[row] == HERO_MISSING_STAT else values[row] for column, values in store.stats.items()}
+
+    }
+
+def hero_param_resolver(sides):
+
+    """
+    Build a validate_params prepare hook for <side>_hero params.
+    sides: {side: {route_param: hero_stat}}. Params given explicitly win over hero stats;
+    the resolved combatants are left in g.resolved_heroes for the response.
+    """
+
+    def prepare(raw):
+
+        merged = dict(raw)
+
+        errors = []
+
+        resolved = {}
+
+        for side, params in sides.items():
+
+            name = raw.get(f"{side}_hero")
+
+            if name in (None, ""):
+
+                continue
+
+            profile = combatant_profile(str(name))
+
+            if profile is None:
+
+                errors.append({"field": f"{side}_hero", "error": "not_found", "message": f"{side}_hero '{name}' not found (hero name, alias or \"{SELF_COMBATANT}\")"})
+
+                continue
+
+            resolved[side] = {"name": profile["name"], "source": profile["source"], "applied": {}}
+
+            for param, stat in params.items():
+
+                if merged.get(param) in (None, "") and profile["stats"].get(stat) is not None:
+
+                    merged[param] = profile["stats"][stat]
+
+                    resolved[side]["applied"][param] = merged[param]
+
+        g.resolved_heroes = resolved
+
+        return merged, errors
+
+    return prepare
+
+HERO_ENGINE_STATS = {"speed": "movement", "reflexes": "reflexes", "power": "power", "resistance": "resilience"}
+
+COMBAT_HERO_PARAMS = {
+
+    side: dict(
+
+        {f"{side}_{stat}_tier": hero_stat for stat, hero_stat in HERO_ENGINE_STATS.items()},
+
+        **{f"{side}_{attribute}": attribute for attribute in ("skills", "resourcefulness")}
+
+    )
+
+    for side in ("actor", "defender")
+
+}
+
+HERO_PARAM = {"type": "str"}
+
+def scan_session_numbers(sessions_dir):
+
+    """Get the highest session number from session files (index rebuild only)"""
+
+    if not sessions_dir.exists():
+
+        return 0
+
+    numbers = []
+
+    for f in sessions_dir.glob("session_*.json"):
+
+        try:
+
+            num = int(f.stem.split('_')[1])
+
+            numbers.append(num)
+
+        except:
+
+            pass
+
+    return max(numbers) if numbers else 0
+
+def get_latest_session_number():
+
+    """Get the highest session number of the current campaign from its session index"""
+
+    return current_campaign().session_index()["latest_session_number"]
+
+# Campaign export / import (NDJSON, one record per line)
+
+CAMPAIGN_EXPORT_FORMAT = "imperor-omo-campaign"
+
+CAMPAIGN_EXPORT_FORMAT_VERSION = 1
+
+# Append-only logs inside the documents, exported one entry per record so no line grows with them
+
+CAMPAIGN_EVENT_LOGS = {
+
+    "character": (("advancement", "premonitions_completed"), ("advancement", "enhancement_log"), ("advancement", "ability_log")),
+
+    "world": (("event_queue", "pending"),)
+
+}
+
+def iter_campaign_export(campaign, include_history=True, include_sessions=True):
+
+    """
+    Yield a campaign as NDJSON lines:
+      header, document (event logs emptied), log (one per log entry), history (one per
+      version record), object (snapshot sections), session, session_index, end.
+    Documents and history lengths are captured under the campaign lock; everything else
+    is streamed from disk line by line, so memory does not grow with the logs.
+    The end record carries the record count and the sha256 of all preceding lines.
+    """
+
+    with campaign.lock:
+
+        # Versions pending in group/WAL mode are written out first, so the history covers all of them
+
+        campaign.flush()
+
+        campaign.checkpoint()
+
+        documents = {name: json.loads(json.dumps(campaign.load(name))) for name in STATE_DOCUMENTS}
+
+        versions = {name: campaign.version(name) for name in STATE_DOCUMENTS}
+
+        session_index = json.loads(json.dumps(campaign.session_index()))
+
+    digest = hashlib.sha256()
+
+    count = 0
+
+    def emit(record):
+
+        nonlocal count
+
+        line = (canonical_json(record) + "\n").encode("utf-8")
+
+        digest.update(line)
+
+        count += 1
+
+        return line
+
+    yield emit({
+
+        "type": "header",
+
+        "format": CAMPAIGN_EXPORT_FORMAT,
+
+        "format_version": CAMPAIGN_EXPORT_FORMAT_VERSION,
+
+        "campaign": campaign.campaign_id,
+
+        "rules_version": current_rules().version_tag,
+
+        "exported_at": datetime.now().isoformat()
+
+    })
+
+    for name, document in documents.items():
+
+        if document is None:
+
+            continue
+
+        logs = []
+
+        for path in CAMPAIGN_EVENT_LOGS.get(name, ()):
+
+            parent = nested_value(document, path[:-1])
+
+            if isinstance(parent, dict) and isinstance(parent.get(path[-1]), list):
+
+                logs.append((path, parent[path[-1]]))
+
+                parent[path[-1]] = []
+
+        yield emit({"type": "document", "name": name, "version": versions[name], "data": document})
+
+        for path, entries in logs:
+
+            for entry in entries:
+
+                yield emit({"type": "log", "document": name, "path": list(path), "entry": entry})
+
+    if include_history:
+
+        for name in STATE_DOCUMENTS:
+
+            path = campaign.history_path(name)
+
+            if not path.exists():
+
+                continue
+
+            with open(path, 'rb') as f:
+
+                for line in f:
+
+                    if not line.strip():
+
+                        continue
+
+                    record = json.loads(line)
+
+                    if record["version"] > versions[name]:
+
+                        break
+
+                    yield emit({"type": "history", "document": name, "record": record})
+
+        objects_dir = campaign.sessions_dir / "objects"
+
+        if objects_dir.exists():
+
+            for object_file in sorted(objects_dir.glob("*.json")):
+
+                yield emit({"type": "object", "digest": object_file.stem, "value": read_json_file(object_file)})
+
+    if include_sessions:
+
+        for number in range(1, session_index["latest_session_number"] + 1):
+
+            record = read_json_file(campaign.sessions_dir / f"session_{number}.json")
+
+            if record is not None:
+
+                yield emit({"type": "session", "number": number, "record": record})
+
+        yield emit({"type": "session_index", "data": session_index})
+
+    yield (canonical_json({"type": "end", "records": count, "sha256": digest.hexdigest()}) + "\n").encode("utf-8")
+
+def import_campaign_stream(campaign, lines):
+
+    """
+    Rebuild a campaign from iter_campaign_export lines. Files are staged in a temporary
+    directory and only moved into place once the end record has verified count and
+    checksum, so a truncated or corrupted upload leaves nothing behind.
+    Returns a summary {records, documents, history, objects, sessions}. Raises ValueError.
+    """
+
+    if campaign.exists():
+
+        raise ValueError(f"Campaign '{campaign.campaign_id}' already exists")
+
+    CAMPAIGNS_DIR.mkdir(parents=True, exist_ok=True)
+
+    staging = Path(tempfile.mkdtemp(prefix=".import-", dir=CAMPAIGNS_DIR))
+
+    history_files = {}
+
+    try:
+
+        digest = hashlib.sha256()
+
+        counts = {"records": 0, "documents": 0, "logs": 0, "history": 0, "objects": 0, "sessions": 0}
+
+        documents = {}
+
+        ended = False
+
+        for line in lines:
+
+            if isinstance(line, str):
+
+                line = line.encode("utf-8")
+
+            if not line.strip():
+
+                continue
+
+            if ended:
+
+                raise ValueError("records after the end record")
+
+            record = json.loads(line)
+
+            if not isinstance(record, dict):
+
+                raise ValueError(f"record {counts['records'] + 1} is not an object")
+
+            kind = record.get("type")
+
+            if kind == "end":
+
+                if record.get("records") != counts["records"] or record.get("sha256") != digest.hexdigest():
+
+                    raise ValueError("export is incomplete or corrupted (record count or checksum mismatch)")
+
+                ended = True
+
+                continue
+
+            if counts["records"] == 0 and (kind != "header" or record.get("format") != CAMPAIGN_EXPORT_FORMAT):
+
+                raise ValueError("not a campaign export (missing header)")
+
+            if kind == "header" and record.get("format_version") != CAMPAIGN_EXPORT_FORMAT_VERSION:
+
+                raise ValueError(f"unsupported export format_version {record.get('format_version')}")
+
+            digest.update(line if line.endswith(b"\n") else line + b"\n")
+
+            counts["records"] += 1
+
+            if kind == "document":
+
+                if record["name"] not in STATE_DOCUMENTS:
+
+                    raise ValueError(f"unknown document '{record['name']}'")
+
+                documents[record["name"]] = record["data"]
+
+                counts["documents"] += 1
+
+            elif kind == "log":
+
+                path = record["path"]
+
+                if tuple(path) not in CAMPAIGN_EVENT_LOGS.get(record["document"], ()) or record["document"] not in documents:
+
+                    raise ValueError(f"log entry for unknown log {record['document']}.{'.'.join(path)}")
+
+                parent = documents[record["document"]]
+
+                for key in path[:-1]:
+
+                    parent = parent.setdefault(key, {})
+
+                parent.setdefault(path[-1], []).append(record["entry"])
+
+                counts["logs"] += 1
+
+            elif kind == "history":
+
+                if record["document"] not in STATE_DOCUMENTS:
+
+                    raise ValueError(f"unknown document '{record['document']}'")
+
+                if record["document"] not in history_files:
+
+                    (staging / "history").mkdir(exist_ok=True)
+
+                    history_files[record["document"]] = open(staging / "history" / f"{record['document']}.jsonl", 'wb')
+
+                history_files[record["document"]].write((canonical_json(record["record"]) + "\n").encode("utf-8"))
+
+                counts["history"] += 1
+
+            elif kind == "object":
+
+                if not re.fullmatch(r"[0-9a-f]{64}", str(record["digest"])):
+
+                    raise ValueError("invalid object digest")
+
+                write_json_file(staging / "sessions" / "objects" / f"{record['digest']}.json", record["value"])
+
+                counts["objects"] += 1
+
+            elif kind == "session":
+
+                write_json_file(staging / "sessions" / f"session_{int(record['number'])}.json", record["record"])
+
+                counts["sessions"] += 1
+
+            elif kind == "session_index":
+
+                write_json_file(staging / "sessions" / "index.json", record["data"])
+
+            elif kind != "header":
+
+                raise ValueError(f"unknown record type '{kind}'")
+
+        for history_file in history_files.values():
+
+            history_file.close()
+
+        if not ended:
+
+            raise ValueError("export is truncated (no end record)")
+
+        if not documents:
+
+            raise ValueError("export contains no state documents")
+
+        for name, document in documents.items():
+
+            write_json_file(staging / STATE_DOCUMENTS[name], document)
+
+        with campaign.lock:
+
+            if campaign.exists():
+
+                raise ValueError(f"Campaign '{campaign.campaign_id}' already exists")
+
+            for staged in sorted(staging.rglob("*")):
+
+                if staged.is_file():
+
+                    target = campaign.root / staged.relative_to(staging)
+
+                    target.parent.mkdir(parents=True, exist_ok=True)
+
+                    os.replace(staged, target)
+
+            campaign.reset()
+
+        return counts
+
+    except (KeyError, TypeError) as e:
+
+        raise ValueError(f"record {counts['records']} is malformed ({type(e).__name__}: {e})")
+
+    finally:
+
+        for history_file in history_files.values():
+
+            history_file.close()
+
+        shutil.rmtree(staging, ignore_errors=True)
+
+# ================================================================================
+
+# SECTION 4: CALCULATION ENGINES
+
+# ================================================================================
+
+def calculate_enhancement_cost(enhancement_number):
+
+    """Calculate DC cost for stat enhancement. Formula: RULES.progression.enhancement_formula"""
+
+    if enhancement_number < 1:
+
+        return 0
+
+    return rule_formula("enhancement_cost")(n=enhancement_number)
+
+def calculate_ability_reroll_cost(current_enhancement_number):
+
+    """Calculate DC cost to reroll ability (next tier price, don't increment). Formula: RULES.abilities.reroll_formula"""
+
+    return rule_formula("reroll_cost")(n=current_enhancement_number)
+
+def calculate_stat_advantage(actor_tier, defender_tier, stat_type):
+
+    """Calculate raw advantage for one stat comparison"""
+
+    if stat_type not in RULES.stat_multipliers:
+
+        return {"error": f"Invalid stat_type '{stat_type}'"}
+
+    multiplier = RULES.stat_multipliers[stat_type]
+
+    tier_difference = actor_tier - defender_tier
+
+    advantage = rule_formula("stat_comparison")(actor_tier=actor_tier, defender_tier=defender_tier, multiplier=multiplier)
+
+    return {
+
+        "stat_type": stat_type,
+
+        "actor_tier": actor_tier,
+
+        "defender_tier": defender_tier,
+
+        "tier_difference": tier_difference,
+
+        "multiplier": multiplier,
+
+        "advantage": round(advantage, 2)
+
+    }
+
+def calculate_skills_resourcefulness_advantage(actor_skills, actor_resourcefulness, actor_dc_mod,
+
+    defender_skills, defender_resourcefulness, defender_dc_mod):
+
+    """Calculate skills advantage with per-character DC modifiers"""
+
+    effective_score = rule_formula("skills")
+
+    actor_effective = effective_score(skills=actor_skills, resourcefulness=actor_resourcefulness, dc_modifier=actor_dc_mod)
+
+    defender_effective = effective_score(skills=defender_skills, resourcefulness=defender_resourcefulness, dc_modifier=defender_dc_mod)
+
+    advantage = actor_effective - defender_effective
+
+    return {
+
+        "actor_raw_score": actor_skills + actor_resourcefulness,
+
+        "actor_dc_modifier": actor_dc_mod,
+
+        "actor_effective_score": actor_effective,
+
+        "defender_raw_score": defender_skills + defender_resourcefulness,
+
+        "defender_dc_modifier": defender_dc_mod,
+
+        "defender_effective_score": defender_effective,
+
+        "advantage": round(advantage, 2)
+
+    }
+
+def calculate_premonition_dc(actor_tier, threat_tier):
+
+    """Calculate DC reward for premonition. Formula: RULES.premonition.dc_reward_formula"""
+
+    return int(rule_formula("premonition_dc")(actor_tier=actor_tier, threat_tier=threat_tier))
+
+PREMONITION_BUCKET_WIDTH = 5
+
+PREMONITION_PRIOR_WEIGHT = 2
+
+def premonition_bucket(threat_tier):
+
+    """Threat-tier bucket label: 1-5, 6-10, ... 21-25"""
+
+    low = (threat_tier - 1) // PREMONITION_BUCKET_WIDTH * PREMONITION_BUCKET_WIDTH + 1
+
+    return f"{low}-{low + PREMONITION_BUCKET_WIDTH - 1}"
+
+def record_premonition_outcome(stats, threat_tier, success, dc_awarded):
+
+    """Fold one resolved premonition into the running aggregates (O(1) per resolve)"""
+
+    for counter in (stats, stats["buckets"].setdefault(premonition_bucket(threat_tier), {"attempts": 0, "successes": 0, "dc_earned": 0})):
+
+        counter["attempts"] += 1
+
+        counter["successes"] += 1 if success else 0
+
+        counter["dc_earned"] += dc_awarded
+
+    return stats
+
+def build_premonition_stats(history):
+
+    """Aggregate a premonitions_completed log in one pass (used once for characters that predate the aggregates)"""
+
+    stats = {"attempts": 0, "successes": 0, "dc_earned": 0, "buckets": {}}
+
+    for entry in history:
+
+        record_premonition_outcome(stats, max(1, entry.get("threat_tier", 1)), bool(entry.get("success")), entry.get("dc_awarded", 0))
+
+    return stats
+
+def premonition_success_rate(stats, threat_tier):
+
+    """
+    Smoothed success rate for a threat tier. The overall rate is Laplace-smoothed
+    ((s + 1) / (n + 2)) and each bucket is shrunk towards it, so thin buckets lean on
+    the overall record and an empty history gives 0.5.
+    """
+
+    overall = (stats["successes"] + 1) / (stats["attempts"] + 2)
+
+    bucket = stats["buckets"].get(premonition_bucket(threat_tier), {"attempts": 0, "successes": 0})
+
+    return (bucket["successes"] + PREMONITION_PRIOR_WEIGHT * overall) / (bucket["attempts"] + PREMONITION_PRIOR_WEIGHT)
+
+def calculate_armor_status(attack_power_tier, armor_tier, character_resilience_tier):
+
+    """Determine if armor is destroyed and effective resilience"""
+
+    armor_destroyed = attack_power_tier > armor_tier
+
+    effective_resilience = max(armor_tier, character_resilience_tier)
+
+    return {
+
+        "attack_power_tier": attack_power_tier,
+
+        "armor_tier": armor_tier,
+
+        "character_resilience_tier": character_resilience_tier,
+
+        "armor_destroyed": armor_destroyed,
+
+        "effective_resilience_for_damage": effective_resilience
+
+    }
+
+COMBATANT_SIDES = ("actor", "defender")
+
+def sample_noise(rng, variance_model, sigma, count):
+
+    """Per-trial performance noise with standard deviation sigma (uniform uses the same variance)"""
+
+    if variance_model == "none" or sigma == 0:
+
+        return [0.0] * count
+
+    if variance_model == "uniform":
+
+        half_width = sigma * math.sqrt(3)
+
+        uniform = rng.uniform
+
+        return [uniform(-half_width, half_width) for _ in range(count)]
+
+    gauss = rng.gauss
+
+    return [gauss(0.0, sigma) for _ in range(count)]
+
+def sample_tier_offsets(rng, variance_model, sigma, count):
+
+    """
+    Per-trial tier noise rounded to whole tiers, drawn straight from the distribution of
+    round(noise) (sample_noise, then rounding, without a float per trial)
+    """
+
+    if variance_model == "none" or sigma == 0:
+
+        return [0] * count
+
+    if variance_model == "uniform":
+
+        half_width = sigma * math.sqrt(3)
+
+        reach = math.ceil(half_width + 0.5)
+
+        mass = lambda k: max(0.0, min(k + 0.5, half_width) - max(k - 0.5, -half_width)) / (2 * half_width)
+
+    else:
+
+        reach = math.ceil(6 * sigma)
+
+        mass = lambda k: (math.erf((k + 0.5) / (sigma * math.sqrt(2))) - math.erf((k - 0.5) / (sigma * math.sqrt(2)))) / 2
+
+    offsets = range(-reach, reach + 1)
+
+    cumulative = list(accumulate(mass(k) for k in offsets))
+
+    return rng.choices(offsets, cum_weights=cumulative, k=count)
+
+def simulate_combat(actor, defender, trials, seed, variance_model, tier_sigma, skill_sigma):
+
+    """
+    Monte Carlo over the stat advantage model of /calculate/combat. Each trial jitters
+    every tier of both sides (to a whole tier within the tier range) and the skills score
+    of both sides; the actor wins a trial when the total advantage (stat advantages +
+    skills/resourcefulness advantage) is > 0.
+
+    Stat advantages are read from the compiled stat_comparison formula, tabulated per
+    tier pair, and the skills advantage from the skills formula, so both endpoints follow
+    the same rules.json curves. Sensitivities reuse the same samples (common random
+    numbers) and only recompute the changed term, so they are exact differences rather
+    than resampled noise.
+    actor/defender: {speed, reflexes, power, resistance, skills, resourcefulness, dc_modifier, armor_tier}
+    """
+
+    rng = random.Random(seed)
+
+    multipliers = RULES.stat_multipliers
+
+    stat_comparison = rule_formula("stat_comparison")
+
+    skills_formula = rule_formula("skills")
+
+    tiers = range(0, RULES.system.universal_max + 1)
+
+    # Whole-tier jitter of each side per trial; a side's tier in a trial is clamp(tier + offset)
+
+    offsets = {stat: tuple(sample_tier_offsets(rng, variance_model, tier_sigma, trials) for _ in COMBATANT_SIDES) for stat in multipliers}
+
+    if variance_model == "normal":
+
+        # The difference of two independent normals is normal: one draw per trial
+
+        skill_noise = sample_noise(rng, variance_model, skill_sigma * math.sqrt(2), trials)
+
+    else:
+
+        skill_noise = [a - d for a, d in zip(*(sample_noise(rng, variance_model, skill_sigma, trials) for _ in COMBATANT_SIDES))]
+
+    def clamp(tier):
+
+        return min(tiers[-1], max(tiers[0], tier))
+
+    def advantage(stat, actor_tier, defender_tier):
+
+        return stat_comparison(actor_tier=clamp(actor_tier), defender_tier=clamp(defender_tier), multiplier=multipliers[stat])
+
+    def stat_column(stat):
+
+        """Advantage of one stat in every trial: the formula tabulated per (actor, defender) offset pair"""
+
+        actor_offsets, defender_offsets = offsets[stat]
+
+        table = {a: {d: advantage(stat, actor[stat] + a, defender[stat] + d) for d in set(defender_offsets)} for a in set(actor_offsets)}
+
+        return [table[a][d] for a, d in zip(actor_offsets, defender_offsets)]
+
+    def skills_advantage(actor_side, defender_side):
+
+        def effective(side):
+
+            return skills_formula(skills=side["skills"], resourcefulness=side["resourcefulness"], dc_modifier=side["dc_modifier"])
+
+        return effective(actor_side) - effective(defender_side)
+
+    columns = {stat: stat_column(stat) for stat in multipliers}
+
+    base_skills = skills_advantage(actor, defender)
+
+    totals = [base_skills + noise + sum(advantages) for noise, *advantages in zip(skill_noise, *columns.values())]
+
+    sorted_totals = sorted(totals)
+
+    def outcome(shift):
+
+        # Skills terms move every trial by the same amount: actor wins when total + shift > 0
+
+        below = bisect_left(sorted_totals, -shift)
+
+        above = bisect_right(sorted_totals, -shift)
+
+        return (trials - above) / trials, (above - below) / trials
+
+    win_probability, draw_probability = outcome(0)
+
+    sensitivity = {}
+
+    for stat in multipliers:
+
+        # A +1 tier moves every trial with the same offset pair of this stat by the same amount
+
+        groups = {}
+
+        for total, a, d in zip(totals, *offsets[stat]):
+
+            groups.setdefault((a, d), []).append(total)
+
+        for group in groups.values():
+
+            group.sort()
+
+        def shifted_win_probability(actor_step, defender_step):
+
+            wins = 0
+
+            for (a, d), group in groups.items():
+
+                shift = advantage(stat, actor[stat] + actor_step + a, defender[stat] + defender_step + d) - advantage(stat, actor[stat] + a, defender[stat] + d)
+
+                wins += len(group) - bisect_right(group, -shift)
+
+            return wins / trials
+
+        sensitivity[stat] = {
+
+            "actor_plus_one": round(shifted_win_probability(1, 0) - win_probability, 4),
+
+            "defender_plus_one": round(shifted_win_probability(0, 1) - win_probability, 4)
+
+        }
+
+    for field in ("skills", "resourcefulness", "dc_modifier"):
+
+        sensitivity[field] = {
+
+            "actor_plus_one": round(outcome(skills_advantage(dict(actor, **{field: actor[field] + 1}), defender) - base_skills)[0] - win_probability, 4),
+
+            "defender_plus_one": round(outcome(skills_advantage(actor, dict(defender, **{field: defender[field] + 1})) - base_skills)[0] - win_probability, 4)
+
+        }
+
+    deterministic_score = base_skills + sum(stat_comparison(actor_tier=actor[stat], defender_tier=defender[stat], multiplier=multiplier) for stat, multiplier in multipliers.items())
+
+    def armor_destruction_rate(wearer, attacker_side):
+
+        armor_tier = wearer["armor_tier"]
+
+        if armor_tier <= 0:
+
+            return None
+
+        attack_tier = (actor if attacker_side == "actor" else defender)["power"]
+
+        # Same rule as calculate_armor_status: destroyed when attack_power_tier > armor_tier
+
+        power_rolls = sample_tier_offsets(rng, variance_model, tier_sigma, trials)
+
+        destroyed = sum(1 for roll in power_rolls if attack_tier + roll > armor_tier)
+
+        return round(destroyed / trials, 4)
+
+    return {
+
+        "trials": trials,
+
+        "seed": seed,
+
+        "variance_model": variance_model,
+
+        "tier_sigma": tier_sigma,
+
+        "skill_sigma": skill_sigma,
+
+        "deterministic_score": round(deterministic_score, 2),
+
+        "expected_score": round(sum(totals) / trials, 2),
+
+        "actor_win_probability": round(win_probability, 4),
+
+        "draw_probability": round(draw_probability, 4),
+
+        "defender_win_probability": round(1 - win_probability - draw_probability, 4),
+
+        "actor_armor_destruction_rate": armor_destruction_rate(actor, "defender"),
+
+        "defender_armor_destruction_rate": armor_destruction_rate(defender, "actor"),
+
+        "win_probability_sensitivity": sensitivity
+
+    }
+
+def empty_ledger():
+
+    return {"enhancements_total": 0, "enhancements_by_stat": {stat: 0 for stat in RULES.system.stats}}
+
+def iter_ledger_events(advancement):
+
+    """
+    Stream the DC-bearing entries of the advancement logs as (kind, dc, stat) tuples:
+    earn from premonitions_completed, spend from enhancement_log and ability_log.
+    """
+
+    earned = (("earn", entry.get("dc_awarded", 0), None) for entry in advancement.get("premonitions_completed", []))
+
+    enhanced = (("enhance", entry.get("dc_spent", 0), entry.get("stat")) for entry in advancement.get("enhancement_log", []))
+
+    spent = (("spend", entry.get("dc_spent", 0), None) for entry in advancement.get("ability_log", []) if "dc_spent" in entry)
+
+    return chain(earned, enhanced, spent)
+
+def rebuild_ledger(advancement):
+
+    """Recompute dc_balance and ledger aggregates from the logs in one streaming pass"""
+
+    ledger = empty_ledger()
+
+    earned_total = spent_total = 0
+
+    for kind, dc, stat in iter_ledger_events(advancement):
+
+        if kind == "earn":
+
+            earned_total += dc
+
+            continue
+
+        spent_total += dc
+
+        if kind == "enhance":
+
+            ledger["enhancements_total"] += 1
+
+            ledger["enhancements_by_stat"][stat] = ledger["enhancements_by_stat"].get(stat, 0) + 1
+
+    dc_balance = {"current_balance": earned_total - spent_total, "earned_total": earned_total, "spent_total": spent_total}
+
+    return dc_balance, ledger
+
+def character_ledger(character):
+
+    """
+    Running aggregates of a character, kept at advancement.ledger next to dc_balance.
+    Characters that predate the ledger are backfilled from their logs once.
+    """
+
+    advancement = character.setdefault("advancement", {})
+
+    if "dc_balance" not in advancement:
+
+        advancement["dc_balance"] = {"current_balance": 0, "earned_total": 0, "spent_total": 0}
+
+    if "ledger" not in advancement:
+
+        advancement["ledger"] = rebuild_ledger(advancement)[1]
+
+    return advancement["ledger"]
+
+# Aggregates of the advancement logs, kept in step by the routes that append to the logs
+
+ADVANCEMENT_AGGREGATES = ("dc_balance", "ledger", "premonition_stats")
+
+def rebuild_advancement_aggregates(advancement):
+
+    """Recompute every aggregate from the advancement logs (after the logs were edited directly)"""
+
+    advancement["dc_balance"], advancement["ledger"] = rebuild_ledger(advancement)
+
+    advancement["premonition_stats"] = build_premonition_stats(advancement.get("premonitions_completed", []))
+
+def post_ledger_entry(character, kind, dc, stat=None):
+
+    """
+    Apply one mutation to the O(1) aggregates: "earn" credits DC, "spend" debits DC,
+    "enhance" debits DC and counts an enhancement of stat. Call alongside appending the log entry.
+    """
+
+    ledger = character_ledger(character)
+
+    dc_balance = character["advancement"]["dc_balance"]
+
+    if kind == "earn":
+
+        dc_balance["current_balance"] += dc
+
+        dc_balance["earned_total"] += dc
+
+        return ledger
+
+    dc_balance["current_balance"] -= dc
+
+    dc_balance["spent_total"] += dc
+
+    if kind == "enhance":
+
+        ledger["enhancements_total"] += 1
+
+        ledger["enhancements_by_stat"][stat] = ledger["enhancements_by_stat"].get(stat, 0) + 1
+
+    return ledger
+
+def enhancement_limit_error(ledger, stat):
+
+    """Return (reason, message) if enhancing stat would break RULES.progression limits, else None"""
+
+    progression = RULES.progression
+
+    if ledger["enhancements_total"] >= progression["max_enhancements"]:
+
+        return "max_enhancements_reached", f"All {progression['max_enhancements']} enhancements have been used"
+
+    if ledger["enhancements_by_stat"].get(stat, 0) >= progression["max_enhancements_per_stat"]:
+
+        return "max_enhancements_per_stat_reached", f"{stat} has used all {progression['max_enhancements_per_stat']} enhancements"
+
+    return None
+
+def apply_merge_patch(target, patch):
+
+    """
+    JSON Merge Patch (RFC 7396), applied in place where possible. Objects merge
+    recursively, null deletes a member, anything else replaces the target value.
+    Returns the patched value (the same object when target and patch are objects).
+    """
+
+    if not isinstance(patch, dict):
+
+        return patch
+
+    if not isinstance(target, dict):
+
+        target = {}
+
+    for key, value in patch.items():
+
+        if value is None:
+
+            target.pop(key, None)
+
+        else:
+
+            target[key] = apply_merge_patch(target.get(key), value)
+
+    return target
+
+# threshold_NN (or threshold_up_NN) fires when an indicator rises to NN, threshold_down_NN when it falls to NN
+
+THRESHOLD_KEY_PATTERN = re.compile(r"^threshold_(?:(up|down)_)?(\d+(?:\.\d+)?)$")
+
+THRESHOLD_DIRECTIONS = ("up", "down")
+
+def tidy_number(value):
+
+    """Round to 2 decimals and drop the fraction when it is whole (keeps JSON ints as ints)"""
+
+    value = round(value, 2)
+
+    return int(value) if value == int(value) else value
+
+def parse_thresholds(indicator):
+
+    """
+    Sorted threshold index of one indicator per direction:
+    {"up": {"levels": [NN, ...], "entries": [(key, event), ...]}, "down": {...}}
+    """
+
+    parsed = {direction: [] for direction in THRESHOLD_DIRECTIONS}
+
+    for key, description in indicator.items():
+
+        match = THRESHOLD_KEY_PATTERN.match(key)
+
+        if match:
+
+            parsed[match.group(1) or "up"].append((float(match.group(2)), key, description))
+
+    index = {}
+
+    for direction, entries in parsed.items():
+
+        entries.sort()
+
+        index[direction] = {
+
+            "levels": [level for level, _, _ in entries],
+
+            "entries": [(key, description) for _, key, description in entries]
+
+        }
+
+    return index
+
+def build_threshold_index(world):
+
+    """Per-indicator threshold index for a world document (cached via Campaign.derived)"""
+
+    indicators = (world or {}).get("escalation_indicators", {})
+
+    return {name: parse_thresholds(indicator) for name, indicator in indicators.items() if isinstance(indicator, dict)}
+
+# Derived indexes built as soon as a campaign document is loaded: {document: {key: builder}}
+
+DOCUMENT_INDEXES = {"world": {"thresholds": build_threshold_index}}
+
+def thresholds_crossed(thresholds, old_value, new_value):
+
+    """
+    Thresholds fired when a value moves old -> new: [(level, key, event, direction)] in
+    crossing order. A rise fires only "up" thresholds, a fall only "down" thresholds.
+    """
+
+    if new_value > old_value:
+
+        direction = "up"
+
+        levels = thresholds[direction]["levels"]
+
+        positions = range(bisect_right(levels, old_value), bisect_right(levels, new_value))
+
+    elif new_value < old_value:
+
+        direction = "down"
+
+        levels = thresholds[direction]["levels"]
+
+        positions = reversed(range(bisect_left(levels, new_value), bisect_left(levels, old_value)))
+
+    else:
+
+        return []
+
+    return [(levels[i],) + thresholds[direction]["entries"][i] + (direction,) for i in positions]
+
+def simulate_escalation(indicator_name, indicator, thresholds, days, start_date):
+
+    """
+    Advance one escalation indicator by `days` in closed form and list the thresholds
+    it crosses. A rising indicator fires threshold_NN when value goes from below NN
+    to >= NN, a falling one fires threshold_down_NN when it goes from above NN to <= NN.
+    The crossing date is solved from the linear rate, so multi-month jumps cost the
+    same as one day.
+    """
+
+    value = indicator.get("value")
+
+    rate = indicator.get("escalating_per_week", 0) or 0
+
+    if not isinstance(value, (int, float)) or not isinstance(rate, (int, float)) or rate == 0 or days == 0:
+
+        return value, []
+
+    low = RULES.escalation.value_min
+
+    high = RULES.escalation.value_max
+
+    daily_rate = rate / 7
+
+    new_value = min(high, max(low, value + daily_rate * days))
+
+    events = []
+
+    for level, key, description, direction in thresholds_crossed(thresholds, value, new_value):
+
+        days_until = (level - value) / daily_rate
+
+        events.append({
+
+            "indicator": indicator_name,
+
+            "threshold": key,
+
+            "level": tidy_number(level),
+
+            "direction": direction,
+
+            "event": description,
+
+            "days_into_advance": round(days_until, 2),
+
+            "trigger_date": (start_date + timedelta(days=days_until)).isoformat() if start_date else None
+
+        })
+
+    return new_value, events
+
+def advance_escalation_indicators(world, threshold_index, days, start_date, new_date):
+
+    """
+    Apply one simulation step to every escalation indicator. Returns (changes, events).
+    Values are stored at full precision so repeated short advances match one long one;
+    only the reported changes are tidied.
+    """
+
+    changes = {}
+
+    events = []
+
+    for name, indicator in world.get("escalation_indicators", {}).items():
+
+        if not isinstance(indicator, dict):
+
+            continue
+
+        new_value, crossed = simulate_escalation(name, indicator, (threshold_index.get(name) or parse_thresholds(indicator)), days, start_date)
+
+        if new_value != indicator.get("value"):
+
+            changes[name] = {"from": tidy_number(indicator["value"]), "to": tidy_number(new_value)}
+
+            indicator["value"] = new_value
+
+            if new_date:
+
+                indicator.pop("last_updated", None)
+
+                indicator["timestamp"] = new_date.isoformat()
+
+        events.extend(crossed)
+
+    events.sort(key=lambda event: event["days_into_advance"])
+
+    return changes, events
+
+def upcoming_thresholds(world, threshold_index, limit, indicator_filter=None):
+
+    """
+    Next `limit` thresholds across all indicators at their current escalating_per_week,
+    ordered by ETA. Thresholds outside the value range can never fire and are skipped.
+    """
+
+    low = RULES.escalation.value_min
+
+    high = RULES.escalation.value_max
+
+    current = datetime.fromisoformat(world["current_date"]) if world.get("current_date") else None
+
+    candidates = []
+
+    for name, indicator in world.get("escalation_indicators", {}).items():
+
+        if indicator_filter and name != indicator_filter:
+
+            continue
+
+        if not isinstance(indicator, dict):
+
+            continue
+
+        value = indicator.get("value")
+
+        rate = indicator.get("escalating_per_week", 0) or 0
+
+        if not isinstance(value, (int, float)) or not isinstance(rate, (int, float)) or rate == 0:
+
+            continue
+
+        target = high if rate > 0 else low
+
+        for level, key, description, direction in thresholds_crossed((threshold_index.get(name) or parse_thresholds(indicator)), value, target):
+
+            eta_days = (level - value) / (rate / 7)
+
+            candidates.append((eta_days, name, key, level, description, direction))
+
+    upcoming = []
+
+    for eta_days, name, key, level, description, direction in heapq.nsmallest(limit, candidates):
+
+        upcoming.append({
+
+            "indicator": name,
+
+            "threshold": key,
+
+            "level": tidy_number(level),
+
+            "direction": direction,
+
+            "event": description,
+
+            "current_value": tidy_number(world["escalation_indicators"][name]["value"]),
+
+            "escalating_per_week": world["escalation_indicators"][name]["escalating_per_week"],
+
+            "eta_days": round(eta_days, 2),
+
+            "eta_date": (current + timedelta(days=eta_days)).isoformat() if current else None
+
+        })
+
+    return upcoming
+
+def enqueue_world_events(world, events):
+
+    """Append fired threshold events to the world's persistent unacknowledged-event queue"""
+
+    queue = world.setdefault("event_queue", {"next_event_id": 1, "pending": []})
+
+    queued = []
+
+    for event in events:
+
+        record = dict(event, event_id=queue["next_event_id"], world_date=world.get("current_date"))
+
+        queue["pending"].append(record)
+
+        queue["next_event_id"] += 1
+
+        queued.append(record["event_id"])
+
+    return queued
+
+TIER_DESCRIPTOR_STATS = {"movement_speed": "speed", "reflex_speed": "reflexes", "power": "power", "resistance": "resistance"}
+
+class TierCatalog:
+
+    """
+    Tier reference responses rendered once from a tiers table into immutable bytes.
+    Every contiguous range and every ordered A-vs-B comparison is pre-rendered with its
+    ETag; arbitrary lists are joined from pre-rendered per-tier fragments.
+    Bodies carry no per-request timestamp so that their ETags stay stable.
+    """
+
+    def __init__(self, tiers, multipliers):
+
+        self.tier_numbers = sorted(tiers)
+
+        self.generated_at = datetime.now().isoformat()
+
+        self.fragments = {tier: canonical_json(dict(tiers[tier], tier_number=tier)).encode("utf-8") for tier in self.tier_numbers}
+
+        self.version = hashlib.sha256(b"".join(self.fragments.values())).hexdigest()[:16]
+
+        self.ranges = {}
+
+        for position, low in enumerate(self.tier_numbers):
+
+            for high in self.tier_numbers[position:]:
+
+                self.ranges[(low, high)] = self.render_list(range(low, high + 1))
+
+        self.comparisons = {
+
+            (tier_a, tier_b): self.render_comparison(tiers, multipliers, tier_a, tier_b)
+
+            for tier_a in self.tier_numbers for tier_b in self.tier_numbers
+
+        }
+
+    def render(self, body):
+
+        return body, hashlib.sha256(body).hexdigest()[:32]
+
+    def envelope(self, view, payload_key, payload):
+
+        return (
+
+            b'{"catalog_version":' + json.dumps(self.version).encode() +
+
+            b',"generated_at":' + json.dumps(self.generated_at).encode() +
+
+            b',"status":"SUCCESS","view":' + json.dumps(view).encode() +
+
+            b',"' + payload_key.encode() + b'":' + payload + b'}'
+
+        )
+
+    def render_list(self, tier_numbers):
+
+        tier_numbers = list(tier_numbers)
+
+        payload = b"[" + b",".join(self.fragments[tier] for tier in tier_numbers) + b"]"
+
+        return self.render(self.envelope("list", "tiers", payload))
+
+    def render_comparison(self, tiers, multipliers, tier_a, tier_b):
+
+        a, b = tiers[tier_a], tiers[tier_b]
+
+        comparison = {
+
+            "tier_a": {"tier_number": tier_a, "name": a["name"], "category": a["category"]},
+
+            "tier_b": {"tier_number": tier_b, "name": b["name"], "category": b["category"]},
+
+            "tier_gap": tier_a - tier_b,
+
+            "descriptors": {
+
+                descriptor: {
+
+                    "a": a[descriptor],
+
+                    "b": b[descriptor],
+
+                    "stat": stat,
+
+                    "advantage_a": round((tier_a - tier_b) * multipliers[stat], 2)
+
+                }
+
+                for descriptor, stat in TIER_DESCRIPTOR_STATS.items()
+
+            }
+
+        }
+
+        return self.render(self.envelope("compare", "comparison", canonical_json(comparison).encode("utf-8")))
+
+    def lookup(self, tier_numbers):
+
+        """Cached (body, etag) for a tier list; contiguous runs hit the pre-rendered ranges"""
+
+        if tier_numbers and tier_numbers == list(range(tier_numbers[0], tier_numbers[-1] + 1)):
+
+            return self.ranges[(tier_numbers[0], tier_numbers[-1])]
+
+        return self.render_list(tier_numbers)
+
+    def size_bytes(self):
+
+        return sum(len(body) for body, _ in chain(self.ranges.values(), self.comparisons.values()))
+
+def parse_tier_selector(parts, valid_tiers):
+
+    """Expand selector parts ("8..12", "3", ...) to an ordered, de-duplicated tier list. Raises ValueError."""
+
+    selected = []
+
+    for part in parts:
+
+        if ".." in part:
+
+            low, _, high = part.partition("..")
+
+            low, high = int(low), int(high)
+
+            if low > high:
+
+                raise ValueError(f"range {part} is reversed")
+
+            selected.extend(range(low, high + 1))
+
+        else:
+
+            selected.append(int(part))
+
+    unknown = sorted(set(tier for tier in selected if tier not in valid_tiers))
+
+    if unknown:
+
+        raise ValueError(f"tiers {unknown} not defined. Valid range: {min(valid_tiers)}-{max(valid_tiers)}")
+
+    return list(dict.fromkeys(selected))
+
+mark_startup("engines")
+
+# ================================================================================
+
+# SECTION 5: ENDPOINTS - SYSTEM & STATUS (GET + POST)
+
+# ================================================================================
+
+@app.before_request
+
+def validate_campaign_id():
+
+    """Reject malformed campaign identifiers before any state path is built from them"""
+
+    campaign_id = get_requested_campaign_id()
+
+    if not is_valid_campaign_id(campaign_id):
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "invalid_campaign_id",
+
+            "message": "campaign must be 1-64 characters: letters, digits, '_' or '-'",
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 400
+
+@app.route('/health', methods=['GET', 'POST'])
+
+def health_check():
+
+    """Health check - verify Flask online"""
+
+    return jsonify({
+
+        "status": "ONLINE",
+
+        "engine": RULES.system.name,
+
+        "version": RULES.system.version,
+
+        "rules": RULES_STORE.status(),
+
+        "storage": {
+
+            "write_mode": WRITE_MODE,
+
+            "pending_campaigns": GROUP_COMMIT.pending_count(),
+
+            "group_flushes": GROUP_COMMIT.flushes,
+
+            "group_flush_failures": GROUP_COMMIT.failures,
+
+            "wal": current_campaign().wal_status() if WRITE_MODE == "wal" else None
+
+        },
+
+        "timestamp": datetime.now().isoformat()
+
+    }), 200
+
+def render_rules_summary(rules):
+
+    return RenderedPayload({
+
+        "status": "SUCCESS",
+
+        "rules_version": rules.version_tag,
+
+        "system": thaw_rules(rules.system),
+
+        "stat_multipliers": thaw_rules(rules.stat_multipliers),
+
+        "progression": thaw_rules(rules.progression),
+
+        "abilities": thaw_rules(rules.abilities),
+
+        "formulas": {
+
+            name: {"source": formula.source, "variables": list(formula.variables), "tabulated_values": len(formula.table or ())}
+
+            for name, formula in rules_derived("formulas").items()
+
+        },
+
+        "timestamp": rules.loaded_at
+
+    })
+
+RULE_DERIVATIONS["summary_response"] = render_rules_summary
+
+@app.route('/rules/summary', methods=['GET', 'POST'])
+
+def rules_summary():
+
+    """Get system rules and constants (rendered once per rules version)"""
+
+    return rules_derived("summary_response").response()
+
+@app.route('/session/current', methods=['GET', 'POST'])
+
+def session_current():
+
+    """Get current session number and status"""
+
+    campaign = current_campaign()
+
+    index = campaign.session_index()
+
+    session_num = index["open_session"] or index["latest_session_number"]
+
+    if session_num == 0:
+
+        session_num = 1
+
+    session_file = campaign.sessions_dir / f"session_{session_num}.json"
+
+    session_exists = session_file.exists()
+
+    return jsonify({
+
+        "status": "SUCCESS",
+
+        "current_session_number": session_num,
+
+        "session_file_path": str(session_file),
+
+        "session_exists": session_exists,
+
+        "session_open": index["open_session"] is not None,
+
+        "campaign": campaign.campaign_id,
+
+        "timestamp": datetime.now().isoformat()
+
+    }), 200
+
+def snapshot_campaign_state(campaign):
+
+    """Snapshot every state document of a campaign. Returns ({doc: manifest}, objects_written)"""
+
+    snapshot = {}
+
+    written_total = 0
+
+    for name in STATE_DOCUMENTS:
+
+        manifest, written = campaign.store_snapshot(name)
+
+        snapshot[name] = manifest
+
+        written_total += written
+
+    return snapshot, written_total
+
+def diff_snapshots(before, after):
+
+    """Names of top-level sections that differ between two snapshots, per document"""
+
+    changed = {}
+
+    for name in STATE_DOCUMENTS:
+
+        old_manifest = before.get(name) or {}
+
+        new_manifest = after.get(name) or {}
+
+        sections = set(old_manifest) | set(new_manifest)
+
+        changed[name] = sorted(k for k in sections if old_manifest.get(k) != new_manifest.get(k))
+
+    return changed
+
+@app.route('/session/start', methods=['GET', 'POST'])
+@mutates_state
+def session_start():
+
+    """Open the next session and snapshot character and world state"""
+
+    try:
+
+        campaign = current_campaign()
+
+        index = dict(campaign.session_index())
+
+        if index["open_session"]:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "session_already_open",
+
+                "message": f"Session {index['open_session']} is still open - end it first",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        snapshot, written = snapshot_campaign_state(campaign)
+
+        if all(manifest is None for manifest in snapshot.values()):
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "state_not_found",
+
+                "message": "character.json and world_state.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        session_num = index["latest_session_number"] + 1
+
+        session_record = {
+
+            "session_number": session_num,
+
+            "started_at": datetime.now().isoformat(),
+
+            "ended_at": None,
+
+            "start_snapshot": snapshot,
+
+            "end_snapshot": None,
+
+            "changed_sections": None
+
+        }
+
+        write_json_file(campaign.sessions_dir / f"session_{session_num}.json", session_record)
+
+        index["latest_session_number"] = session_num
+
+        index["open_session"] = session_num
+
+        campaign.save_session_index(index)
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "action": "session_started",
+
+            "session_number": session_num,
+
+            "snapshot": snapshot,
+
+            "objects_written": written,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "session_start_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/session/end', methods=['GET', 'POST'])
+@validate_params({"summary": {"type": "str"}})
+@mutates_state
+def session_end():
+
+    """Close the open session with an end-of-session snapshot"""
+
+    try:
+
+        data = get_request_data()
+
+        summary = data["summary"]
+
+        campaign = current_campaign()
+
+        index = dict(campaign.session_index())
+
+        session_num = index["open_session"]
+
+        if not session_num:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "no_open_session",
+
+                "message": "No session is open - start one first",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        session_file = campaign.sessions_dir / f"session_{session_num}.json"
+
+        session_record = read_json_file(session_file)
+
+        if session_record is None:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "session_not_found",
+
+                "message": f"session_{session_num}.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        snapshot, written = snapshot_campaign_state(campaign)
+
+        session_record["ended_at"] = datetime.now().isoformat()
+
+        session_record["end_snapshot"] = snapshot
+
+        session_record["changed_sections"] = diff_snapshots(session_record["start_snapshot"], snapshot)
+
+        if summary:
+
+            session_record["summary"] = summary
+
+        write_json_file(session_file, session_record)
+
+        index["open_session"] = None
+
+        campaign.save_session_index(index)
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "action": "session_ended",
+
+            "session_number": session_num,
+
+            "changed_sections": session_record["changed_sections"],
+
+            "objects_written": written,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "session_end_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/session/get', methods=['GET', 'POST'])
+@validate_params({"session": {"type": "int", "min": 1}, "include_state": {"type": "bool", "default": False}})
+def session_get():
+
+    """Get a session record, optionally with the snapshot state materialized"""
+
+    try:
+
+        data = get_request_data()
+
+        campaign = current_campaign()
+
+        session_num = data["session"] or campaign.session_index()["latest_session_number"]
+
+        include_state = data["include_state"]
+
+        session_record = read_json_file(campaign.sessions_dir / f"session_{session_num}.json")
+
+        if session_record is None:
+
+            return jsonify({
+
+                "status": "NOT_FOUND",
+
+                "message": f"Session {session_num} not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        if include_state:
+
+            snapshot = session_record["end_snapshot"] or session_record["start_snapshot"]
+
+            session_record["state"] = {
+
+                name: campaign.load_snapshot(manifest) if manifest else None
+
+                for name, manifest in snapshot.items()
+
+            }
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "session": session_record,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "session_load_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+# ================================================================================
+
+# SECTION 6: ENDPOINTS - COMBAT CALCULATIONS (GET + POST)
+
+# ================================================================================
+
+@app.route('/calculate/stat_advantage', methods=['GET', 'POST'])
+@validate_params({
+    "actor_tier": dict(TIER_PARAM, default=0),
+    "defender_tier": dict(TIER_PARAM, default=0),
+    "stat_type": {"type": "str", "required": True, "choices": RuleRef("stat_multipliers", list)}
+})
+def calculate_stat_advantage_endpoint():
+
+    """Compare one stat between two entities - GET query params or POST JSON"""
+
+    try:
+
+        data = get_request_data()
+
+        actor_tier = data["actor_tier"]
+
+        defender_tier = data["defender_tier"]
+
+        stat_type = data["stat_type"]
+
+        comparison = calculate_stat_advantage(actor_tier, defender_tier, stat_type)
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "comparison": comparison,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "calculation_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/calculate/combat', methods=['GET', 'POST'])
+@validate_params({
+    "actor_speed_tier": dict(TIER_PARAM, default=1),
+    "actor_reflexes_tier": dict(TIER_PARAM, default=1),
+    "actor_power_tier": dict(TIER_PARAM, default=1),
+    "actor_resistance_tier": dict(TIER_PARAM, default=1),
+    "actor_skills": ATTRIBUTE_PARAM,
+    "actor_resourcefulness": ATTRIBUTE_PARAM,
+    "actor_dc_modifier": {"type": "int", "default": 0},
+    "defender_speed_tier": dict(TIER_PARAM, default=1),
+    "defender_reflexes_tier": dict(TIER_PARAM, default=1),
+    "defender_power_tier": dict(TIER_PARAM, default=1),
+    "defender_resistance_tier": dict(TIER_PARAM, default=1),
+    "defender_skills": ATTRIBUTE_PARAM,
+    "defender_resourcefulness": ATTRIBUTE_PARAM,
+    "defender_dc_modifier": {"type": "int", "default": 0},
+    "actor_hero": HERO_PARAM,
+    "defender_hero": HERO_PARAM
+}, prepare=hero_param_resolver(COMBAT_HERO_PARAMS))
+def calculate_combat():
+
+    """Full combat calculation - all stats + skills/resourcefulness"""
+
+    try:
+
+        data = get_request_data()
+
+        # Extract actor data
+        actor_speed_tier = data["actor_speed_tier"]
+        actor_reflexes_tier = data["actor_reflexes_tier"]
+        actor_power_tier = data["actor_power_tier"]
+        actor_resistance_tier = data["actor_resistance_tier"]
+        actor_skills = data["actor_skills"]
+        actor_resourcefulness = data["actor_resourcefulness"]
+        actor_dc_mod = data["actor_dc_modifier"]
+
+        # Extract defender data
+        defender_speed_tier = data["defender_speed_tier"]
+        defender_reflexes_tier = data["defender_reflexes_tier"]
+        defender_power_tier = data["defender_power_tier"]
+        defender_resistance_tier = data["defender_resistance_tier"]
+        defender_skills = data["defender_skills"]
+        defender_resourcefulness = data["defender_resourcefulness"]
+        defender_dc_mod = data["defender_dc_modifier"]
+
+        speed_adv = calculate_stat_advantage(actor_speed_tier, defender_speed_tier, "speed")
+        reflexes_adv = calculate_stat_advantage(actor_reflexes_tier, defender_reflexes_tier, "reflexes")
+        power_adv = calculate_stat_advantage(actor_power_tier, defender_power_tier, "power")
+        resistance_adv = calculate_stat_advantage(actor_resistance_tier, defender_resistance_tier, "resistance")
+
+        stat_total = (speed_adv.get("advantage", 0) +
+                     reflexes_adv.get("advantage", 0) +
+                     power_adv.get("advantage", 0) +
+                     resistance_adv.get("advantage", 0))
+
+        skills_adv = calculate_skills_resourcefulness_advantage(
+            actor_skills, actor_resourcefulness, actor_dc_mod,
+            defender_skills, defender_resourcefulness, defender_dc_mod
+        )
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "combat_data": {
+
+                "stat_advantages": {
+
+                    "speed": speed_adv,
+
+                    "reflexes": reflexes_adv,
+
+                    "power": power_adv,
+
+                    "resistance": resistance_adv
+
+                },
+
+                "stat_total_advantage": round(stat_total, 2),
+
+                "skills_resourcefulness_advantage": skills_adv
+
+            },
+
+            "resolved_heroes": g.resolved_heroes or None,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "combat_calculation_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/simulate/combat', methods=['GET', 'POST'])
+@validate_params(lambda rules: dict(
+    {f"{side}_{stat}_tier": dict(TIER_PARAM, default=1) for side in COMBATANT_SIDES for stat in rules.system.stats},
+    **{f"{side}_{attribute}": ATTRIBUTE_PARAM for side in COMBATANT_SIDES for attribute in ("skills", "resourcefulness")},
+    **{f"{side}_dc_modifier": {"type": "int", "default": 0} for side in COMBATANT_SIDES},
+    **{f"{side}_armor_tier": dict(TIER_PARAM, default=0) for side in COMBATANT_SIDES},
+    trials={"type": "int", "min": 100, "max": 100000, "default": 10000},
+    seed={"type": "int"},
+    variance_model={"type": "str", "choices": ["normal", "uniform", "none"], "default": "normal"},
+    tier_sigma={"type": "float", "min": 0, "max": 10, "default": 1.0},
+    skill_sigma={"type": "float", "min": 0, "max": 25, "default": 3.0},
+    actor_hero=HERO_PARAM,
+    defender_hero=HERO_PARAM
+), prepare=hero_param_resolver({side: dict(params, **{f"{side}_armor_tier": "armor"}) for side, params in COMBAT_HERO_PARAMS.items()}))
+def simulate_combat_endpoint():
+
+    """Monte Carlo combat outcome: win probability, armor destruction rates, per-stat sensitivity"""
+
+    try:
+
+        started = datetime.now()
+
+        data = get_request_data()
+
+        combatants = {}
+
+        for side in COMBATANT_SIDES:
+
+            combatants[side] = {stat: data[f"{side}_{stat}_tier"] for stat in RULES.system.stats}
+
+            for field in ("skills", "resourcefulness", "dc_modifier", "armor_tier"):
+
+                combatants[side][field] = data[f"{side}_{field}"]
+
+        seed = data["seed"] if data["seed"] is not None else random.SystemRandom().randrange(2 ** 32)
+
+        simulation = simulate_combat(
+
+            combatants["actor"], combatants["defender"], data["trials"], seed,
+
+            data["variance_model"], data["tier_sigma"], data["skill_sigma"]
+
+        )
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "simulation": simulation,
+
+            "resolved_heroes": g.resolved_heroes or None,
+
+            "elapsed_ms": round((datetime.now() - started).total_seconds() * 1000, 2),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "combat_simulation_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+# ================================================================================
+
+# SECTION 7: ENDPOINTS - ADVANCEMENT SYSTEM (GET + POST)
+
+# ================================================================================
+
+@app.route('/calculate/enhancement_cost', methods=['GET', 'POST'])
+@validate_params({"enhancement_number": ENHANCEMENT_PARAM})
+def calculate_enhancement_cost_endpoint():
+
+    """Calculate cost to enhance a stat"""
+
+    try:
+
+        data = get_request_data()
+
+        enhancement_number = data["enhancement_number"]
+
+        cost = calculate_enhancement_cost(enhancement_number)
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "enhancement_number": enhancement_number,
+
+            "dc_cost": cost,
+
+            "formula": f"{rule_formula('enhancement_cost').render(n=enhancement_number)} = {cost}",
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "enhancement_calculation_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/character/enhance_stat', methods=['GET', 'POST'])
+@validate_params({
+    "stat": {"type": "str", "required": True, "choices": RuleRef("system.stats", list)},
+    "dc_amount": DC_AMOUNT_PARAM
+})
+@mutates_state
+def enhance_stat():
+
+    """Enhance a character stat (tier up), spend DC from balance"""
+
+    try:
+
+        data = get_request_data()
+
+        stat_name = data["stat"]
+
+        dc_to_spend = data["dc_amount"]
+
+        # Load character state
+
+        character = get_character_state()
+
+        if not character:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "character_not_found",
+
+                "message": "character.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        # Check DC balance
+
+        dc_balance = character.get("advancement", {}).get("dc_balance", {}).get("current_balance", 0)
+
+        if dc_balance < dc_to_spend:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "insufficient_dc",
+
+                "message": f"Required: {dc_to_spend} DC, Current: {dc_balance} DC",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        # Get current tier
+
+        current_tier = character.get("tiers", {}).get(stat_name, 1)
+
+        # Check enhancement limits
+
+        limit_error = enhancement_limit_error(character_ledger(character), stat_name)
+
+        if limit_error:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": limit_error[0],
+
+                "message": limit_error[1],
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        # Check if already at Karmic cap
+
+        if current_tier >= RULES.progression.karmic_cap:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "karmic_cap_reached",
+
+                "message": f"Cannot enhance beyond Tier {RULES.progression.karmic_cap} via Karmic System",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        # Update character state
+
+        character["tiers"][stat_name] = current_tier + 1
+
+        ledger = post_ledger_entry(character, "enhance", dc_to_spend, stat_name)
+
+        # Add to log
+
+        if "enhancement_log" not in character["advancement"]:
+
+            character["advancement"]["enhancement_log"] = []
+
+        character["advancement"]["enhancement_log"].append({
+
+            "timestamp": datetime.now().isoformat(),
+
+            "stat": stat_name,
+
+            "from_tier": current_tier,
+
+            "to_tier": current_tier + 1,
+
+            "dc_spent": dc_to_spend
+
+        })
+
+        # Save
+
+        save_character_state(character)
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "action": "stat_enhanced",
+
+            "stat": stat_name,
+
+            "previous_tier": current_tier,
+
+            "new_tier": current_tier + 1,
+
+            "dc_spent": dc_to_spend,
+
+            "dc_balance_after": character["advancement"]["dc_balance"]["current_balance"],
+
+            "enhancements_used": {
+
+                "stat": ledger["enhancements_by_stat"][stat_name],
+
+                "total": ledger["enhancements_total"]
+
+            },
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "enhancement_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/character/ledger/verify', methods=['GET', 'POST'])
+@validate_params({"rebuild": {"type": "bool", "default": False}})
+@mutates_state
+def verify_ledger():
+
+    """Reconcile dc_balance and enhancement counts against the advancement logs (rebuild=true repairs them)"""
+
+    try:
+
+        data = get_request_data()
+
+        character = get_character_state()
+
+        if not character:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "character_not_found",
+
+                "message": "character.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        advancement = character.setdefault("advancement", {})
+
+        stored = {"dc_balance": advancement.get("dc_balance"), "ledger": advancement.get("ledger")}
+
+        expected_balance, expected_ledger = rebuild_ledger(advancement)
+
+        expected = {"dc_balance": expected_balance, "ledger": expected_ledger}
+
+        discrepancies = []
+
+        for section, values in expected.items():
+
+            if stored[section] is None and section == "ledger":
+
+                # Never written yet: the first mutation backfills it from the same logs
+
+                continue
+
+            for key, value in values.items():
+
+                actual = (stored[section] or {}).get(key)
+
+                if actual != value:
+
+                    discrepancies.append({"field": f"advancement.{section}.{key}", "stored": actual, "expected": value})
+
+        rebuilt = False
+
+        if data["rebuild"] and (discrepancies or stored["ledger"] is None):
+
+            advancement.update(expected)
+
+            save_character_state(character)
+
+            rebuilt = True
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "consistent": not discrepancies,
+
+            "discrepancies": discrepancies,
+
+            "rebuilt": rebuilt,
+
+            "ledger": expected,
+
+            "limits": {
+
+                "max_enhancements": RULES.progression.max_enhancements,
+
+                "max_enhancements_per_stat": RULES.progression.max_enhancements_per_stat
+
+            },
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "ledger_verification_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+# ================================================================================
+
+# SECTION 8: ENDPOINTS - PREMONITION SYSTEM (GET + POST)
+
+# ================================================================================
+
+@app.route('/calculate/premonition_dc', methods=['GET', 'POST'])
+@validate_params({
+    "actor_tier": dict(POSITIVE_TIER_PARAM, default=1),
+    "threat_tier": dict(POSITIVE_TIER_PARAM, default=1)
+})
+def calculate_premonition_dc_endpoint():
+
+    """Calculate DC reward for premonition"""
+
+    try:
+
+        data = get_request_data()
+
+        actor_tier = data["actor_tier"]
+
+        threat_tier = data["threat_tier"]
+
+        formula = rule_formula("premonition_dc")
+
+        raw_value = formula.unrounded(actor_tier=actor_tier, threat_tier=threat_tier)
+
+        dc_reward = calculate_premonition_dc(actor_tier, threat_tier)
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "dc_reward": dc_reward,
+
+            "calculation": {
+
+                "actor_tier": actor_tier,
+
+                "threat_tier": threat_tier,
+
+                "formula": formula.source,
+
+                "raw_value": round(raw_value, 2)
+
+            },
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "premonition_calculation_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/character/premonition/resolve', methods=['GET', 'POST'])
+@validate_params({
+    "success": {"type": "bool", "default": False},
+    "actor_tier": dict(POSITIVE_TIER_PARAM, default=1),
+    "threat_tier": dict(POSITIVE_TIER_PARAM, default=1)
+})
+@mutates_state
+def resolve_premonition():
+
+    """Resolve premonition - award or deny DC points"""
+
+    try:
+
+        data = get_request_data()
+
+        success = data["success"]
+
+        actor_tier = data["actor_tier"]
+
+        threat_tier = data["threat_tier"]
+
+        # Calculate DC if success
+
+        dc_awarded = 0
+
+        if success:
+
+            dc_awarded = calculate_premonition_dc(actor_tier, threat_tier)
+
+        # Load character
+
+        character = get_character_state()
+
+        if not character:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "character_not_found",
+
+                "message": "character.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        # Update character state
+
+        post_ledger_entry(character, "earn", dc_awarded)
+
+        # Track premonition
+
+        if "premonitions_completed" not in character["advancement"]:
+
+            character["advancement"]["premonitions_completed"] = []
+
+        if "premonition_stats" not in character["advancement"]:
+
+            character["advancement"]["premonition_stats"] = build_premonition_stats(character["advancement"]["premonitions_completed"])
+
+        record_premonition_outcome(character["advancement"]["premonition_stats"], threat_tier, success, dc_awarded)
+
+        character["advancement"]["premonitions_completed"].append({
+
+            "timestamp": datetime.now().isoformat(),
+
+            "success": success,
+
+            "actor_tier": actor_tier,
+
+            "threat_tier": threat_tier,
+
+            "dc_awarded": dc_awarded
+
+        })
+
+        # Save
+
+        save_character_state(character)
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "action": "premonition_resolved",
+
+            "success": success,
+
+            "dc_awarded": dc_awarded,
+
+            "new_dc_balance": character["advancement"]["dc_balance"]["current_balance"],
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "premonition_resolution_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/character/premonition/analytics', methods=['GET', 'POST'])
+@validate_params({
+    "actor_tier": dict(POSITIVE_TIER_PARAM, default=1),
+    "threat_tiers": {"type": "list", "items": "int"}
+})
+def premonition_analytics():
+
+    """Empirical success rates by threat bucket, expected DC per choice, sessions to the next enhancement"""
+
+    try:
+
+        data = get_request_data()
+
+        actor_tier = data["actor_tier"]
+
+        universal_max = RULES.system.universal_max
+
+        threat_tiers = data["threat_tiers"] or list(range(1, universal_max + 1))
+
+        invalid = [tier for tier in threat_tiers if not 1 <= tier <= universal_max]
+
+        if invalid:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "invalid_parameters",
+
+                "message": f"threat_tiers must be between 1 and {universal_max}, got {invalid}",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        with current_campaign().lock:
+
+            character = get_character_state()
+
+            if not character:
+
+                return jsonify({
+
+                    "status": "ERROR",
+
+                    "reason": "character_not_found",
+
+                    "message": "character.json not found",
+
+                    "timestamp": datetime.now().isoformat()
+
+                }), 404
+
+            advancement = character.get("advancement", {})
+
+            stats = advancement.get("premonition_stats") or build_premonition_stats(advancement.get("premonitions_completed", []))
+
+            dc_balance = advancement.get("dc_balance", {}).get("current_balance", 0)
+
+            enhancements_done = (advancement.get("ledger") or rebuild_ledger(advancement)[1])["enhancements_total"]
+
+            sessions = get_latest_session_number()
+
+        # Expected value and spread of each choice (binary reward: DC or nothing)
+
+        choices = []
+
+        for threat_tier in sorted(set(threat_tiers)):
+
+            success_rate = premonition_success_rate(stats, threat_tier)
+
+            dc_reward = calculate_premonition_dc(actor_tier, threat_tier)
+
+            choices.append({
+
+                "threat_tier": threat_tier,
+
+                "bucket": premonition_bucket(threat_tier),
+
+                "success_rate": round(success_rate, 4),
+
+                "dc_reward": dc_reward,
+
+                "expected_dc": round(success_rate * dc_reward, 2),
+
+                "dc_std_dev": round(dc_reward * math.sqrt(success_rate * (1 - success_rate)), 2)
+
+            })
+
+        best_choice = max(choices, key=lambda choice: choice["expected_dc"])
+
+        # Projection to the next enhancement
+
+        next_enhancement = enhancements_done + 1
+
+        dc_needed = max(0, calculate_enhancement_cost(next_enhancement) - dc_balance)
+
+        premonitions_per_session = stats["attempts"] / sessions if sessions else None
+
+        observed_dc_per_session = stats["dc_earned"] / sessions if sessions else None
+
+        projected_dc_per_session = premonitions_per_session * best_choice["expected_dc"] if premonitions_per_session else None
+
+        def sessions_for(rate):
+
+            if dc_needed == 0:
+
+                return 0
+
+            return math.ceil(dc_needed / rate) if rate else None
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "actor_tier": actor_tier,
+
+            "history": {
+
+                "attempts": stats["attempts"],
+
+                "successes": stats["successes"],
+
+                "dc_earned": stats["dc_earned"],
+
+                "buckets": {
+
+                    label: dict(bucket, success_rate=round(bucket["successes"] / bucket["attempts"], 4))
+
+                    for label, bucket in sorted(stats["buckets"].items(), key=lambda item: int(item[0].split("-")[0]))
+
+                }
+
+            },
+
+            "choices": choices,
+
+            "best_choice": best_choice,
+
+            "projection": {
+
+                "next_enhancement_number": next_enhancement,
+
+                "dc_balance": dc_balance,
+
+                "dc_needed": dc_needed,
+
+                "sessions_played": sessions,
+
+                "premonitions_per_session": round(premonitions_per_session, 2) if premonitions_per_session is not None else None,
+
+                "observed_dc_per_session": round(observed_dc_per_session, 2) if observed_dc_per_session is not None else None,
+
+                "projected_dc_per_session": round(projected_dc_per_session, 2) if projected_dc_per_session is not None else None,
+
+                "sessions_at_observed_rate": sessions_for(observed_dc_per_session),
+
+                "sessions_at_best_choice": sessions_for(projected_dc_per_session)
+
+            },
+
+            "smoothing": f"bucket rate shrunk towards Laplace-smoothed overall rate with prior weight {PREMONITION_PRIOR_WEIGHT}",
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "premonition_analytics_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+# ================================================================================
+
+# SECTION 9: ENDPOINTS - ABILITY SYSTEM (GET + POST)
+
+# ================================================================================
+
+@app.route('/calculate/ability_reroll_cost', methods=['GET', 'POST'])
+@validate_params({"current_enhancement_number": ENHANCEMENT_PARAM})
+def calculate_ability_reroll_cost_endpoint():
+
+    """Calculate cost to reroll ability"""
+
+    try:
+
+        data = get_request_data()
+
+        current_enhancement = data["current_enhancement_number"]
+
+        reroll_cost = calculate_ability_reroll_cost(current_enhancement)
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "current_enhancement_number": current_enhancement,
+
+            "reroll_cost": reroll_cost,
+
+            "next_enhancement_number": current_enhancement + 1,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "reroll_calculation_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/character/ability/manifest', methods=['GET', 'POST'])
+@validate_params({
+    "ability_name": {"type": "str", "required": True},
+    "domain": {"type": "str", "required": True},
+    "enhancement_level": ENHANCEMENT_PARAM
+})
+@mutates_state
+def manifest_ability():
+
+    """Grant an ability to character"""
+
+    try:
+
+        data = get_request_data()
+
+        ability_name = data["ability_name"]
+
+        domain = data["domain"]
+
+        enhancement_level = data["enhancement_level"]
+
+        # Load character
+
+        character = get_character_state()
+
+        if not character:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "character_not_found",
+
+                "message": "character.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        # Check if already has active ability
+
+        if "active_ability" in character and character["active_ability"]:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "ability_already_active",
+
+                "message": f"Active ability: {character['active_ability'].get('name')}. Can only have one.",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        # Create ability record
+
+        ability = {
+
+            "name": ability_name,
+
+            "domain": domain,
+
+            "enhancement_level": enhancement_level,
+
+            "manifested_date": datetime.now().isoformat(),
+
+            "enhancements": []
+
+        }
+
+        character["active_ability"] = ability
+
+        # Track in log
 
         if "ability_log" not in character["advancement"]:
 
-            character["advancement"]["ability_log"] = []
+            character["advancement"]["ability_log"] = []
+
+        character["advancement"]["ability_log"].append({
+
+            "timestamp": datetime.now().isoformat(),
+
+            "action": "manifested",
+
+            "ability_name": ability_name,
+
+            "domain": domain,
+
+            "initial_enhancement": enhancement_level
+
+        })
+
+        # Save
+
+        save_character_state(character)
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "action": "ability_manifested",
+
+            "ability": ability,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "ability_manifestation_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/character/ability/reroll', methods=['GET', 'POST'])
+@validate_params({
+    "new_ability_name": {"type": "str", "required": True},
+    "new_domain": {"type": "str", "required": True},
+    "dc_amount": DC_AMOUNT_PARAM
+})
+@mutates_state
+def reroll_ability():
+
+    """Reroll current ability - costs DC but doesn't increment counter"""
+
+    try:
+
+        data = get_request_data()
+
+        new_ability_name = data["new_ability_name"]
+
+        new_domain = data["new_domain"]
+
+        dc_to_spend = data["dc_amount"]
+
+        # Load character
+
+        character = get_character_state()
+
+        if not character:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "character_not_found",
+
+                "message": "character.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        # Check if has active ability
+
+        if "active_ability" not in character or not character["active_ability"]:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "no_active_ability",
+
+                "message": "Cannot reroll - no active ability",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        # Check DC balance
+
+        dc_balance = character.get("advancement", {}).get("dc_balance", {}).get("current_balance", 0)
+
+        if dc_balance < dc_to_spend:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "insufficient_dc",
+
+                "message": f"Required: {dc_to_spend} DC, Current: {dc_balance} DC",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        # Get old ability info
+
+        old_ability = character["active_ability"].copy()
+
+        old_enhancement_level = old_ability.get("enhancement_level", 1)
+
+        # Update ability (name, domain change but keep enhancement level)
+
+        character["active_ability"]["name"] = new_ability_name
+
+        character["active_ability"]["domain"] = new_domain
+
+        character["active_ability"]["rerolled_date"] = datetime.now().isoformat()
+
+        # Spend DC
+
+        post_ledger_entry(character, "spend", dc_to_spend)
+
+        # Track in log
+
+        character["advancement"]["ability_log"].append({
+
+            "timestamp": datetime.now().isoformat(),
+
+            "action": "rerolled",
+
+            "old_ability": old_ability["name"],
+
+            "new_ability": new_ability_name,
+
+            "old_domain": old_ability["domain"],
+
+            "new_domain": new_domain,
+
+            "enhancement_level_unchanged": old_enhancement_level,
+
+            "dc_spent": dc_to_spend
+
+        })
+
+        # Save
+
+        save_character_state(character)
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "action": "ability_rerolled",
+
+            "old_ability": old_ability["name"],
+
+            "new_ability": new_ability_name,
+
+            "enhancement_level_preserved": old_enhancement_level,
+
+            "dc_spent": dc_to_spend,
+
+            "dc_balance_after": character["advancement"]["dc_balance"]["current_balance"],
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "ability_reroll_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+# ================================================================================
+
+# SECTION 10: ENDPOINTS - STATE MANAGEMENT (GET + POST)
+
+# ================================================================================
+
+def state_payload(campaign, name, key):
+
+    """
+    Rendered get_state response for the current version of a document, built once per
+    version (its timestamp is the render time of that version)
+    """
+
+    def build(document):
+
+        return RenderedPayload({
+
+            "status": "SUCCESS",
+
+            "campaign": campaign.campaign_id,
+
+            "version": campaign.version(name),
+
+            key: document,
+
+            "timestamp": datetime.now().isoformat()
+
+        })
+
+    return campaign.derived(name, "get_state_response", build)
+
+@app.route('/character/get_state', methods=['GET', 'POST'])
+
+def get_character_state_endpoint():
+
+    """Get current character state"""
+
+    try:
+
+        character = get_character_state()
+
+        if not character:
+
+            return jsonify({
+
+                "status": "NOT_FOUND",
+
+                "message": "character.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        return state_payload(current_campaign(), "character", "character").response()
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "character_load_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/world/get_state', methods=['GET', 'POST'])
+
+def get_world_state_endpoint():
+
+    """Get current world state"""
+
+    try:
+
+        world = get_world_state()
+
+        if not world:
+
+            return jsonify({
+
+                "status": "NOT_FOUND",
+
+                "message": "world_state.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        return state_payload(current_campaign(), "world", "world").response()
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "world_load_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/world/escalation/update', methods=['GET', 'POST'])
+@validate_params({"escalation_updates": {"type": "object", "default": dict}})
+@mutates_state
+def update_world_escalation():
+
+    """Update world escalation indicators (Secondary LLM calls this)"""
+
+    try:
+
+        data = get_request_data()
+
+        updates = data["escalation_updates"]
+
+        # Load world state
+
+        world = get_world_state()
+
+        if not world:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "world_not_found",
+
+                "message": "world_state.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        # Update escalation indicators
+
+        if "escalation_indicators" not in world:
+
+            world["escalation_indicators"] = {}
+
+        # Merge into the existing indicator - description, rate and thresholds are kept
+
+        triggered_events = []
+
+        threshold_index = current_campaign().derived("world", "thresholds", build_threshold_index)
+
+        # Plain value updates of existing indicators leave the threshold index valid
+
+        thresholds_changed = False
+
+        for indicator_name, new_value in updates.items():
+
+            thresholds_changed = thresholds_changed or isinstance(new_value, dict) or indicator_name not in world["escalation_indicators"]
+
+            indicator = world["escalation_indicators"].setdefault(indicator_name, {})
+
+            old_value = indicator.get("value")
+
+            if isinstance(new_value, dict):
+
+                apply_merge_patch(indicator, new_value)
+
+                thresholds = parse_thresholds(indicator)
+
+            else:
+
+                indicator["value"] = new_value
+
+                thresholds = threshold_index.get(indicator_name) or parse_thresholds(indicator)
+
+            # Same field as /world/date/advance: the in-world date of the value
+
+            indicator.pop("last_updated", None)
+
+            indicator["timestamp"] = world.get("current_date") or datetime.now().isoformat()
+
+            if isinstance(old_value, (int, float)) and isinstance(indicator.get("value"), (int, float)):
+
+                for level, key, description, direction in thresholds_crossed(thresholds, old_value, indicator["value"]):
+
+                    triggered_events.append({"indicator": indicator_name, "threshold": key, "level": tidy_number(level), "direction": direction, "event": description})
+
+        enqueue_world_events(world, triggered_events)
+
+        # Save
+
+        save_world_state(world, preserve=() if thresholds_changed else ("thresholds",))
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "action": "escalation_updated",
+
+            "updates": updates,
+
+            "triggered_events": triggered_events,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "escalation_update_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/world/date/advance', methods=['GET', 'POST'])
+@validate_params({
+    "days": {"type": "int", "min": 0, "default": 0},
+    "apply_escalation": {"type": "bool", "default": True}
+})
+@mutates_state
+def advance_world_date():
+
+    """Advance world date (Secondary LLM calls this between sessions)"""
+
+    try:
+
+        data = get_request_data()
+
+        days_advance = data["days"]
+
+        apply_escalation = data["apply_escalation"]
+
+        # Load world state
+
+        world = get_world_state()
+
+        if not world:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "world_not_found",
+
+                "message": "world_state.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        # Update date (assuming world has "current_date" field)
+
+        current = None
+
+        new_date = None
+
+        if "current_date" in world:
+
+            current = datetime.fromisoformat(world["current_date"])
+
+            new_date = current + timedelta(days=days_advance)
+
+            world["current_date"] = new_date.isoformat()
+
+        # Simulation step: escalating_per_week and threshold crossings
+
+        escalation_changes = {}
+
+        triggered_events = []
+
+        if apply_escalation:
+
+            threshold_index = current_campaign().derived("world", "thresholds", build_threshold_index)
+
+            escalation_changes, triggered_events = advance_escalation_indicators(world, threshold_index, days_advance, current, new_date)
+
+            enqueue_world_events(world, triggered_events)
+
+        # Save (indicator values and the date only - thresholds are unchanged)
+
+        save_world_state(world, preserve=("thresholds",))
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "action": "date_advanced",
+
+            "days_advanced": days_advance,
+
+            "new_date": world.get("current_date"),
+
+            "escalation_changes": escalation_changes,
+
+            "triggered_events": triggered_events,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "date_advancement_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/state/patch', methods=['GET', 'POST'])
+@validate_params({
+    "document": {"type": "str", "choices": list(STATE_DOCUMENTS)},
+    "patch": {"type": "object"},
+    "patches": {"type": "list", "items": "object"},
+    "if_version": {"type": "int", "min": 0}
+})
+@mutates_state
+def patch_state():
+
+    """
+    Apply JSON Merge Patches (RFC 7396) to character/world state in place.
+    Single form: document + patch [+ if_version]. Bulk form: patches = [{document, patch, if_version}].
+    All if_version checks pass before anything is applied; each document is saved once.
+    The advancement aggregates (dc_balance, ledger, premonition_stats) cannot be patched;
+    they are rebuilt from the logs whenever a patch touches advancement.
+    """
+
+    try:
+
+        data = get_request_data()
+
+        patches = data["patches"]
+
+        if patches is None:
+
+            patches = [{"document": data["document"], "patch": data["patch"], "if_version": data["if_version"]}]
+
+        campaign = current_campaign()
+
+        # Validate everything before touching state
+
+        for index, entry in enumerate(patches):
+
+            name = str(entry.get("document", "")).lower()
+
+            if name not in STATE_DOCUMENTS:
+
+                return jsonify({
+
+                    "status": "ERROR",
+
+                    "reason": "invalid_document",
+
+                    "message": f"document must be one of: {list(STATE_DOCUMENTS)}",
+
+                    "timestamp": datetime.now().isoformat()
+
+                }), 400
+
+            if not isinstance(entry.get("patch"), dict):
+
+                return jsonify({
+
+                    "status": "ERROR",
+
+                    "reason": "invalid_patch",
+
+                    "message": "patch must be a JSON object (RFC 7396 merge patch)",
+
+                    "timestamp": datetime.now().isoformat()
+
+                }), 400
+
+            if name == "character" and "advancement" in entry["patch"]:
+
+                advancement_patch = entry["patch"]["advancement"]
+
+                owned = [key for key in ADVANCEMENT_AGGREGATES if not isinstance(advancement_patch, dict) or key in advancement_patch]
+
+                if owned:
+
+                    return jsonify({
+
+                        "status": "ERROR",
+
+                        "reason": "ledger_owned_path",
+
+                        "message": f"advancement.{owned[0]} is derived from the advancement logs; patch the logs instead",
+
+                        "timestamp": datetime.now().isoformat()
+
+                    }), 400
+
+            if_version = entry.get("if_version")
+
+            if if_version is not None:
+
+                try:
+
+                    if_version = coerce_param(if_version, "int")
+
+                    valid = if_version >= 0
+
+                except (ValueError, TypeError):
+
+                    valid = False
+
+                if not valid:
+
+                    return jsonify({
+
+                        "status": "ERROR",
+
+                        "reason": "invalid_parameters",
+
+                        "message": f"patches[{index}].if_version must be an integer >= 0",
+
+                        "errors": [{"field": f"patches[{index}].if_version", "error": "invalid_type", "message": f"patches[{index}].if_version must be an integer >= 0"}],
+
+                        "timestamp": datetime.now().isoformat()
+
+                    }), 400
+
+            if campaign.load(name) is None:
+
+                return jsonify({
+
+                    "status": "ERROR",
+
+                    "reason": f"{name}_not_found",
+
+                    "message": f"{STATE_DOCUMENTS[name]} not found",
+
+                    "timestamp": datetime.now().isoformat()
+
+                }), 404
+
+            if if_version is not None and if_version != campaign.version(name):
+
+                return jsonify({
+
+                    "status": "ERROR",
+
+                    "reason": "version_conflict",
+
+                    "message": f"{name} is at version {campaign.version(name)}, not {entry['if_version']}",
+
+                    "document": name,
+
+                    "current_version": campaign.version(name),
+
+                    "timestamp": datetime.now().isoformat()
+
+                }), 409
+
+        touched = []
+
+        for entry in patches:
+
+            name = entry["document"].lower()
+
+            apply_merge_patch(campaign.load(name), entry["patch"])
+
+            if name not in touched:
+
+                touched.append(name)
+
+        if any(entry["document"].lower() == "character" and "advancement" in entry["patch"] for entry in patches):
+
+            rebuild_advancement_aggregates(campaign.load("character").setdefault("advancement", {}))
+
+        for name in touched:
+
+            campaign.save(name, campaign.load(name))
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "action": "state_patched",
+
+            "patches_applied": len(patches),
+
+            "versions": {name: campaign.version(name) for name in touched},
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "state_patch_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/world/thresholds/upcoming', methods=['GET', 'POST'])
+@validate_params({
+    "limit": {"type": "int", "min": 1, "max": 100, "default": 5},
+    "indicator": {"type": "str"}
+})
+def world_thresholds_upcoming():
+
+    """Next N escalation thresholds with ETA in days at the current escalation rates"""
+
+    try:
+
+        data = get_request_data()
+
+        limit = data["limit"]
+
+        indicator_filter = data["indicator"]
+
+        campaign = current_campaign()
+
+        with campaign.lock:
+
+            world = get_world_state()
+
+            if not world:
+
+                return jsonify({
+
+                    "status": "ERROR",
+
+                    "reason": "world_not_found",
+
+                    "message": "world_state.json not found",
+
+                    "timestamp": datetime.now().isoformat()
+
+                }), 404
+
+            threshold_index = campaign.derived("world", "thresholds", build_threshold_index)
+
+            upcoming = upcoming_thresholds(world, threshold_index, limit, indicator_filter)
+
+            current_date = world.get("current_date")
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "current_date": current_date,
+
+            "upcoming_thresholds": upcoming,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "threshold_lookup_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/world/events/pending', methods=['GET', 'POST'])
+
+def world_events_pending():
+
+    """Fired threshold events not yet acknowledged"""
+
+    try:
+
+        with current_campaign().lock:
+
+            world = get_world_state()
+
+            if not world:
+
+                return jsonify({
+
+                    "status": "ERROR",
+
+                    "reason": "world_not_found",
+
+                    "message": "world_state.json not found",
+
+                    "timestamp": datetime.now().isoformat()
+
+                }), 404
+
+            pending = list(world.get("event_queue", {}).get("pending", []))
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "pending_count": len(pending),
+
+            "pending_events": pending,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "event_queue_load_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/world/events/acknowledge', methods=['GET', 'POST'])
+@validate_params({
+    "event_ids": {"type": "list", "items": "int", "default": list},
+    "all": {"type": "bool", "default": False}
+})
+@mutates_state
+def world_events_acknowledge():
+
+    """Remove events from the pending queue once they have been narrated"""
+
+    try:
+
+        data = get_request_data()
+
+        acknowledge_all = data["all"]
+
+        event_ids = set(data["event_ids"])
+
+        if not acknowledge_all and not event_ids:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "missing_event_ids",
+
+                "message": "event_ids (comma separated) or all=true required",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        world = get_world_state()
+
+        if not world:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "world_not_found",
+
+                "message": "world_state.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        queue = world.setdefault("event_queue", {"next_event_id": 1, "pending": []})
+
+        acknowledged = [event["event_id"] for event in queue["pending"] if acknowledge_all or event["event_id"] in event_ids]
+
+        queue["pending"] = [event for event in queue["pending"] if event["event_id"] not in acknowledged]
+
+        if acknowledged:
+
+            save_world_state(world, preserve=("thresholds",))
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "action": "events_acknowledged",
+
+            "acknowledged": acknowledged,
+
+            "pending_count": len(queue["pending"]),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "event_acknowledge_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/state/history', methods=['GET', 'POST'])
+@validate_params({
+    "document": {"type": "str", "choices": list(STATE_DOCUMENTS), "default": "character"},
+    "limit": {"type": "int", "min": 1, "max": 500, "default": 20}
+})
+def state_history():
+
+    """List the most recent versions of a state document"""
+
+    try:
+
+        data = get_request_data()
+
+        name = data["document"]
+
+        limit = data["limit"]
+
+        campaign = current_campaign()
+
+        with campaign.lock:
+
+            current_version = campaign.version(name)
+
+            versions = []
+
+            for version in reversed(campaign.history_versions(name)[-limit:]):
+
+                entry = campaign.read_version(name, version)
+
+                versions.append({"version": entry["version"], "timestamp": entry["timestamp"], "action": entry["action"]})
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "document": name,
+
+            "current_version": current_version,
+
+            "versions": versions,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "history_load_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/state/restore', methods=['GET', 'POST'])
+@validate_params({
+    "document": {"type": "str", "choices": list(STATE_DOCUMENTS) + ["both"], "default": "both"},
+    "version": {"type": "int", "min": 1},
+    "session": {"type": "int", "min": 1},
+    "point": {"type": "str", "choices": ["start", "end"], "default": "start"}
+})
+@mutates_state
+def state_restore():
+
+    """Roll character and/or world state back to a recorded version or session snapshot"""
+
+    try:
+
+        started = datetime.now()
+
+        data = get_request_data()
+
+        target = data["document"]
+
+        version = data["version"]
+
+        session_num = data["session"]
+
+        point = data["point"]
+
+        names = list(STATE_DOCUMENTS) if target == "both" else [target]
+
+        if (version is None) == (session_num is None) or (version is not None and len(names) != 1):
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "invalid_restore_target",
+
+                "message": "Give either version (with a single document) or session (with point=start|end)",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        campaign = current_campaign()
+
+        manifests = {}
+
+        if version is not None:
+
+            entry = campaign.read_version(names[0], version)
+
+            if entry is None or entry["manifest"] is None:
+
+                return jsonify({
+
+                    "status": "NOT_FOUND",
+
+                    "message": f"{names[0]} version {version} not found",
+
+                    "timestamp": datetime.now().isoformat()
+
+                }), 404
+
+            manifests[names[0]] = entry["manifest"]
+
+            action = f"restore:version_{version}"
+
+        else:
+
+            session_record = read_json_file(campaign.sessions_dir / f"session_{session_num}.json")
+
+            snapshot = session_record and session_record.get(f"{point}_snapshot")
+
+            if not snapshot:
+
+                return jsonify({
+
+                    "status": "NOT_FOUND",
+
+                    "message": f"Session {session_num} has no {point} snapshot",
+
+                    "timestamp": datetime.now().isoformat()
+
+                }), 404
+
+            manifests = {name: snapshot[name] for name in names if snapshot.get(name)}
+
+            action = f"restore:session_{session_num}_{point}"
+
+        new_versions = {name: campaign.restore(name, manifest, action) for name, manifest in manifests.items()}
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "action": "state_restored",
+
+            "restored_from": action.split(":", 1)[1],
+
+            "new_versions": new_versions,
+
+            "elapsed_ms": round((datetime.now() - started).total_seconds() * 1000, 2),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "state_restore_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+# ================================================================================
+
+# SECTION 11: ENDPOINTS - REFERENCE DATA (GET + POST)
+
+# ================================================================================
+
+@app.route('/hero/lookup', methods=['GET', 'POST'])
+@validate_params({"hero_name": {"type": "str", "required": True}})
+def hero_lookup():
+
+    """Lookup hero from database"""
+
+    try:
+
+        data = get_request_data()
+
+        hero_name = data["hero_name"]
+
+        hero = get_hero_from_database(hero_name)
+
+        if not hero:
+
+            return jsonify({
+
+                "status": "NOT_FOUND",
+
+                "hero_name": hero_name,
+
+                "message": f"Hero '{hero_name}' not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "hero": hero,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "hero_lookup_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/hero/query', methods=['GET', 'POST'])
+@validate_params({
+    "where": {"type": "object", "default": dict},
+    "sort": {"type": "list", "items": "str", "default": list},
+    "fields": {"type": "list", "items": "str", "default": lambda: ["id", "name"]},
+    "limit": {"type": "int", "min": 1, "max": 200, "default": 25},
+    "offset": {"type": "int", "min": 0, "default": 0}
+})
+def hero_query():
+
+    """
+    Query heroes through the database indexes.
+    where[power][gte]=15&where[alignment]=bad&sort=-power&fields=name,combat_stats.power
+    """
+
+    try:
+
+        data = get_request_data()
+
+        store = get_hero_store()
+
+        try:
+
+            bitmap = hero_query_bitmap(store, data["where"])
+
+            rows = hero_query_rows(store, bitmap, data["sort"], data["offset"], data["limit"])
+
+        except ValueError as e:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "invalid_query",
+
+                "message": str(e),
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        total = bin(bitmap).count("1")
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "total": total,
+
+            "offset": data["offset"],
+
+            "limit": data["limit"],
+
+            "has_more": data["offset"] + len(rows) < total,
+
+            "heroes": [project_hero(store.record(row), data["fields"]) for row in rows],
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "hero_query_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/hero/stats', methods=['GET', 'POST'])
+@validate_params(dict(
+    {column: {"type": "str"} for column in HERO_CATEGORICAL_COLUMNS},
+    **{f"{column}_min": TIER_PARAM for column in HERO_STAT_COLUMNS},
+    **{f"{column}_max": TIER_PARAM for column in HERO_STAT_COLUMNS},
+    include_names={"type": "bool", "default": True}
+))
+def hero_stats():
+
+    """Filter the columnar hero store and aggregate its stat columns (e.g. alignment=bad&power_min=15)"""
+
+    try:
+
+        data = get_request_data()
+
+        store = get_hero_store()
+
+        rows = store.select(
+
+            equals={column: data[column] for column in HERO_CATEGORICAL_COLUMNS if data[column]},
+
+            minimums={column: data[f"{column}_min"] for column in HERO_STAT_COLUMNS if data[f"{column}_min"] is not None},
+
+            maximums={column: data[f"{column}_max"] for column in HERO_STAT_COLUMNS if data[f"{column}_max"] is not None}
+
+        )
+
+        memory = store.memory_report()
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "count": len(rows),
+
+            "heroes": [store.names[row] for row in rows] if data["include_names"] else None,
+
+            "aggregates": {column: store.aggregate(column, rows) for column in HERO_STAT_COLUMNS},
+
+            "distribution": {column: store.value_counts(column, rows) for column in ("alignment", "gender")},
+
+            "database": {
+
+                "sources": store.sources,
+
+                "heroes": store.row_count,
+
+                "columnar_bytes": memory,
+
+                "raw_dict_bytes": store.raw_dict_bytes
+
+            },
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "hero_stats_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+RULE_DERIVATIONS["tier_catalog"] = lambda rules: TierCatalog(rules.tiers, rules.stat_multipliers)
+
+@app.route('/tier/catalog', methods=['GET', 'POST'])
+@validate_params({
+    "tier": {"type": "list", "items": "str"},
+    "compare": {"type": "list", "items": "int"}
+})
+def tier_catalog():
+
+    """
+    Tier definitions from the pre-rendered catalog: tier=8..12 (range), tier=3,7,12 (list),
+    no tier (all), or compare=A,B for a side-by-side of the four stat descriptors.
+    Responses carry an ETag and answer If-None-Match with 304.
+    """
+
+    try:
+
+        data = get_request_data()
+
+        catalog = rules_derived("tier_catalog")
+
+        try:
+
+            if data["compare"] is not None:
+
+                if len(data["compare"]) != 2:
+
+                    raise ValueError("compare takes exactly two tiers, e.g. compare=8,12")
+
+                tier_a, tier_b = data["compare"]
+
+                if (tier_a, tier_b) not in catalog.comparisons:
+
+                    raise ValueError(f"tiers {tier_a} and {tier_b} must both be defined. Valid range: {RULES.attributes.min}-{RULES.attributes.max}")
+
+                body, etag = catalog.comparisons[(tier_a, tier_b)]
+
+            elif data["tier"]:
+
+                body, etag = catalog.lookup(parse_tier_selector(data["tier"], catalog.fragments))
+
+            else:
+
+                body, etag = catalog.ranges[(catalog.tier_numbers[0], catalog.tier_numbers[-1])]
+
+        except ValueError as e:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "invalid_tier",
+
+                "message": str(e),
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        response = Response(body, mimetype="application/json")
+
+        response.set_etag(etag)
+
+        response.cache_control.public = True
+
+        return response.make_conditional(request)
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "tier_lookup_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/tier/info', methods=['GET', 'POST'])
+@validate_params({"tier": dict(TIER_PARAM, default=0)})
+def tier_info():
+
+    """Get tier definition"""
+
+    try:
+
+        data = get_request_data()
+
+        tier_num = data["tier"]
+
+        if tier_num not in RULES.tiers:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "invalid_tier",
+
+                "message": f"Tier {tier_num} not defined. Valid range: {RULES.attributes.min}-{RULES.attributes.max}",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "tier_number": tier_num,
+
+            "tier_definition": thaw_rules(RULES.tiers[tier_num]),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "tier_lookup_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+# ================================================================================
+
+# SECTION 12: ENDPOINTS - ARMOR SYSTEM (GET + POST)
+
+# ================================================================================
+
+@app.route('/calculate/armor_status', methods=['GET', 'POST'])
+@validate_params({
+    "attack_power_tier": dict(TIER_PARAM, default=1),
+    "armor_tier": dict(TIER_PARAM, default=1),
+    "character_resilience_tier": dict(TIER_PARAM, default=1),
+    "actor_hero": HERO_PARAM,
+    "defender_hero": HERO_PARAM
+}, prepare=hero_param_resolver({
+    "actor": {"attack_power_tier": "power"},
+    "defender": {"armor_tier": "armor", "character_resilience_tier": "resilience"}
+}))
+def calculate_armor_status_endpoint():
+
+    """Determine if armor is destroyed in attack"""
+
+    try:
+
+        data = get_request_data()
+
+        attack_power = data["attack_power_tier"]
+
+        armor_tier = data["armor_tier"]
+
+        character_resilience = data["character_resilience_tier"]
+
+        armor_status = calculate_armor_status(attack_power, armor_tier, character_resilience)
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "armor_data": armor_status,
+
+            "resolved_heroes": g.resolved_heroes or None,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "armor_calculation_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+@app.route('/character/armor/destroy', methods=['GET', 'POST'])
+@mutates_state
+def destroy_armor():
+
+    """Mark armor as destroyed"""
+
+    try:
+
+        # Load character
+
+        character = get_character_state()
+
+        if not character:
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "character_not_found",
+
+                "message": "character.json not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        # Update armor status
+
+        if "equipment" not in character:
+
+            character["equipment"] = {}
+
+        character["equipment"]["armor_destroyed"] = True
+
+        character["equipment"]["armor_destroyed_date"] = datetime.now().isoformat()
+
+        # Save
+
+        save_character_state(character)
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "action": "armor_destroyed",
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
+
+            "status": "ERROR",
+
+            "reason": "armor_destruction_failed",
+
+            "message": str(e),
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 500
+
+# ================================================================================
+
+# SECTION 13: ENDPOINTS - CAMPAIGN MANAGEMENT (GET + POST)
+
+# ================================================================================
+
+@app.route('/campaign/list', methods=['GET', 'POST'])
+
+def list_campaigns():
+
+    """List campaigns on disk and those currently resident in memory"""
+
+    try:
+
+        on_disk = []
+
+        if CAMPAIGNS.get(DEFAULT_CAMPAIGN_ID).exists():
+
+            on_disk.append(DEFAULT_CAMPAIGN_ID)
+
+        if CAMPAIGNS_DIR.exists():
+
+            on_disk.extend(sorted(d.name for d in CAMPAIGNS_DIR.iterdir() if d.is_dir() and is_valid_campaign_id(d.name)))
+
+        return jsonify({
+
+            "status": "SUCCESS",
+
+            "campaigns": on_disk,
+
+            "resident": CAMPAIGNS.resident_ids(),
+
+            "max_resident": CAMPAIGNS.max_resident,
+
+            "timestamp": datetime.now().isoformat()
+
+        }), 200
+
+    except Exception as e:
+
+        return jsonify({
 
-        character["advancement"]["ability_log"].append({
+            "status": "ERROR",
 
-            "timestamp": datetime.now().isoformat(),
+            "reason": "campaign_list_failed",
 
-            "action": "manifested",
+            "message": str(e),
 
-            "ability_name": ability_name,
+            "timestamp": datetime.now().isoformat()
 
-            "domain": domain,
+        }), 500
 
-            "initial_enhancement": enhancement_level
+@app.route('/campaign/create', methods=['GET', 'POST'])
+@validate_params({"template": {"type": "str", "default": DEFAULT_CAMPAIGN_ID}})
+@mutates_state
+def create_campaign():
 
-        })
+    """Create a new campaign by copying state documents from a template campaign"""
 
-        # Save
+    try:
 
-        save_character_state(character)
+        data = get_request_data()
+
+        template_id = data["template"]
+
+        campaign = current_campaign()
+
+        if campaign.exists():
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "campaign_exists",
+
+                "message": f"Campaign '{campaign.campaign_id}' already exists",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 400
+
+        if not is_valid_campaign_id(template_id) or not CAMPAIGNS.get(template_id).exists():
+
+            return jsonify({
+
+                "status": "ERROR",
+
+                "reason": "template_not_found",
+
+                "message": f"Template campaign '{template_id}' not found",
+
+                "timestamp": datetime.now().isoformat()
+
+            }), 404
+
+        template = CAMPAIGNS.get(template_id)
+
+        with template.lock:
+
+            for name in STATE_DOCUMENTS:
+
+                document = template.load(name)
+
+                if document is not None:
+
+                    campaign.save(name, json.loads(json.dumps(document)))
 
         return jsonify({
 
             "status": "SUCCESS",
 
-            "action": "ability_manifested",
+            "action": "campaign_created",
 
-            "ability": ability,
+            "campaign": campaign.campaign_id,
+
+            "template": template_id,
 
             "timestamp": datetime.now().isoformat()
 
@@ -1287,7 +7882,7 @@ def manifest_ability():
 
             "status": "ERROR",
 
-            "reason": "ability_manifestation_failed",
+            "reason": "campaign_creation_failed",
 
             "message": str(e),
 
@@ -1295,139 +7890,147 @@ def manifest_ability():
 
         }), 500
 
-@app.route('/character/ability/reroll', methods=['GET', 'POST'])
-
-def reroll_ability():
+@app.route('/campaign/export', methods=['GET', 'POST'])
+@validate_params({
+    "include_history": {"type": "bool", "default": True},
+    "include_sessions": {"type": "bool", "default": True}
+})
+def campaign_export():
 
-    """Reroll current ability - costs DC but doesn't increment counter"""
+    """Stream a campaign as NDJSON: state, event logs, version history, snapshots, sessions"""
 
     try:
 
         data = get_request_data()
 
-        new_ability_name = data.get("new_ability_name", "")
+        campaign = current_campaign()
 
-        new_domain = data.get("new_domain", "")
+        if not campaign.exists():
 
-        dc_to_spend = int(data.get("dc_amount", 0))
-
-        # Load character
+            return jsonify({
 
-        character = get_character_state()
+                "status": "NOT_FOUND",
 
-        if not character:
+                "message": f"Campaign '{campaign.campaign_id}' not found",
 
-            return jsonify({
+                "timestamp": datetime.now().isoformat()
 
-                "status": "ERROR",
+            }), 404
 
-                "reason": "character_not_found",
+        lines = iter_campaign_export(campaign, include_history=data["include_history"], include_sessions=data["include_sessions"])
 
-                "message": "character.json not found",
+        response = Response(stream_with_context(lines), mimetype="application/x-ndjson")
 
-                "timestamp": datetime.now().isoformat()
+        response.headers["Content-Disposition"] = f'attachment; filename="{campaign.campaign_id}-{datetime.now():%Y%m%d-%H%M%S}.ndjson"'
 
-            }), 404
+        return response
 
-        # Check if has active ability
+    except Exception as e:
 
-        if "active_ability" not in character or not character["active_ability"]:
+        return jsonify({
 
-            return jsonify({
+            "status": "ERROR",
 
-                "status": "ERROR",
+            "reason": "campaign_export_failed",
 
-                "reason": "no_active_ability",
+            "message": str(e),
 
-                "message": "Cannot reroll - no active ability",
+            "timestamp": datetime.now().isoformat()
 
-                "timestamp": datetime.now().isoformat()
+        }), 500
 
-            }), 400
+def import_campaign(campaign):
 
-        # Check DC balance
+    """Response of /campaign/import for the request body (call under the campaign lock)"""
 
-        dc_balance = character.get("advancement", {}).get("dc_balance", {}).get("current_balance", 0)
+    try:
 
-        if dc_balance < dc_to_spend:
+        if campaign.exists():
 
             return jsonify({
 
                 "status": "ERROR",
 
-                "reason": "insufficient_dc",
+                "reason": "campaign_exists",
 
-                "message": f"Required: {dc_to_spend} DC, Current: {dc_balance} DC",
+                "message": f"Campaign '{campaign.campaign_id}' already exists",
 
                 "timestamp": datetime.now().isoformat()
 
             }), 400
 
-        # Get old ability info
+        imported = import_campaign_stream(campaign, request.stream)
 
-        old_ability = character["active_ability"].copy()
+        return jsonify({
 
-        old_enhancement_level = old_ability.get("enhancement_level", 1)
+            "status": "SUCCESS",
 
-        # Update ability (name, domain change but keep enhancement level)
+            "action": "campaign_imported",
 
-        character["active_ability"]["name"] = new_ability_name
+            "campaign": campaign.campaign_id,
 
-        character["active_ability"]["domain"] = new_domain
+            "imported": imported,
 
-        character["active_ability"]["rerolled_date"] = datetime.now().isoformat()
+            "timestamp": datetime.now().isoformat()
 
-        # Spend DC
+        }), 200
 
-        character["advancement"]["dc_balance"]["current_balance"] -= dc_to_spend
+    except ValueError as e:
 
-        character["advancement"]["dc_balance"]["spent_total"] += dc_to_spend
+        return jsonify({
 
-        # Track in log
+            "status": "ERROR",
 
-        character["advancement"]["ability_log"].append({
+            "reason": "invalid_export",
 
-            "timestamp": datetime.now().isoformat(),
+            "message": str(e),
 
-            "action": "rerolled",
+            "timestamp": datetime.now().isoformat()
 
-            "old_ability": old_ability["name"],
+        }), 400
 
-            "new_ability": new_ability_name,
+@app.route('/campaign/import', methods=['POST'])
 
-            "old_domain": old_ability["domain"],
+def campaign_import():
 
-            "new_domain": new_domain,
+    """
+    Create a campaign from a /campaign/export stream. The body is the NDJSON itself,
+    read line by line; name the new campaign in the query string (?campaign=<id>).
+    idempotency_key also goes in the query string, so a retried upload replays the
+    first response instead of failing with campaign_exists.
+    """
 
-            "enhancement_level_unchanged": old_enhancement_level,
+    try:
 
-            "dc_spent": dc_to_spend
+        campaign = current_campaign()
 
-        })
+        params = decode_query_args(request.args)
 
-        # Save
+        idempotency_key = params.get("idempotency_key")
 
-        save_character_state(character)
+        error = idempotency_key_error(idempotency_key)
 
-        return jsonify({
+        if error is not None:
 
-            "status": "SUCCESS",
+            return error
 
-            "action": "ability_rerolled",
+        with campaign.lock:
 
-            "old_ability": old_ability["name"],
+            if idempotency_key is None:
 
-            "new_ability": new_ability_name,
+                return import_campaign(campaign)
 
-            "enhancement_level_preserved": old_enhancement_level,
+            cache_key = (campaign.campaign_id, request.endpoint, str(idempotency_key))
 
-            "dc_spent": dc_to_spend,
+            fingerprint = idempotency_fingerprint(params)
 
-            "dc_balance_after": character["advancement"]["dc_balance"]["current_balance"],
+            replayed = idempotent_replay(cache_key, fingerprint)
 
-            "timestamp": datetime.now().isoformat()
+            if replayed is not None:
 
-        }), 200
+                return replayed
+
+            return remember_response(cache_key, fingerprint, import_campaign(campaign))
 
     except Exception as e:
 
@@ -1435,7 +8038,7 @@ def reroll_ability():
 
             "status": "ERROR",
 
-            "reason": "ability_reroll_failed",
+            "reason": "campaign_import_failed",
 
             "message": str(e),
 
@@ -1443,311 +8046,460 @@ def reroll_ability():
 
         }), 500
 
+# Mutating, but outside mutates_state: the body is streamed NDJSON, not request params
+
+MUTATING_VIEWS.add(campaign_import.__name__)
+
 # ================================================================================
 
-# SECTION 10: ENDPOINTS - STATE MANAGEMENT (GET + POST)
+# SECTION 14: ROUTE REGISTRY, BATCH DISPATCH & LEGACY CONTRACT
 
 # ================================================================================
 
-@app.route('/character/get_state', methods=['GET', 'POST'])
+API_MODE = os.environ.get("API_MODE", "dual").strip().lower()
 
-def get_character_state_endpoint():
+# Served in every API mode (deployment probes)
 
-    """Get current character state"""
+OPERATIONAL_ROUTES = ("/ready",)
 
-    try:
+def adapt_legacy_combat(body):
 
-        character = get_character_state()
+    """
+    Legacy /calculate/combat body: {"actor": {"speed_tier", ..., "environment_dc_modifier"},
+    "defender": {...}} -> flat actor_*/defender_* params. Flat params win if both are sent.
+    """
 
-        if not character:
+    flat = {key: value for key, value in body.items() if key not in COMBATANT_SIDES or not isinstance(value, dict)}
 
-            return jsonify({
+    for side in COMBATANT_SIDES:
 
-                "status": "NOT_FOUND",
+        nested = body.get(side)
 
-                "message": "character.json not found",
+        if not isinstance(nested, dict):
 
-                "timestamp": datetime.now().isoformat()
+            continue
 
-            }), 404
+        for key, value in nested.items():
 
-        return jsonify({
+            flat.setdefault(f"{side}_{'dc_modifier' if key == 'environment_dc_modifier' else key}", value)
 
-            "status": "SUCCESS",
+    return flat
 
-            "character": character,
+# The original contract: path -> request adapter (None = same params). These paths accept the
+# legacy request shapes in every mode; a legacy API_MODE serves only them (see LEGACY_CONTRACTS).
 
-            "timestamp": datetime.now().isoformat()
+LEGACY_ROUTES = {
 
-        }), 200
+    '/health': None,
 
-    except Exception as e:
+    '/rules/summary': None,
 
-        return jsonify({
+    '/session/current': None,
 
-            "status": "ERROR",
+    '/calculate/stat_advantage': None,
 
-            "reason": "character_load_failed",
+    '/calculate/combat': adapt_legacy_combat,
 
-            "message": str(e),
+    '/calculate/enhancement_cost': None,
 
-            "timestamp": datetime.now().isoformat()
+    '/character/enhance_stat': None,
 
-        }), 500
+    '/calculate/premonition_dc': None,
 
-@app.route('/world/get_state', methods=['GET', 'POST'])
+    '/character/premonition/resolve': None,
 
-def get_world_state_endpoint():
+    '/calculate/ability_reroll_cost': None,
 
-    """Get current world state"""
+    '/character/ability/manifest': None,
 
-    try:
+    '/character/ability/reroll': None,
 
-        world = get_world_state()
+    '/character/get_state': None,
 
-        if not world:
+    '/world/get_state': None,
+
+    '/world/escalation/update': None,
+
+    '/world/date/advance': None,
+
+    '/hero/lookup': None,
+
+    '/tier/info': None,
+
+    '/calculate/armor_status': None,
+
+    '/character/armor/destroy': None
+
+}
+
+# Methods per path of each legacy entry point: final-flask.py (API_MODE=legacy) took POST only,
+# final-flask-FIXED.PY (API_MODE=legacy-fixed) also answered GET on its three read routes
+
+LEGACY_FIXED_GET_ROUTES = ('/health', '/character/get_state', '/world/get_state')
+
+LEGACY_CONTRACTS = {
+
+    "legacy": {path: ("POST",) for path in LEGACY_ROUTES},
+
+    "legacy-fixed": {path: ("GET", "POST") if path in LEGACY_FIXED_GET_ROUTES else ("POST",) for path in LEGACY_ROUTES}
+
+}
+
+# Methods per path in a legacy API_MODE, None in dual mode
+
+LEGACY_METHODS = LEGACY_CONTRACTS.get(API_MODE)
+
+@app.before_request
+
+def apply_api_contract():
+
+    """Enforce the legacy contract in legacy mode and normalise legacy request shapes"""
+
+    if request.method == "OPTIONS" or request.path in OPERATIONAL_ROUTES:
+
+        return None
+
+    if LEGACY_METHODS is not None:
+
+        if request.path not in LEGACY_METHODS:
 
             return jsonify({
 
                 "status": "NOT_FOUND",
 
-                "message": "world_state.json not found",
+                "message": f"{request.path} is not part of the legacy API",
 
                 "timestamp": datetime.now().isoformat()
 
             }), 404
 
-        return jsonify({
+        if request.method not in LEGACY_METHODS[request.path]:
 
-            "status": "SUCCESS",
+            return jsonify({
 
-            "world": world,
+                "status": "ERROR",
 
-            "timestamp": datetime.now().isoformat()
+                "reason": "method_not_allowed",
 
-        }), 200
+                "message": f"The legacy API accepts {' or '.join(LEGACY_METHODS[request.path])} on {request.path}",
 
-    except Exception as e:
+                "timestamp": datetime.now().isoformat()
 
-        return jsonify({
+            }), 405
 
-            "status": "ERROR",
+    adapter = LEGACY_ROUTES.get(request.path)
 
-            "reason": "world_load_failed",
+    if adapter is not None:
 
-            "message": str(e),
+        body = get_request_data()
 
-            "timestamp": datetime.now().isoformat()
+        g.request_body = adapter(body) if isinstance(body, dict) else body
 
-        }), 500
+def route_registry():
 
-@app.route('/world/escalation/update', methods=['GET', 'POST'])
+    """Every route served in the current API mode: path, methods, endpoint, schema and legacy status"""
 
-def update_world_escalation():
+    routes = []
 
-    """Update world escalation indicators (Secondary LLM calls this)"""
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
 
-    try:
+        if rule.endpoint == "static":
 
-        data = get_request_data()
+            continue
 
-        updates = data.get("escalation_updates", {})
+        legacy = rule.rule in LEGACY_ROUTES
 
-        # Load world state
+        if LEGACY_METHODS is not None and not legacy:
 
-        world = get_world_state()
+            continue
 
-        if not world:
+        view = app.view_functions[rule.endpoint]
 
-            return jsonify({
+        routes.append({
 
-                "status": "ERROR",
+            "path": rule.rule,
 
-                "reason": "world_not_found",
+            "methods": list(LEGACY_METHODS[rule.rule]) if LEGACY_METHODS is not None else sorted(rule.methods - {"HEAD", "OPTIONS"}),
 
-                "message": "world_state.json not found",
+            "endpoint": rule.endpoint,
 
-                "timestamp": datetime.now().isoformat()
+            "validated": view.__name__ in ROUTE_SCHEMAS,
 
-            }), 404
+            "mutating": view.__name__ in MUTATING_VIEWS,
 
-        # Update escalation indicators
+            "legacy": legacy,
+
+            "legacy_adapter": LEGACY_ROUTES[rule.rule].__name__ if legacy and LEGACY_ROUTES[rule.rule] else None,
+
+            "summary": (view.__doc__ or "").strip().splitlines()[0] if view.__doc__ else None
+
+        })
+
+    return routes
+
+@app.route('/routes', methods=['GET', 'POST'])
+@validate_params({})
+def list_routes():
+
+    """Route registry of this process (dual mode: GET+POST everywhere; legacy routes also take nested bodies)"""
+
+    routes = route_registry()
+
+    return jsonify({
+
+        "status": "SUCCESS",
+
+        "api_mode": API_MODE,
+
+        "count": len(routes),
+
+        "routes": routes,
+
+        "timestamp": datetime.now().isoformat()
+
+    }), 200
+
+BATCH_MAX_CALLS = 50
+
+BATCH_WORKERS = 4
+
+BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="batch")
+
+def batch_route_target(route):
+
+    """(endpoint, mutating) for a batchable route. Raises ValueError."""
+
+    if not isinstance(route, str) or not route.startswith("/"):
+
+        raise ValueError("route must be a path such as /world/get_state")
+
+    try:
+
+        endpoint, _ = app.url_map.bind("localhost").match(route, method="POST")
+
+    except HTTPException:
+
+        raise ValueError(f"unknown route {route}")
+
+    if endpoint in ("batch", "static", "campaign_export", "campaign_import"):
+
+        raise ValueError(f"{route} cannot be batched")
+
+    return endpoint, endpoint in MUTATING_VIEWS
 
-        if "escalation_indicators" not in world:
+def dispatch_batch_call(route, params, rules):
 
-            world["escalation_indicators"] = {}
+    """
+    Run one call through the full request pipeline (hooks, validation, handler) in a
+    fresh app context, so it sees its own g but the batch's pinned rule set.
+    """
 
-        for indicator_name, new_value in updates.items():
+    started = time.perf_counter()
 
-            world["escalation_indicators"][indicator_name] = {
+    with app.app_context():
 
-                "value": new_value,
+        g.rules = rules
 
-                "last_updated": datetime.now().isoformat()
+        with app.test_request_context(route, method="POST", json=params):
 
-            }
+            try:
 
-        # Save
+                response = app.full_dispatch_request()
 
-        save_world_state(world)
+            except Exception as e:
 
-        return jsonify({
+                response = jsonify({"status": "ERROR", "reason": "batch_call_failed", "message": str(e), "timestamp": datetime.now().isoformat()})
 
-            "status": "SUCCESS",
+                response.status_code = 500
 
-            "action": "escalation_updated",
+            return {
 
-            "updates": updates,
+                "route": route,
 
-            "timestamp": datetime.now().isoformat()
+                "status_code": response.status_code,
 
-        }), 200
+                "body": response.get_json(silent=True),
 
-    except Exception as e:
+                "ms": round((time.perf_counter() - started) * 1000, 2)
 
-        return jsonify({
+            }
 
-            "status": "ERROR",
+def plan_batch(calls):
 
-            "reason": "escalation_update_failed",
+    """
+    Split calls into ordered groups: runs of consecutive read-only calls share a group
+    (run concurrently), each mutating call is a group of its own (a barrier).
+    Returns (groups of (index, route, params), errors).
+    """
 
-            "message": str(e),
+    groups, errors = [], []
 
-            "timestamp": datetime.now().isoformat()
+    for index, call in enumerate(calls):
 
-        }), 500
+        route, params = call.get("route"), call.get("params") or {}
 
-@app.route('/world/date/advance', methods=['GET', 'POST'])
+        try:
 
-def advance_world_date():
+            _, mutating = batch_route_target(route)
 
-    """Advance world date (Secondary LLM calls this between sessions)"""
+        except ValueError as e:
 
-    try:
+            errors.append({"field": f"calls[{index}].route", "error": "invalid_route", "message": str(e)})
 
-        data = get_request_data()
+            continue
 
-        days_advance = int(data.get("days", 0))
+        if not isinstance(params, dict):
 
-        # Load world state
+            errors.append({"field": f"calls[{index}].params", "error": "invalid_type", "message": f"calls[{index}].params must be a JSON object"})
 
-        world = get_world_state()
+            continue
 
-        if not world:
+        if mutating or not groups or groups[-1][0]:
 
-            return jsonify({
+            groups.append((mutating, []))
 
-                "status": "ERROR",
+        groups[-1][1].append((index, route, params))
 
-                "reason": "world_not_found",
+    return groups, errors
 
-                "message": "world_state.json not found",
+def run_batch(data, groups):
 
-                "timestamp": datetime.now().isoformat()
+    """Run planned batch groups (see plan_batch) and build the /batch response"""
 
-            }), 404
+    rules = current_rules()
 
-        # Update date (assuming world has "current_date" field)
+    campaign_id = data.get("campaign")
 
-        if "current_date" in world:
+    results = [None] * len(data["calls"])
 
-            from datetime import datetime as dt, timedelta
+    failed = False
 
-            current = dt.fromisoformat(world["current_date"])
+    for mutating, group in groups:
 
-            new_date = current + timedelta(days=days_advance)
+        if failed and data["stop_on_error"]:
 
-            world["current_date"] = new_date.isoformat()
+            for index, route, _ in group:
 
-        # Save
+                results[index] = {"route": route, "status_code": None, "body": None, "skipped": True}
 
-        save_world_state(world)
+            continue
 
-        return jsonify({
+        group = [(index, route, dict({"campaign": campaign_id}, **params) if campaign_id else params) for index, route, params in group]
 
-            "status": "SUCCESS",
+        if len(group) == 1:
 
-            "action": "date_advanced",
+            index, route, params = group[0]
 
-            "days_advanced": days_advance,
+            results[index] = dispatch_batch_call(route, params, rules)
 
-            "new_date": world.get("current_date"),
+        else:
 
-            "timestamp": datetime.now().isoformat()
+            futures = [(index, BATCH_EXECUTOR.submit(dispatch_batch_call, route, params, rules)) for index, route, params in group]
 
-        }), 200
+            for index, future in futures:
 
-    except Exception as e:
+                results[index] = future.result()
 
-        return jsonify({
+        failed = failed or any(results[index]["status_code"] >= 400 for index, _, _ in group)
 
-            "status": "ERROR",
+    GROUP_COMMIT.flush_all()
 
-            "reason": "date_advancement_failed",
+    return jsonify({
 
-            "message": str(e),
+        "status": "PARTIAL" if failed else "SUCCESS",
 
-            "timestamp": datetime.now().isoformat()
+        "rules_version": rules.version_tag,
 
-        }), 500
+        "count": len(results),
 
-# ================================================================================
+        "groups": len(groups),
 
-# SECTION 11: ENDPOINTS - REFERENCE DATA (GET + POST)
+        "results": results,
 
-# ================================================================================
+        "timestamp": datetime.now().isoformat()
 
-@app.route('/hero/lookup', methods=['GET', 'POST'])
+    }), 200
 
-def hero_lookup():
+@app.route('/batch', methods=['GET', 'POST'])
+@validate_params({
+    "calls": {"type": "list", "items": "object", "required": True},
+    "stop_on_error": {"type": "bool", "default": False}
+})
+def batch():
 
-    """Lookup hero from database"""
+    """
+    Run several route calls in one round trip: calls=[{route, params}, ...].
+    Read-only calls between mutating ones run concurrently; mutating calls run alone
+    and in order. A batch-level campaign applies to calls that do not set their own.
+    With stop_on_error, calls after the first failing group are skipped.
+    A batch-level idempotency_key replays the whole batch response on retry. Batches
+    sharing a key are serialized on a lock of their own, not the campaign lock, which
+    the calls take themselves.
+    """
 
     try:
 
         data = get_request_data()
 
-        hero_name = data.get("hero_name", "").strip()
+        calls = data["calls"]
 
-        if not hero_name:
+        if not 1 <= len(calls) <= BATCH_MAX_CALLS:
 
             return jsonify({
 
                 "status": "ERROR",
 
-                "reason": "missing_hero_name",
+                "reason": "invalid_parameters",
 
-                "message": "hero_name is required",
+                "message": f"calls must hold between 1 and {BATCH_MAX_CALLS} entries",
 
                 "timestamp": datetime.now().isoformat()
 
             }), 400
 
-        hero = get_hero_from_database(hero_name)
+        groups, errors = plan_batch(calls)
 
-        if not hero:
+        if errors:
 
             return jsonify({
 
-                "status": "NOT_FOUND",
+                "status": "ERROR",
 
-                "hero_name": hero_name,
+                "reason": "invalid_parameters",
 
-                "message": f"Hero '{hero_name}' not found",
+                "message": "; ".join(error["message"] for error in errors),
+
+                "errors": errors,
 
                 "timestamp": datetime.now().isoformat()
 
-            }), 404
+            }), 400
 
-        return jsonify({
+        idempotency_key = data.get("idempotency_key")
 
-            "status": "SUCCESS",
+        error = idempotency_key_error(idempotency_key)
 
-            "hero": hero,
+        if error is not None:
 
-            "timestamp": datetime.now().isoformat()
+            return error
 
-        }), 200
+        if idempotency_key is None:
+
+            return run_batch(data, groups)
+
+        cache_key = (get_requested_campaign_id(), request.endpoint, str(idempotency_key))
+
+        fingerprint = idempotency_fingerprint(data)
+
+        with IDEMPOTENCY.key_lock(cache_key):
+
+            replayed = idempotent_replay(cache_key, fingerprint)
+
+            if replayed is not None:
+
+                return replayed
+
+            return remember_response(cache_key, fingerprint, run_batch(data, groups))
 
     except Exception as e:
 
@@ -1755,7 +8507,7 @@ def hero_lookup():
 
             "status": "ERROR",
 
-            "reason": "hero_lookup_failed",
+            "reason": "batch_failed",
 
             "message": str(e),
 
@@ -1763,177 +8515,197 @@ def hero_lookup():
 
         }), 500
 
-@app.route('/tier/info', methods=['GET', 'POST'])
+# Mutating when any of its calls is; handles idempotency_key itself (see above)
 
-def tier_info():
+MUTATING_VIEWS.add(batch.__name__)
 
-    """Get tier definition"""
+mark_startup("routes")
 
-    try:
+# ================================================================================
 
-        data = get_request_data()
+# SECTION 15: STARTUP
 
-        tier_num = int(data.get("tier", 0))
+# ================================================================================
 
-        if tier_num not in RULES["tiers"]:
+PREWARM = os.environ.get("PREWARM", "0").strip().lower() in ("1", "true", "yes")
 
-            return jsonify({
+def prewarm_default_campaign():
 
-                "status": "ERROR",
+    campaign = CAMPAIGNS.get(DEFAULT_CAMPAIGN_ID)
 
-                "reason": "invalid_tier",
+    for name in STATE_DOCUMENTS:
 
-                "message": f"Tier {tier_num} not defined. Valid range: 0-25",
+        campaign.load(name)
 
-                "timestamp": datetime.now().isoformat()
+        campaign.version(name)
 
-            }), 400
+    campaign.derived("world", "thresholds", build_threshold_index)
 
-        return jsonify({
+    campaign.session_index()
 
-            "status": "SUCCESS",
+# Caches a cold process fills on first use; warmed in this order by run_prewarm()
 
-            "tier_number": tier_num,
+PREWARM_TASKS = {
 
-            "tier_definition": RULES["tiers"][tier_num],
+    "rules_formulas": lambda: rules_derived("formulas"),
 
-            "timestamp": datetime.now().isoformat()
+    "tier_catalog": lambda: rules_derived("tier_catalog"),
 
-        }), 200
+    "hero_indexes": get_hero_store,
 
-    except Exception as e:
+    "default_campaign": prewarm_default_campaign
 
-        return jsonify({
+}
 
-            "status": "ERROR",
+READINESS = {"state": "cold", "tasks": {}, "warm_ms": None}
 
-            "reason": "tier_lookup_failed",
+READINESS_LOCK = threading.Lock()
 
-            "message": str(e),
+def run_prewarm():
 
-            "timestamp": datetime.now().isoformat()
+    started = time.perf_counter()
 
-        }), 500
+    failed = False
 
-# ================================================================================
+    for name, task in PREWARM_TASKS.items():
 
-# SECTION 12: ENDPOINTS - ARMOR SYSTEM (GET + POST)
+        task_started = time.perf_counter()
 
-# ================================================================================
+        try:
 
-@app.route('/calculate/armor_status', methods=['GET', 'POST'])
+            task()
 
-def calculate_armor_status_endpoint():
+            READINESS["tasks"][name] = {"status": "warm", "ms": round((time.perf_counter() - task_started) * 1000, 2)}
 
-    """Determine if armor is destroyed in attack"""
+        except Exception as e:
 
-    try:
+            failed = True
 
-        data = get_request_data()
+            READINESS["tasks"][name] = {"status": "failed", "error": str(e)}
 
-        attack_power = int(data.get("attack_power_tier", 1))
+    READINESS["warm_ms"] = round((time.perf_counter() - started) * 1000, 2)
 
-        armor_tier = int(data.get("armor_tier", 1))
+    READINESS["state"] = "failed" if failed else "ready"
 
-        character_resilience = int(data.get("character_resilience_tier", 1))
+def start_prewarm():
 
-        armor_status = calculate_armor_status(attack_power, armor_tier, character_resilience)
+    """Warm every cache in a background thread (once; again after a failure)"""
 
-        return jsonify({
+    with READINESS_LOCK:
 
-            "status": "SUCCESS",
+        if READINESS["state"] not in ("cold", "failed"):
 
-            "armor_data": armor_status,
+            return
 
-            "timestamp": datetime.now().isoformat()
+        READINESS["state"] = "warming"
 
-        }), 200
+        READINESS["tasks"] = {name: {"status": "pending"} for name in PREWARM_TASKS}
 
-    except Exception as e:
+    threading.Thread(target=run_prewarm, name="prewarm", daemon=True).start()
 
-        return jsonify({
+@app.route('/ready', methods=['GET', 'POST'])
 
-            "status": "ERROR",
+def readiness_check():
 
-            "reason": "armor_calculation_failed",
+    """
+    Readiness probe: 503 until rules, tier catalog, hero indexes and default campaign
+    state are warm, then 200. Unlike /health it reflects cache state; without
+    PREWARM=1 the first call starts the warm-up.
+    """
 
-            "message": str(e),
+    start_prewarm()
 
-            "timestamp": datetime.now().isoformat()
+    ready = READINESS["state"] == "ready"
 
-        }), 500
+    return jsonify({
 
-@app.route('/character/armor/destroy', methods=['GET', 'POST'])
+        "status": "READY" if ready else READINESS["state"].upper(),
 
-def destroy_armor():
+        "tasks": READINESS["tasks"],
 
-    """Mark armor as destroyed"""
+        "warm_ms": READINESS["warm_ms"],
 
-    try:
+        "startup": startup_report(),
 
-        # Load character
+        "prewarm_on_start": PREWARM,
 
-        character = get_character_state()
+        "timestamp": datetime.now().isoformat()
 
-        if not character:
+    }), 200 if ready else 503
 
-            return jsonify({
+if PREWARM:
 
-                "status": "ERROR",
+    start_prewarm()
 
-                "reason": "character_not_found",
+def flush_on_shutdown(signum=None, frame=None):
 
-                "message": "character.json not found",
+    """
+    Synchronously write every unflushed document (group mode) or checkpoint every
+    resident campaign (WAL mode, so the next start replays nothing); on SIGTERM, exit afterwards
+    """
 
-                "timestamp": datetime.now().isoformat()
+    GROUP_COMMIT.flush_all()
 
-            }), 404
+    if WRITE_MODE == "wal":
 
-        # Update armor status
+        for campaign_id in CAMPAIGNS.resident_ids():
 
-        if "equipment" not in character:
+            CAMPAIGNS.get(campaign_id).checkpoint()
 
-            character["equipment"] = {}
+    if signum is not None:
 
-        character["equipment"]["armor_destroyed"] = True
+        sys.exit(0)
 
-        character["equipment"]["armor_destroyed_date"] = datetime.now().isoformat()
+if WRITE_MODE in ("group", "wal"):
 
-        # Save
+    atexit.register(flush_on_shutdown)
 
-        save_character_state(character)
+    if threading.current_thread() is threading.main_thread():
 
-        return jsonify({
+        signal.signal(signal.SIGTERM, flush_on_shutdown)
 
-            "status": "SUCCESS",
+def print_startup_banner():
 
-            "action": "armor_destroyed",
+    report = startup_report()
 
-            "timestamp": datetime.now().isoformat()
+    print(f"Import: {report['import_ms']} ms (" + ", ".join(f"{phase} {ms} ms" for phase, ms in report["phases"].items()) + ")")
 
-        }), 200
+    print(f"Prewarm: {'background on start' if PREWARM else 'on first /ready'}")
 
-    except Exception as e:
+    print(f"Compression: {', '.join(CONTENT_CODINGS)} for bodies >= {COMPRESS_MIN_BYTES} bytes")
 
-        return jsonify({
+    print(f"Writes: {'group commit every ' + str(GROUP_COMMIT_INTERVAL) + ' s (durable=true flushes at once)' if WRITE_MODE == 'group' else 'write-ahead log, checkpoint every ' + str(WAL_CHECKPOINT_RECORDS) + ' records' if WRITE_MODE == 'wal' else 'write-through'}")
 
-            "status": "ERROR",
+    print(f"Idempotency: idempotency_key on mutating routes, replays kept {IDEMPOTENCY_TTL_SECONDS}s (max {IDEMPOTENCY_MAX_ENTRIES})")
 
-            "reason": "armor_destruction_failed",
+    if LEGACY_METHODS is not None:
 
-            "message": str(e),
+        print("=" * 80)
 
-            "timestamp": datetime.now().isoformat()
+        print(f"IMPEROR OMO - FLASK ENGINE v3.0 (LEGACY CONTRACT: {API_MODE})")
 
-        }), 500
+        print("=" * 80)
 
-# ================================================================================
+        print(f"System: {RULES.system.name}")
 
-# SECTION 13: STARTUP
+        print()
 
-# ================================================================================
+        print("ENDPOINTS (POST with a JSON body):")
+
+        print()
+
+        for path, methods in LEGACY_METHODS.items():
+
+            print(f"  {'|'.join(methods):<8} {path}")
+
+        print()
+
+        print("=" * 80)
+
+        print()
+
+        return
 
-if __name__ == '__main__':
 
     print("=" * 80)
 
@@ -1941,11 +8713,11 @@ if __name__ == '__main__':
 
     print("=" * 80)
 
-    print(f"System: {RULES['system']['name']}")
+    print(f"System: {RULES.system.name}")
 
-    print(f"Universe: {RULES['system']['universe']}")
+    print(f"Universe: {RULES.system.universe}")
 
-    print(f"Karmic Cap: Tier {RULES['system']['karmic_cap']}")
+    print(f"Karmic Cap: Tier {RULES.system.karmic_cap}")
 
     print()
 
@@ -1959,8 +8731,20 @@ if __name__ == '__main__':
 
     print("  GET|POST /rules/summary")
 
+    print("  GET|POST /routes")
+
+    print("  GET|POST /batch   (calls=[{route, params}, ...])")
+
+    print("  GET|POST /ready   (503 until caches are warm)")
+
     print("  GET|POST /session/current")
 
+    print("  GET|POST /session/start")
+
+    print("  GET|POST /session/end?summary=...")
+
+    print("  GET|POST /session/get?session=N&include_state=true")
+
     print()
 
     print("COMBAT:")
@@ -1969,6 +8753,10 @@ if __name__ == '__main__':
 
     print("  GET|POST /calculate/combat?actor_speed_tier=X&actor_power_tier=Y&...")
 
+    print("  GET|POST /calculate/combat?actor_hero=self&defender_hero=Bane&defender_power_tier=7")
+
+    print("  GET|POST /simulate/combat?actor_power_tier=X&defender_power_tier=Y&actor_armor_tier=Z&trials=10000&seed=N")
+
     print()
 
     print("ADVANCEMENT:")
@@ -1977,6 +8765,8 @@ if __name__ == '__main__':
 
     print("  GET|POST /character/enhance_stat?stat=power&dc_amount=X")
 
+    print("  GET|POST /character/ledger/verify?rebuild=true")
+
     print()
 
     print("PREMONITION:")
@@ -1985,6 +8775,8 @@ if __name__ == '__main__':
 
     print("  GET|POST /character/premonition/resolve?success=true&actor_tier=X&threat_tier=Y")
 
+    print("  GET|POST /character/premonition/analytics?actor_tier=X&threat_tiers=5,10,15")
+
     print()
 
     print("ABILITIES:")
@@ -2003,9 +8795,23 @@ if __name__ == '__main__':
 
     print("  GET|POST /world/get_state")
 
-    print("  GET|POST /world/escalation/update?escalation_updates={}")
+    print("  GET|POST /world/escalation/update?escalation_updates={...} (or escalation_updates[name]=X)")
+
+    print("  GET|POST /world/date/advance?days=X&apply_escalation=true")
+
+    print("  GET|POST /state/patch?document=world&patch={...}&if_version=N (or patches=[...])")
+
+    print("  GET|POST /world/thresholds/upcoming?limit=5")
+
+    print("  GET|POST /world/events/pending")
 
-    print("  GET|POST /world/date/advance?days=X")
+    print("  GET|POST /world/events/acknowledge?event_ids=1,2 (or all=true)")
+
+    print("  GET|POST /state/history?document=character&limit=20")
+
+    print("  GET|POST /state/restore?document=character&version=N")
+
+    print("  GET|POST /state/restore?document=both&session=N&point=start")
 
     print()
 
@@ -2013,8 +8819,13 @@ if __name__ == '__main__':
 
     print("  GET|POST /hero/lookup?hero_name=Superman")
 
+    print("  GET|POST /hero/query?where[power][gte]=15&where[alignment]=bad&sort=-power&fields=name,combat_stats.power")
+    print("  GET|POST /hero/stats?alignment=bad&power_min=15")
+
     print("  GET|POST /tier/info?tier=10")
 
+    print("  GET|POST /tier/catalog?tier=8..12 | tier=3,7,12 | compare=8,12")
+
     print()
 
     print("ARMOR:")
@@ -2025,8 +8836,100 @@ if __name__ == '__main__':
 
     print()
 
+    print("CAMPAIGNS (add campaign=<id> to any state route; default campaign if omitted):")
+
+    print("  GET|POST /campaign/list")
+
+    print("  GET|POST /campaign/create?campaign=X&template=default")
+
+    print("  GET|POST /campaign/export?campaign=X   (NDJSON stream)")
+
+    print("  POST     /campaign/import?campaign=X   (NDJSON body)")
+
+    print()
+
     print("=" * 80)
 
     print()
 
-app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
+def main(argv=None):
+
+    """
+    python final_flask_updated.py                              run the server
+    python final_flask_updated.py export <campaign> [-o FILE]  NDJSON export (stdout by default)
+    python final_flask_updated.py import <campaign> [-i FILE]  NDJSON import (stdin by default)
+    """
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Imperor Omo Flask engine")
+
+    commands = parser.add_subparsers(dest="command")
+
+    export_parser = commands.add_parser("export", help="stream a campaign to NDJSON")
+
+    export_parser.add_argument("campaign")
+
+    export_parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+
+    export_parser.add_argument("--no-history", action="store_true", help="skip version history and snapshot objects")
+
+    export_parser.add_argument("--no-sessions", action="store_true", help="skip session records")
+
+    import_parser = commands.add_parser("import", help="create a campaign from an NDJSON export")
+
+    import_parser.add_argument("campaign")
+
+    import_parser.add_argument("-i", "--input", help="file to read (default: stdin)")
+
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+
+        print_startup_banner()
+
+        app.run(host='0.0.0.0', port=5000)
+
+        return 0
+
+    if not is_valid_campaign_id(args.campaign):
+
+        parser.error("campaign must be 1-64 characters: letters, digits, '_' or '-'")
+
+    campaign = CAMPAIGNS.get(args.campaign)
+
+    if args.command == "export":
+
+        if not campaign.exists():
+
+            parser.error(f"campaign '{args.campaign}' not found")
+
+        lines = iter_campaign_export(campaign, include_history=not args.no_history, include_sessions=not args.no_sessions)
+
+        with (open(args.output, 'wb') if args.output else sys.stdout.buffer) as out:
+
+            for line in lines:
+
+                out.write(line)
+
+        return 0
+
+    try:
+
+        with (open(args.input, 'rb') if args.input else sys.stdin.buffer) as source:
+
+            imported = import_campaign_stream(campaign, source)
+
+    except ValueError as e:
+
+        print(f"import failed: {e}", file=sys.stderr)
+
+        return 1
+
+    print(json.dumps({"campaign": campaign.campaign_id, "imported": imported}), file=sys.stderr)
+
+    return 0
+
+if __name__ == '__main__':
+
+    sys.exit(main())
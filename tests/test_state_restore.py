@@ -0,0 +1,54 @@
+import importlib.util
+import shutil
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+def load_app(tmp_path, monkeypatch, write_mode):
+
+    """Import the app against a copy of data/ with the given WRITE_MODE (read at import time)"""
+
+    shutil.copytree(REPO_DIR / "data", tmp_path / "data")
+
+    monkeypatch.setenv("DATA_DIR", str(tmp_path / "data"))
+
+    monkeypatch.setenv("WRITE_MODE", write_mode)
+
+    monkeypatch.setenv("WAL_FSYNC", "0")
+
+    spec = importlib.util.spec_from_file_location(f"final_flask_updated_{write_mode}", REPO_DIR / "final_flask_updated.py")
+
+    module = importlib.util.module_from_spec(spec)
+
+    spec.loader.exec_module(module)
+
+    return module
+
+@pytest.mark.parametrize("write_mode", ["sync", "group", "wal"])
+def test_restore_intermediate_version(tmp_path, monkeypatch, write_mode):
+
+    client = load_app(tmp_path, monkeypatch, write_mode).app.test_client()
+
+    for value in (11, 22, 33):
+
+        response = client.post('/world/escalation/update', json={"escalation_updates": {"gotham_instability": value}})
+
+        assert response.status_code == 200
+
+    history = client.get('/state/history?document=world').get_json()
+
+    assert history["current_version"] == 4
+
+    assert [entry["version"] for entry in history["versions"]] == [4, 3, 2, 1]
+
+    response = client.post('/state/restore', json={"document": "world", "version": 2})
+
+    assert response.status_code == 200
+
+    world = client.get('/world/get_state').get_json()["world"]
+
+    assert world["escalation_indicators"]["gotham_instability"]["value"] == 11
+
+    assert client.get('/state/history?document=world').get_json()["current_version"] == 5